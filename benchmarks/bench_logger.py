@@ -0,0 +1,55 @@
+# benchmarks/bench_logger.py
+"""Rows/second of the old per-row ``log_trade`` versus :class:`TradeLogger`.
+
+    python -m benchmarks.bench_logger [rows]
+"""
+import csv
+import os
+import sys
+import tempfile
+import time
+
+from services.logger import TradeLogger, _safe_round
+
+STRATEGIES = ["RSI", "MACD", "BOLLINGER", "MA_CROSS", "CUSTOM"]
+
+
+def legacy_log_trade(log_dir, timestamp, symbol, timeframe, indicator_value, price, signal, strategy_name="UNKNOWN"):
+    """``log_trade`` as it was before the buffered logger (reference only)."""
+    os.makedirs(log_dir, exist_ok=True)
+    path = os.path.join(log_dir, f"{str(strategy_name).lower()}_log.csv")
+    write_header = not os.path.exists(path)
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        if write_header:
+            w.writerow(["timestamp","symbol","timeframe","value","price","signal","strategy_name"])
+        w.writerow([timestamp, symbol, timeframe, _safe_round(indicator_value),
+                    _safe_round(price), (signal if signal else "-"), strategy_name])
+
+
+def run(label, log, rows, finish=None):
+    t0 = time.perf_counter()
+    for i in range(rows):
+        log(f"2024-06-01 00:{i % 60:02d}:00", "BTC/USDT", "1m", 50.0 + i % 7, 30000.0 + i,
+            None, STRATEGIES[i % len(STRATEGIES)])
+    caller = time.perf_counter() - t0
+    if finish:
+        finish()
+    total = time.perf_counter() - t0
+    print(f"{label:<22} {rows / total:>12,.0f} rows/s   (caller blocked {caller:.3f}s, total {total:.3f}s)")
+
+
+def main(rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_dir = os.path.join(tmp, "legacy")
+        run("legacy log_trade", lambda *a: legacy_log_trade(legacy_dir, *a), rows)
+
+        buffered = TradeLogger(os.path.join(tmp, "buffered"))
+        run("TradeLogger", buffered.log, rows, buffered.close)
+
+        threaded = TradeLogger(os.path.join(tmp, "threaded"), background=True)
+        run("TradeLogger (thread)", threaded.log, rows, threaded.close)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,92 @@
+# benchmarks/bench_trailing_kernel.py
+"""Compare the old per-bar ``.iloc`` loop with the shared trailing-stop kernel.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_trailing_kernel            # 100k and 1M bars
+    python -m benchmarks.bench_trailing_kernel 100000     # custom sizes
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import ta
+
+from strategies.rsi_strategy_trailing import apply_rsi_strategy
+from strategies.macd_strategy_trailing import apply_macd_strategy
+from strategies.bollinger_strategy_trailing import apply_bollinger_strategy
+from strategies.ma_cross_strategy_trailing import apply_ma_cross_strategy
+from strategies.custom_strategy_trailing import apply_custom_strategy
+
+
+def make_candles(n, seed=42):
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=n, freq='1min'),
+        'close': close,
+        'price': close,
+        'volume': rng.uniform(5, 50, n),
+    })
+
+
+def legacy_rsi_strategy(df, trailing_pct=0.015):
+    """The RSI loop as it was before the kernel (reference only)."""
+    df = df.copy()
+    df['rsi'] = ta.momentum.RSIIndicator(close=df['price'], window=14).rsi()
+    df.dropna(inplace=True)
+
+    signals = []
+    position = None
+    stop_price = 0
+    peak_price = 0
+    for i in range(1, len(df)):
+        timestamp = df.index[i]
+        price = df['price'].iloc[i]
+        rsi = df['rsi'].iloc[i]
+        if rsi < 30 and position is None:
+            signals.append({'timestamp': timestamp, 'signal': 'BUY', 'price': price, 'value': rsi})
+            position = 'LONG'
+            stop_price = price * (1 - trailing_pct)
+            peak_price = price
+        elif position == 'LONG':
+            if price > peak_price:
+                peak_price = price
+                stop_price = max(stop_price, peak_price * (1 - trailing_pct))
+            if price < stop_price:
+                signals.append({'timestamp': timestamp, 'signal': 'SELL', 'price': price, 'value': rsi})
+                position = None
+    return pd.DataFrame(signals)
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return time.perf_counter() - t0, out
+
+
+def main(sizes):
+    strategies = {
+        "RSI": apply_rsi_strategy,
+        "MACD": apply_macd_strategy,
+        "BOLLINGER": apply_bollinger_strategy,
+        "MA_CROSS": apply_ma_cross_strategy,
+        "CUSTOM": apply_custom_strategy,
+    }
+    for n in sizes:
+        df = make_candles(n)
+        print(f"\n== {n:,} bars ==")
+        legacy_s, legacy_df = timed(legacy_rsi_strategy, df)
+        kernel_s, (_, _, kernel_df) = timed(apply_rsi_strategy, df, return_df=True)
+        same = legacy_df.reset_index(drop=True).equals(kernel_df.reset_index(drop=True))
+        print(f"RSI legacy loop : {legacy_s:8.3f}s")
+        print(f"RSI kernel      : {kernel_s:8.3f}s  ({legacy_s / kernel_s:,.0f}x, identical={same})")
+        for name, strategy in strategies.items():
+            secs, (_, _, signals) = timed(strategy, df, return_df=True)
+            print(f"{name:<10} kernel: {secs:8.3f}s  {len(signals):>7} signals")
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [100_000, 1_000_000]
+    main(sizes)
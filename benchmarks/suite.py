@@ -0,0 +1,316 @@
+# benchmarks/suite.py
+"""Timing baseline for the hot paths, comparable between runs.
+
+Times every ``apply_*_strategy`` (plain and trailing), ``Backtester.run``,
+``run_backtest``, the offline replay loop, ``log_trade`` throughput and a
+``monitor.py`` refresh on synthetic candles, and writes the results as JSON.
+Give it a previous result file and it flags every case that got slower by
+more than the threshold (exit code 1), so a change can be checked against
+the baseline it started from:
+
+    python -m benchmarks.suite --output before.json
+    ... change something ...
+    python -m benchmarks.suite --output after.json --baseline before.json
+
+Sizes are bar counts (``10k``, ``1m``, ``10m``).  Cases that are quadratic or
+bar-by-bar in Python have a ``max_bars`` cap and are recorded as skipped on
+bigger sizes; ``--cap-off`` runs them anyway.  Everything runs inside a
+temporary directory because several of the timed functions write ``logs/``.
+"""
+import argparse
+import contextlib
+import datetime as dt
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from services.ohlcv_store import to_frame
+from services.synthetic import SyntheticMarket
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+Case = namedtuple("Case", ["name", "prepare", "max_bars", "fixed_bars"])
+CASES = []
+
+
+def case(name, max_bars=None, fixed_bars=None):
+    """Register ``prepare(df) -> (fn, items)``; only ``fn()`` is timed.
+
+    ``items`` is what the throughput is counted in (bars, rows, refreshes).
+    ``fixed_bars`` runs the case once on that many bars whatever the sizes.
+    """
+    def register(prepare):
+        CASES.append(Case(name, prepare, max_bars, fixed_bars))
+        return prepare
+    return register
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    mult = {"k": 1_000, "m": 1_000_000}.get(text[-1], 1)
+    return int(float(text.rstrip("km")) * mult)
+
+
+def synthetic_candles(n, seed=42, start="2024-06-01", price=30000.0):
+    """``n`` 1m GBM candles from :class:`services.synthetic.SyntheticMarket`."""
+    market = SyntheticMarket(["BTC/USDT"], seed=seed, start_price=price)
+    start_ms = int(pd.Timestamp(start).value // 1_000_000)
+    chunks = [c["BTC/USDT"] for c in market.generate(start_ms, n)]
+    return to_frame(np.concatenate(chunks))
+
+
+# --- cases ---
+
+def _register_strategies():
+    from strategies import (bollinger_strategy, custom_strategy, ma_cross_strategy,
+                            macd_strategy, rsi_strategy)
+    from strategies.registry import TRAILING_STRATEGIES
+
+    plain = {
+        "RSI": (rsi_strategy.apply_rsi_strategy, 100_000),  # per-bar .iloc loop
+        "MACD": (macd_strategy.apply_macd_strategy, None),
+        "BOLLINGER": (bollinger_strategy.apply_bollinger_strategy, None),
+        "MA_CROSS": (ma_cross_strategy.apply_ma_cross_strategy, None),
+        "CUSTOM": (custom_strategy.apply_custom_strategy, None),
+    }
+    for name, (fn, cap) in plain.items():
+        # the plain strategies drop rows / add columns in place: copy untimed
+        def prepare(df, fn=fn):
+            data = df.copy()
+            return (lambda: fn(data)), len(df)
+        case(f"plain.{name.lower()}", max_bars=cap)(prepare)
+
+    for name, fn in TRAILING_STRATEGIES.items():
+        def prepare(df, fn=fn):
+            data = df.set_index("timestamp")
+            return (lambda: fn(data, return_df=True)), len(df)
+        case(f"trailing.{name.lower()}")(prepare)
+
+
+_register_strategies()
+
+
+@case("backtester.run", max_bars=1_000_000)
+def _backtester(df):
+    from services.backtester import Backtester
+    from strategies.registry import TRAILING_STRATEGIES
+
+    tester = Backtester(TRAILING_STRATEGIES, log_dir=tempfile.mkdtemp(dir="."))
+    return (lambda: tester.run("BTC/USDT", "1m", df=df)), len(df)
+
+
+@case("run_backtest")
+def _run_backtest(df):
+    from services.backtest_service import run_backtest
+    from strategies.registry import TRAILING_STRATEGIES
+
+    return (lambda: run_backtest(TRAILING_STRATEGIES, df=df)), len(df)
+
+
+@case("replay.fast", max_bars=1_000_000)
+def _replay_fast(df):
+    import offline_replay
+
+    data = df.drop(columns="price")
+    return (lambda: offline_replay.run(data, mode="fast")), len(df)
+
+
+@case("replay.prefix", fixed_bars=500)
+def _replay_prefix(df):
+    import offline_replay
+
+    data = df.drop(columns="price")
+    return (lambda: offline_replay.run(data, mode="prefix")), len(df)
+
+
+@case("log_trade", max_bars=1_000_000)
+def _log_trade(df):
+    from services.logger import flush_logs, log_trade
+
+    names = ["RSI", "MACD", "BOLLINGER", "MA_CROSS", "CUSTOM"]
+    rows = list(zip(df["timestamp"].astype(str), df["close"].to_numpy()))
+
+    def run():
+        for i, (ts, price) in enumerate(rows):
+            log_trade(ts, "BTC/USDT", "1m", 50.0, price, None, names[i % 5])
+        flush_logs()
+    return run, len(rows)
+
+
+@case("monitor.refresh", max_bars=1_000_000)
+def _monitor_refresh(df):
+    """100 refreshes of monitor.py with logs of ``len(df)`` rows, 5 new rows each."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # FuncAnimation created at import, never shown
+        import monitor
+    from services.logger import HEADER
+
+    os.makedirs("logs", exist_ok=True)
+    names = monitor.STRATEGIES
+    ts = df["timestamp"].astype(str).to_numpy()
+    price = df["close"].round(2).to_numpy()
+    signal = np.where(np.arange(len(df)) % 40 == 0, "BUY", np.where(np.arange(len(df)) % 40 == 20, "SELL", "-"))
+    for name in names:
+        pd.DataFrame({"timestamp": ts, "symbol": "BTC/USDT", "timeframe": "1m", "value": 50.0,
+                      "price": price, "signal": signal, "strategy_name": name.upper()},
+                     columns=HEADER).to_csv(os.path.join("logs", f"{name}_log.csv"), index=False)
+    for tail in monitor.tails:
+        tail._reset()
+    monitor.update(0)  # first open: header + jump to the tail
+
+    def run():
+        for frame in range(1, 101):
+            for name in names:
+                with open(os.path.join("logs", f"{name}_log.csv"), "a", encoding="utf-8") as f:
+                    for k in range(5):
+                        f.write(f"{ts[-1]},BTC/USDT,1m,50.0,{price[-1]},-,{name.upper()}\n")
+            monitor.update(frame)
+    return run, 100
+
+
+# --- running and comparing ---
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _time_case(c, df, repeat):
+    runs = []
+    for _ in range(repeat):
+        fn, items = c.prepare(df)
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            fn()
+            runs.append(time.perf_counter() - t0)
+    best = min(runs)
+    return {"seconds": best, "runs": runs, "bars": len(df), "items": items,
+            "per_second": items / best if best > 0 else None}
+
+
+def run_suite(sizes, repeat=3, only=None, cap=True):
+    """Run the selected cases; returns ``{"meta": ..., "results": {key: ...}}``."""
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    results = {}
+    selected = [c for c in CASES if not only or any(o in c.name for o in only)]
+    fixed = {c.fixed_bars for c in selected if c.fixed_bars}
+    for n in sorted(set(sizes) | fixed):
+        todo = [c for c in selected if (c.fixed_bars == n) or (not c.fixed_bars and n in sizes)]
+        if not todo:
+            continue
+        df = synthetic_candles(n)
+        for c in todo:
+            key = f"{c.name}@{n}"
+            if cap and c.max_bars and n > c.max_bars:
+                results[key] = {"skipped": f"over max_bars={c.max_bars}"}
+                print(f"{key:<32} skipped (max_bars={c.max_bars:,})")
+                continue
+            try:
+                res = _time_case(c, df, repeat)
+            except Exception as e:  # keep going; a broken case is a result too
+                results[key] = {"error": repr(e)}
+                print(f"{key:<32} ERROR {e!r}")
+                continue
+            results[key] = res
+            rate = f"{res['per_second']:>14,.0f} /s" if res["per_second"] else ""
+            print(f"{key:<32} {res['seconds']:>10.4f}s {rate}")
+        del df
+    meta = {
+        "date": dt.datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "repeat": repeat,
+    }
+    return {"meta": meta, "results": results}
+
+
+def compare(baseline, current, threshold=0.25, min_seconds=0.005):
+    """Rows ``(key, old_s, new_s, ratio, status)`` for cases timed in both runs.
+
+    ``status`` is ``"slower"`` when new/old exceeds ``1 + threshold``,
+    ``"faster"`` below ``1 - threshold`` and ``"same"`` otherwise; cases
+    faster than ``min_seconds`` in both runs are too noisy to judge.
+    """
+    rows = []
+    old_results = baseline.get("results", {})
+    for key, new in current.get("results", {}).items():
+        old = old_results.get(key)
+        if not old or "seconds" not in old or "seconds" not in new:
+            continue
+        ratio = new["seconds"] / old["seconds"] if old["seconds"] > 0 else float("inf")
+        if max(old["seconds"], new["seconds"]) < min_seconds:
+            status = "same"
+        elif ratio > 1 + threshold:
+            status = "slower"
+        elif ratio < 1 - threshold:
+            status = "faster"
+        else:
+            status = "same"
+        rows.append((key, old["seconds"], new["seconds"], ratio, status))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the strategy, backtest, replay and logging hot paths.")
+    parser.add_argument("--sizes", default="10k,1m,10m", help="comma separated bar counts (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case; the fastest is kept")
+    parser.add_argument("--only", action="append", help="run cases whose name contains this (repeatable)")
+    parser.add_argument("--cap-off", action="store_true", help="ignore the per-case max_bars caps")
+    parser.add_argument("--output", default=os.path.join(REPO, "benchmarks", "results", "latest.json"))
+    parser.add_argument("--baseline", help="earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="relative slowdown counted as a regression (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+    output = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+
+    sys.path.insert(0, REPO)
+    warnings.filterwarnings("ignore", message="Animation was deleted")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            report = run_suite(sizes, repeat=args.repeat, only=args.only, cap=not args.cap_off)
+        finally:
+            os.chdir(cwd)
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nwrote {output}")
+
+    if baseline_path:
+        with open(baseline_path, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(baseline, report, threshold=args.threshold)
+        print(f"\ncompared with {baseline_path} (commit {baseline.get('meta', {}).get('commit')})")
+        for key, old, new, ratio, status in rows:
+            print(f"{key:<32} {old:>10.4f}s -> {new:>10.4f}s  x{ratio:5.2f}  {status}")
+        slower = [r for r in rows if r[4] == "slower"]
+        if slower:
+            print(f"\n{len(slower)} case(s) slower than the baseline by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,9 @@
 from dotenv import load_dotenv; load_dotenv()
-import os, ccxt
+import os, time
+from services.exchange import get_exchange, load_markets, read_markets
 ex_id = os.getenv("EXCHANGE", "binance")
-ex = getattr(ccxt, ex_id)({"enableRateLimit": True})
-print("OK. Markets sample:", list(ex.load_markets().keys())[:5])
+ex = get_exchange(ex_id)
+source = "cache" if read_markets(ex_id) is not None else "exchange"  # MARKETS_TTL=0 forces a refetch
+t0 = time.perf_counter()
+markets = load_markets(ex)
+print(f"OK. Markets sample ({source}, {time.perf_counter() - t0:.2f}s):", list(markets.keys())[:5])
@@ -0,0 +1,34 @@
+# download_history.py
+"""Download deep candle history into the local store for backtests.
+
+    python download_history.py --symbols BTC/USDT ETH/USDT --timeframes 1m 5m --days 365
+
+Interrupted runs can simply be restarted; every job backfills whatever is
+missing before the oldest stored candle and resumes after the newest one.
+Backfills are merged into the store a segment at a time, so a restart only
+redoes the segment that was in flight.
+"""
+import argparse
+import time
+
+from services.data_service import get_client, get_history
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--symbols", nargs="+", default=["BTC/USDT"])
+    parser.add_argument("--timeframes", nargs="+", default=["5m"])
+    parser.add_argument("--days", type=float, default=30)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    binance, history = get_client(), get_history()
+    until = binance.milliseconds()
+    since = until - int(args.days * 86_400_000)
+    jobs = [(s, tf) for s in args.symbols for tf in args.timeframes]
+
+    t0 = time.perf_counter()
+    results = history.download_many(jobs, since=since, until=until, max_workers=args.workers)
+    for (symbol, tf), written in results.items():
+        print(f"{symbol} {tf}: {written} candle(s) written")
+    print(f"Done in {time.perf_counter() - t0:.1f}s")
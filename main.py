@@ -7,63 +7,230 @@ load_dotenv()
 DRY_RUN = os.getenv("DRY_RUN", "1") == "1"
 
 from services.data_service import fetch_ohlcv, get_available_timeframes
-from strategies.rsi_strategy_trailing import apply_rsi_strategy
-from strategies.macd_strategy_trailing import apply_macd_strategy
-from strategies.bollinger_strategy_trailing import apply_bollinger_strategy
-from strategies.ma_cross_strategy_trailing import apply_ma_cross_strategy
-from strategies.custom_strategy_trailing import apply_custom_strategy
+from strategies.rsi_strategy_trailing import RSIStrategy
+from strategies.macd_strategy_trailing import MACDStrategy
+from strategies.bollinger_strategy_trailing import BollingerStrategy
+from strategies.ma_cross_strategy_trailing import MACrossStrategy
+from strategies.custom_strategy_trailing import CustomStrategy
+from strategies.registry import check_window, max_lookback
+from services.indicator_cache import StreamContext
+from services.market_feed import bar_close_time, make_feed, timeframe_seconds
+from services.metrics import METRICS, start_from_env
+from services.resampler import Resampler
+from services.timeframe_selector import TimeframeSelector
 from services.simulation import Simulation
-from services.logger import log_trade
+from services.logger import flush_logs, log_trade
 from settings import CHECK_INTERVAL_SECONDS, SYMBOL, TIMEFRAME
 
 
-def select_best_timeframe():
-    timeframes = get_available_timeframes()
-    # For now we honor TIMEFRAME from settings/.env; plug your logic here if you
-    # later want to scan `timeframes` and auto-pick.
-    return TIMEFRAME
+# AUTO_TIMEFRAME=1: backtest every strategy on every timeframe and run each on
+# its best one, re-evaluated in the background every TIMEFRAME_REEVAL_SECONDS
+AUTO_TIMEFRAME = os.getenv("AUTO_TIMEFRAME", "0") == "1"
+
+STRATEGIES = {
+    "RSI": RSIStrategy,
+    "MACD": MACDStrategy,
+    "BOLLINGER": BollingerStrategy,
+    "MA_CROSS": MACrossStrategy,
+    "CUSTOM": CustomStrategy,
+}
+
+
+def select_best_timeframe(selector=None):
+    """Timeframe per strategy.
+
+    Without a selector every strategy uses TIMEFRAME.  A TimeframeSelector
+    backtests each strategy on every timeframe of get_available_timeframes()
+    over the recent window (1m candles from the store, resampled) in a
+    process pool and picks per strategy by TIMEFRAME_METRIC.
+    """
+    if selector is None:
+        return {name: TIMEFRAME for name in STRATEGIES}
+    return selector.run_once()
 
 
 if __name__ == "__main__":
-    current_timeframe = select_best_timeframe()
-    print(f"\n[INFO] Using timeframe: {current_timeframe}")
+    selector = None
+    if AUTO_TIMEFRAME:
+        selector = TimeframeSelector(
+            SYMBOL, timeframes=get_available_timeframes(), strategies=list(STRATEGIES),
+            metric=os.getenv("TIMEFRAME_METRIC", "total_return"),
+            days=float(os.getenv("TIMEFRAME_WINDOW_DAYS", "7")),
+            interval=float(os.getenv("TIMEFRAME_REEVAL_SECONDS", "3600")),
+            default=TIMEFRAME,
+        )
+    lanes = select_best_timeframe(selector)  # strategy -> timeframe
+    print()
+    for name, tf in lanes.items():
+        print(f"[INFO] {name} timeframe: {tf}")
+    if selector is not None:
+        print(f"[INFO] Timeframes picked by {selector.metric} in {selector.duration:.1f}s")
     print(f"[INFO] DRY_RUN={'ON' if DRY_RUN else 'OFF'}\n")
 
     simulation = Simulation()  # unchanged
 
-    strategies = {
-        "RSI": apply_rsi_strategy,
-        "MACD": apply_macd_strategy,
-        "BOLLINGER": apply_bollinger_strategy,
-        "MA_CROSS": apply_ma_cross_strategy,
-        "CUSTOM": apply_custom_strategy,
-    }
-
-    while True:
-        try:
-            df = fetch_ohlcv(symbol=SYMBOL, timeframe=current_timeframe)
-            price = df.iloc[-1]["close"]
-            timestamp = df.iloc[-1]["timestamp"]
-
-            for name, strategy in strategies.items():
-                signal, value, *_ = strategy(df.copy())
-                print(f"[{name}] Signal: {signal or '-'} | Value: {round(value, 2)} | Price: {price}")
-
-                # keep your existing log line (records signal & context)
-                log_trade(timestamp, SYMBOL, current_timeframe, value, price, signal, strategy_name=name)
-
-                if signal:
-                    if DRY_RUN:
-                        # paper mode: don't place real orders; just make it explicit in the console
-                        print(f"[PAPER] Would {signal} {SYMBOL} at {price} (strategy={name})")
-                        # optionally, you can also log a synthetic paper fill:
-                        # log_trade(timestamp, SYMBOL, current_timeframe, value, price, f'PAPER_{signal}', strategy_name=name)
-                    else:
-                        # live path (unchanged; uses your Simulation class)
-                        simulation.place_order(signal, price)
-
-            time.sleep(CHECK_INTERVAL_SECONDS)
-
-        except Exception as e:
-            print(f"[ERROR] {e}")
-            time.sleep(60)
+    # streaming strategies keep their indicator and position state between
+    # cycles, so each cycle only has to process the newly closed bars; the
+    # strategies on one timeframe share an indicator context, so e.g. RSI(14)
+    # is computed once per bar
+    contexts = {}
+    strategies = {}
+    for name, tf in lanes.items():
+        strategies[name] = STRATEGIES[name](ctx=contexts.setdefault(tf, StreamContext()))
+    last_ts = None
+
+    # with per-strategy timeframes the feed delivers 1m bars and the resampler
+    # builds every other timeframe from them, so no timeframe costs a request
+    feed_timeframe = selector.base if selector is not None else TIMEFRAME
+    resampler = (Resampler.from_frame(selector.base_df, timeframes=get_available_timeframes())
+                 if selector is not None else None)
+    seen_version = selector.version if selector is not None else 0
+
+    # per stage/strategy latency histograms, error counts, bars behind and cycle
+    # overrun; METRICS_PORT serves them for Prometheus, METRICS_JSON snapshots them
+    start_from_env()
+    tf_seconds = timeframe_seconds(feed_timeframe)
+
+    def timed_fetch(**kwargs):
+        with METRICS.timer("stage_seconds", stage="fetch"):
+            return fetch_ohlcv(**kwargs)
+
+    # bar-close events instead of a fixed sleep: MARKET_FEED=poll (REST, woken
+    # right after each bar boundary), websocket (kline stream) or replay
+    # (MARKET_FEED_REPLAY=<candle csv>)
+    feed_kind = os.getenv("MARKET_FEED", "poll")
+    # fetch only the longest warm-up any strategy declares (+ the forming candle,
+    # + one in case the exchange has not opened the next bar yet)
+    lookback = max_lookback(strategies.values())
+    if feed_kind == "replay":
+        replay_source = os.getenv("MARKET_FEED_REPLAY")
+        if not replay_source:
+            raise SystemExit("MARKET_FEED=replay needs MARKET_FEED_REPLAY=<candle csv>")
+        feed_options = {"source": replay_source, "warmup": lookback}
+    else:
+        feed_options = {"limit": lookback + 2}
+    feed = make_feed(feed_kind, SYMBOL, feed_timeframe, fetch=timed_fetch, **feed_options)
+    print(f"[INFO] Market feed: {feed_kind}")
+
+    def apply_selection():
+        # the selector thread only swaps in a new dict; strategies whose pick
+        # changed restart on the new timeframe, warmed up on resampled history
+        for name, tf in selector.best.items():
+            if tf is None or tf == lanes[name]:
+                continue
+            strategy = STRATEGIES[name]()  # own indicator context
+            warmup = resampler.frame(tf)
+            check_window(f"{name} {tf}", len(warmup), strategy.lookback)
+            for bar in warmup.to_dict("records"):
+                strategy.step(bar)
+            print(f"[INFO] {name} timeframe: {lanes[name]} -> {tf}")
+            strategies[name], lanes[name] = strategy, tf
+
+    def route(bar):
+        """Closed bars per timeframe completed by a feed bar."""
+        if resampler is None:
+            return {feed_timeframe: [bar]}
+        return resampler.update(bar)
+
+    def dispatch(bar, handle):
+        """Feed the timeframe bars completed by ``bar`` to the strategies on them."""
+        for tf, closed in route(bar).items():
+            names = [name for name, lane in lanes.items() if lane == tf]
+            for tf_bar in closed if names else ():
+                if tf in contexts:
+                    contexts[tf].update(tf_bar)
+                for name in names:
+                    handle(name, strategies[name], tf, tf_bar)
+
+    def warm(name, strategy, timeframe, bar):
+        strategy.step(bar)
+
+    def on_bar(bar):
+        global seen_version
+        if selector is not None and selector.version != seen_version:
+            seen_version = selector.version
+            apply_selection()
+        dispatch(bar, step)
+
+        # rows are batched in memory; push them to disk for monitor.py
+        with METRICS.timer("stage_seconds", stage="flush_logs"):
+            flush_logs()
+        METRICS.inc("bars")
+
+    def step(name, strategy, timeframe, bar):
+        price = bar["close"]
+        timestamp = bar["timestamp"]
+        with METRICS.timer("strategy_seconds", strategy=name):
+            signal, value = strategy.step(bar)
+        if not strategy.ready:
+            return
+        print(f"[{name}] Signal: {signal or '-'} | Value: {value if value is None else round(value, 2)} | Price: {price}")
+
+        # keep your existing log line (records signal & context)
+        with METRICS.timer("stage_seconds", stage="log_trade"):
+            log_trade(timestamp, SYMBOL, timeframe, value, price, signal, strategy_name=name)
+
+        if signal:
+            METRICS.inc("signals", strategy=name, signal=signal)
+            if DRY_RUN:
+                # paper mode: don't place real orders; just make it explicit in the console
+                print(f"[PAPER] Would {signal} {SYMBOL} at {price} (strategy={name})")
+                # optionally, you can also log a synthetic paper fill:
+                # log_trade(timestamp, SYMBOL, timeframe, value, price, f'PAPER_{signal}', strategy_name=name)
+            else:
+                # live path (unchanged; uses your Simulation class)
+                with METRICS.timer("stage_seconds", stage="place_order"):
+                    simulation.place_order(signal, price)
+
+    # warm the indicators up on the history we already have; the newest
+    # closed bar is evaluated like a live one
+    if resampler is not None:
+        # the selector's 1m window, already resampled to every timeframe
+        for tf in set(lanes.values()):
+            warmup = resampler.frame(tf)
+            for name, lane in lanes.items():
+                if lane == tf:
+                    check_window(f"{name} {tf}", len(warmup), strategies[name].lookback)
+            for bar in warmup.to_dict("records"):
+                contexts[tf].update(bar)
+                for name, lane in lanes.items():
+                    if lane == tf:
+                        strategies[name].step(bar)
+    history = feed.history()  # bars the resampler has already seen are skipped
+    if resampler is None:
+        for name, strategy in strategies.items():
+            check_window(name, len(history), strategy.lookback)
+    for bar in history.iloc[:-1].to_dict("records"):
+        dispatch(bar, warm)
+    for bar in history.iloc[-1:].to_dict("records"):
+        on_bar(bar)
+        last_ts = bar["timestamp"]
+
+    if selector is not None:
+        selector.start()  # re-evaluates in the background; on_bar picks up changes
+
+    try:
+        for bar in feed:
+            cycle_start = time.perf_counter()
+            try:
+                on_bar(bar)
+            except Exception as e:
+                print(f"[ERROR] {e}")
+                METRICS.inc("cycle_errors")
+            last_ts = bar["timestamp"]
+
+            elapsed = time.perf_counter() - cycle_start
+            METRICS.observe("cycle_seconds", elapsed)
+            METRICS.set("cycle_overrun_seconds", max(0.0, elapsed - CHECK_INTERVAL_SECONDS))
+            if elapsed > CHECK_INTERVAL_SECONDS:
+                METRICS.inc("cycle_overruns")
+            if feed_kind != "replay":
+                # bar close -> strategies evaluated and logged
+                METRICS.observe("decision_latency_seconds", time.time() - bar_close_time(bar, feed_timeframe))
+                # closed bars the exchange should have by now that we have not processed
+                newest_closed = (time.time() // tf_seconds - 1) * tf_seconds
+                METRICS.set("bars_behind", max(0, int((newest_closed - last_ts.timestamp()) // tf_seconds)))
+    finally:
+        feed.close()
+        if selector is not None:
+            selector.stop()
@@ -0,0 +1,59 @@
+import asyncio
+import os
+from dotenv import load_dotenv
+
+# --- load .env so we can use DRY_RUN and other settings without editing code ---
+load_dotenv()
+DRY_RUN = os.getenv("DRY_RUN", "1") == "1"
+
+from services.async_runner import AsyncRateLimiter, MultiPairRunner, make_exchange
+from services.logger import flush_logs, log_trade
+from services.simulation import Simulation
+from settings import CHECK_INTERVAL_SECONDS, SYMBOLS, TIMEFRAME
+
+
+async def main():
+    symbols = [s.strip() for s in os.getenv("SYMBOLS", ",".join(SYMBOLS)).split(",") if s.strip()]
+    timeframes = [t.strip() for t in os.getenv("TIMEFRAMES", TIMEFRAME).split(",") if t.strip()]
+    pairs = [(s, tf) for s in symbols for tf in timeframes]
+    print(f"\n[INFO] Watching {len(pairs)} pair(s): {', '.join(f'{s}@{tf}' for s, tf in pairs)}")
+    print(f"[INFO] DRY_RUN={'ON' if DRY_RUN else 'OFF'}\n")
+
+    # one account per (symbol, timeframe, strategy): a shared one would let a
+    # SELL on one pair close a BUY on another and mix their prices in the P/L
+    simulations = {}
+
+    def on_result(pair, bar, outputs):
+        price = bar["close"]
+        for name, signal, value in outputs:
+            log_trade(bar["timestamp"], pair.symbol, pair.timeframe, value, price, signal, strategy_name=name)
+            if signal:
+                if DRY_RUN:
+                    print(f"[PAPER] Would {signal} {pair.symbol} at {price} (strategy={name}, tf={pair.timeframe})")
+                else:
+                    key = (pair.symbol, pair.timeframe, name)
+                    if key not in simulations:
+                        simulations[key] = Simulation()
+                    simulations[key].place_order(signal, price)
+
+    exchange = make_exchange("binance", apiKey=os.getenv("BINANCE_API_KEY"),
+                             secret=os.getenv("BINANCE_API_SECRET"),
+                             options={"defaultType": "spot"})
+    # Binance allows 1200 request weight per minute; stay well below it
+    runner = MultiPairRunner(exchange, pairs, rate_limiter=AsyncRateLimiter(rate=15),
+                             on_result=on_result)
+    try:
+        while True:
+            stats = await runner.run_cycle()
+            flush_logs()
+            print(f"[CYCLE] {stats['pairs']} pair(s), {stats['new_bars']} new bar(s) "
+                  f"in {stats['wall_time']:.2f}s")
+            for (symbol, tf), err in stats["errors"].items():
+                print(f"[ERROR] {symbol} {tf}: {err}")
+            await asyncio.sleep(max(0.0, CHECK_INTERVAL_SECONDS - stats["wall_time"]))
+    finally:
+        await exchange.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,25 +1,96 @@
-# Generates data/BTCUSDT-1m-sample.csv for offline tests
-import os, math, random, csv, datetime as dt
-os.makedirs("data", exist_ok=True)
-path = "data/BTCUSDT-1m-sample.csv"
-
-start = dt.datetime(2024, 6, 1, 0, 0)
-price = 30000.0
-with open(path, "w", newline="") as f:
-    w = csv.writer(f)
-    w.writerow(["timestamp","open","high","low","close","volume"])
-    for i in range(1500):  # ~25 hours of 1m candles
-        t = start + dt.timedelta(minutes=i)
-        # synthetic move: slow trend + noise
-        drift = 0.00002 * i
-        shock = random.gauss(0, 0.0008)
-        ret = drift + 0.003 * math.sin(i/120) + shock
-        o = price
-        c = max(100.0, o * (1 + ret))
-        h = max(o, c) * (1 + random.uniform(0, 0.0008))
-        l = min(o, c) * (1 - random.uniform(0, 0.0008))
-        v = random.uniform(5, 50)
-        w.writerow([t.isoformat(), f"{o:.2f}", f"{h:.2f}", f"{l:.2f}", f"{c:.2f}", f"{v:.4f}"])
-        price = c
-
-print("Wrote", path)
+# Generates synthetic candles for offline tests and load tests
+"""Synthetic OHLCV for one or many correlated symbols.
+
+    python make_synthetic_data.py                      # data/BTCUSDT-1m-sample.csv, 1500 bars
+    python make_synthetic_data.py --symbols BTC/USDT ETH/USDT SOL/USDT --years 3 \\
+        --model regime --store data/ohlcv              # binary store read by data_service
+    python make_synthetic_data.py --bars 200000 --model jump --csv data/{symbol}-1m-jump.csv
+
+Candles are generated and written in chunks (see services/synthetic.py), so
+memory stays flat however many bars are requested.
+"""
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from services.ohlcv_store import OHLCVStore, to_frame
+from services.synthetic import MODELS, SyntheticMarket
+
+_MINUTES = {"m": 1, "h": 60, "d": 1440}
+
+
+def write_csv(path, records, header):
+    df = to_frame(records).drop(columns="price")
+    df[["open", "high", "low", "close"]] = df[["open", "high", "low", "close"]].round(2)
+    df["volume"] = df["volume"].round(4)
+    df.to_csv(path, mode="w" if header else "a", header=header, index=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic OHLCV candles.")
+    parser.add_argument("--symbols", nargs="+", default=["BTC/USDT"])
+    parser.add_argument("--timeframe", default="1m")
+    length = parser.add_mutually_exclusive_group()
+    length.add_argument("--bars", type=int, help="bars per symbol (default 1500)")
+    length.add_argument("--days", type=float)
+    length.add_argument("--years", type=float)
+    parser.add_argument("--start", default="2024-06-01", help="first bar (UTC)")
+    parser.add_argument("--model", choices=MODELS, default="gbm")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mu", type=float, default=0.0, help="annual drift")
+    parser.add_argument("--sigma", type=float, default=0.6, help="annual volatility")
+    parser.add_argument("--corr", type=float, default=0.6, help="correlation between symbols")
+    parser.add_argument("--price", type=float, default=30000.0, help="starting price")
+    parser.add_argument("--chunk", type=int, default=1_000_000, help="bars generated per chunk")
+    parser.add_argument("--store", metavar="ROOT", help="write to an OHLCVStore rooted here (e.g. data/ohlcv)")
+    parser.add_argument("--exchange", default="synthetic", help="exchange name used inside the store")
+    parser.add_argument("--csv", metavar="PATH",
+                        help="CSV output; {symbol} is replaced for multiple symbols "
+                             "(default data/{symbol}-<tf>-sample.csv when --store is not given)")
+    parser.add_argument("--overwrite", action="store_true", help="replace existing store files")
+    args = parser.parse_args()
+
+    tf_minutes = int(args.timeframe[:-1]) * _MINUTES[args.timeframe[-1]]
+    if args.bars:
+        bars = args.bars
+    elif args.days or args.years:
+        bars = int((args.days or args.years * 365) * 1440 // tf_minutes)
+    else:
+        bars = 1500  # ~25 hours of 1m candles, as this script always wrote
+    csv_path = args.csv or (None if args.store else os.path.join("data", f"{{symbol}}-{args.timeframe}-sample.csv"))
+    if csv_path and len(args.symbols) > 1 and "{symbol}" not in csv_path:
+        parser.error("--csv needs a {symbol} placeholder when several symbols are generated")
+
+    market = SyntheticMarket(args.symbols, model=args.model, seed=args.seed, timeframe_minutes=tf_minutes,
+                             mu=args.mu, sigma=args.sigma, corr=args.corr, start_price=args.price)
+    store = OHLCVStore(args.store) if args.store else None
+    if store and args.overwrite:
+        for symbol in args.symbols:
+            path = store.path(args.exchange, symbol, args.timeframe)
+            if path.exists():
+                path.unlink()
+    csv_paths = {s: csv_path.replace("{symbol}", s.replace("/", "")) for s in args.symbols} if csv_path else {}
+    for path in csv_paths.values():
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    start_ms = int(pd.Timestamp(args.start).value // 1_000_000)
+    t0 = time.perf_counter()
+    written = 0
+    for i, chunk in enumerate(market.generate(start_ms, bars, bar_ms=tf_minutes * 60_000, chunk_bars=args.chunk)):
+        for symbol, records in chunk.items():
+            if store:
+                store.append(args.exchange, symbol, args.timeframe, records)
+            if csv_paths:
+                write_csv(csv_paths[symbol], records, header=(i == 0))
+            written += len(records)
+        if bars > args.chunk:
+            print(f"  {written:,} candles ({time.perf_counter() - t0:.1f}s)")
+
+    for symbol in args.symbols:
+        if store:
+            print("Wrote", store.path(args.exchange, symbol, args.timeframe))
+        if csv_paths:
+            print("Wrote", csv_paths[symbol])
+    print(f"{written:,} candles in {time.perf_counter() - t0:.1f}s")
@@ -1,12 +1,15 @@
 import os
-import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 import matplotlib.dates as mdates
-from datetime import datetime
+
+from services.log_tail import BinaryLogTail, LogTail
+from services.logger import log_formats
 
 STRATEGIES = ["rsi", "macd", "bollinger", "ma_cross", "custom"]
 LOG_DIR = "logs"
+TAIL_ROWS = 50  # rows shown per strategy
 
 fig, axes = plt.subplots(len(STRATEGIES), 1, figsize=(14, 10), sharex=True)
 fig.suptitle("Live Strategy Monitor with Profit Estimation", fontsize=18, color='navy')
@@ -42,7 +45,7 @@ for ax, strategy in zip(axes, STRATEGIES):
 
 axes[-1].set_xlabel("Timestamp", fontsize=10)
 
-def calculate_profit(df):
+def calculate_profit(rows):
     position = None
     entry_price = 0
     profit = 0
@@ -51,9 +54,9 @@ def calculate_profit(df):
     max_drawdown = 0
     current_profit = 0
 
-    for _, row in df.iterrows():
-        signal = row['signal']
-        price = row['price']
+    for row in rows:
+        signal = row.signal
+        price = row.price
 
         if signal == "BUY" and position is None:
             position = 'LONG'
@@ -72,131 +75,78 @@ def calculate_profit(df):
     winrate = (win_count / trade_count) * 100 if trade_count > 0 else 0
     return current_profit, max_drawdown, winrate
 
-def update(frame):
-    for i, strategy in enumerate(STRATEGIES):
-        file_path = os.path.join(LOG_DIR, f"{strategy}_log.csv")
-        if os.path.exists(file_path):
-            try:
-                df = pd.read_csv(file_path)
-                if df.empty or 'value' not in df.columns or df['value'].dropna().empty:
-                    lines[i].set_data([], [])
-                    buy_markers[i].set_data([], [])
-                    sell_markers[i].set_data([], [])
-                    profit_texts[i].set_text("No data")
-                    floating_texts[i].set_text("")
-                    positional_bars[i].set_visible(False)
-                    continue
-
-                df = df.tail(50)
-                df['timestamp'] = pd.to_datetime(df['timestamp'])
-                x = df['timestamp']
-                y = df['value']
-
-                lines[i].set_data(x, y)
-
-                y_margin = (y.max() - y.min()) * 0.1 if y.max() != y.min() else 1
-                axes[i].set_ylim(y.min() - y_margin, y.max() + y_margin)
-
-                axes[i].relim()
-                axes[i].autoscale_view()
-
-                buy_df = df[df['signal'] == "BUY"]
-                sell_df = df[df['signal'] == "SELL"]
-
-                buy_markers[i].set_data(buy_df['timestamp'], buy_df['value'])
-                sell_markers[i].set_data(sell_df['timestamp'], sell_df['value'])
-
-                for ann in annotations[i]:
-                    ann.remove()
-                annotations[i].clear()
-
-                for _, row in pd.concat([buy_df, sell_df]).iterrows():
-                    ann = axes[i].annotate(f"{row['price']:.2f}",
-                                           xy=(row['timestamp'], row['value']),
-                                           xytext=(5, 5), textcoords='offset points',
-                                           fontsize=7, color='black', zorder=4)
-                    annotations[i].append(ann)
-
-                profit, drawdown, winrate = calculate_profit(df)
-                profit_texts[i].set_text(f"Net P/L: {profit:.2f}")
-                floating_texts[i].set_text(f"Drawdown: {drawdown:.2f} | Winrate: {winrate:.1f}%")
-
-                if not df.empty and df.iloc[-1]['signal'] == 'BUY':
-                    positional_bars[i].set_ydata(df.iloc[-1]['value'])
-                    positional_bars[i].set_visible(True)
-                else:
-                    positional_bars[i].set_visible(False)
-
-                axes[i].xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S'))
-
-            except Exception as e:
-                print(f"Error reading {strategy} log: {e}")
+# one tail per log: each tick parses only the lines appended since the last one;
+# with LOG_FORMAT=binary the bot writes <strategy>_log.bin, which is read instead
+if "csv" in log_formats():
+    tails = [LogTail(os.path.join(LOG_DIR, f"{strategy}_log.csv"), maxlen=TAIL_ROWS) for strategy in STRATEGIES]
+else:
+    tails = [BinaryLogTail(os.path.join(LOG_DIR, f"{strategy}_log.bin"), maxlen=TAIL_ROWS) for strategy in STRATEGIES]
+
+def show_no_data(i):
+    lines[i].set_data([], [])
+    buy_markers[i].set_data([], [])
+    sell_markers[i].set_data([], [])
+    profit_texts[i].set_text("No data")
+    floating_texts[i].set_text("")
+    positional_bars[i].set_visible(False)
+
+def redraw(i, rows):
+    rows = [r for r in rows if r.timestamp is not None]
+    y = np.array([r.value for r in rows], dtype=float)
+    if not rows or np.isnan(y).all():
+        show_no_data(i)
+        return
+
+    x = np.array([r.timestamp for r in rows], dtype="datetime64[us]")
+    lines[i].set_data(x, y)
+
+    # Dinamik Y ekseni aralığı
+    y_min, y_max = np.nanmin(y), np.nanmax(y)
+    y_margin = (y_max - y_min) * 0.1 if y_max != y_min else 1
+    axes[i].set_ylim(y_min - y_margin, y_max + y_margin)
+
+    axes[i].relim()
+    axes[i].autoscale_view()
+
+    buys = [r for r in rows if r.signal == "BUY"]
+    sells = [r for r in rows if r.signal == "SELL"]
+
+    buy_markers[i].set_data([r.timestamp for r in buys], [r.value for r in buys])
+    sell_markers[i].set_data([r.timestamp for r in sells], [r.value for r in sells])
+
+    # Temizle önceki annotate'ler
+    for ann in annotations[i]:
+        ann.remove()
+    annotations[i].clear()
+
+    for row in buys + sells:
+        ann = axes[i].annotate(f"{row.price:.2f}",
+                               xy=(row.timestamp, row.value),
+                               xytext=(5, 5), textcoords='offset points',
+                               fontsize=7, color='black', zorder=4)
+        annotations[i].append(ann)
+
+    profit, drawdown, winrate = calculate_profit(rows)
+    profit_texts[i].set_text(f"Net P/L: {profit:.2f}")
+    floating_texts[i].set_text(f"Drawdown: {drawdown:.2f} | Winrate: {winrate:.1f}%")
+
+    if rows[-1].signal == 'BUY':
+        positional_bars[i].set_ydata([rows[-1].value])
+        positional_bars[i].set_visible(True)
+    else:
+        positional_bars[i].set_visible(False)
+
+    axes[i].xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S'))
 
+def update(frame):
     for i, strategy in enumerate(STRATEGIES):
-        file_path = os.path.join(LOG_DIR, f"{strategy}_log.csv")
-        if os.path.exists(file_path):
-            try:
-                df = pd.read_csv(file_path)
-                df = df.tail(50)
-                df['timestamp'] = pd.to_datetime(df['timestamp'])
-                if 'value' in df.columns and not df['value'].dropna().empty:
-                    x = df['timestamp']
-                    y = df['value']
-                    lines[i].set_data(x, y)
-
-                    # Dinamik Y ekseni aralığı
-                    y_margin = (y.max() - y.min()) * 0.1 if y.max() != y.min() else 1
-                    axes[i].set_ylim(y.min() - y_margin, y.max() + y_margin)
-                else:
-                    lines[i].set_data([], [])
-                    buy_markers[i].set_data([], [])
-                    sell_markers[i].set_data([], [])
-                    profit_texts[i].set_text("No data")
-                    floating_texts[i].set_text("")
-                    positional_bars[i].set_visible(False)
-                    continue  # diğer stratejiye geç
-
-                # Dinamik Y ekseni aralığı
-                if not y.empty:
-                    y_margin = (y.max() - y.min()) * 0.1 if y.max() != y.min() else 1
-                    axes[i].set_ylim(y.min() - y_margin, y.max() + y_margin)
-
-                axes[i].relim()
-                axes[i].autoscale_view()
-
-                buy_df = df[df['signal'] == "BUY"]
-                sell_df = df[df['signal'] == "SELL"]
-
-                buy_markers[i].set_data(buy_df['timestamp'], buy_df['value'])
-                sell_markers[i].set_data(sell_df['timestamp'], sell_df['value'])
-
-                # Temizle önceki annotate'ler
-                for ann in annotations[i]:
-                    ann.remove()
-                annotations[i].clear()
-
-                for _, row in pd.concat([buy_df, sell_df]).iterrows():
-                    ann = axes[i].annotate(f"{row['price']:.2f}",
-                                           xy=(row['timestamp'], row['value']),
-                                           xytext=(5, 5), textcoords='offset points',
-                                           fontsize=7, color='black', zorder=4)
-                    annotations[i].append(ann)
-
-                profit, drawdown, winrate = calculate_profit(df)
-                profit_texts[i].set_text(f"Net P/L: {profit:.2f}")
-                floating_texts[i].set_text(f"Drawdown: {drawdown:.2f} | Winrate: {winrate:.1f}%")
-
-                if not df.empty and df.iloc[-1]['signal'] == 'BUY':
-                    positional_bars[i].set_ydata(df.iloc[-1]['value'])
-                    positional_bars[i].set_visible(True)
-                else:
-                    positional_bars[i].set_visible(False)
-
-                axes[i].xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S'))
-
-            except Exception as e:
-                print(f"Error reading {strategy} log: {e}")
+        try:
+            # nothing appended since the last tick -> nothing to redraw
+            if tails[i].refresh() or frame == 0:
+                redraw(i, tails[i].rows)
+        except Exception as e:
+            print(f"Error reading {strategy} log: {e}")
 
 ani = FuncAnimation(fig, update, interval=5000)
 plt.tight_layout()
-plt.show()
\ No newline at end of file
+plt.show()
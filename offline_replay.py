@@ -1,27 +1,25 @@
 # offline_replay.py
 from dotenv import load_dotenv; load_dotenv()
-import os, time, csv
+import argparse, os, time, csv
 from pathlib import Path
 import pandas as pd
 
-from strategies.rsi_strategy_trailing import apply_rsi_strategy
-from strategies.macd_strategy_trailing import apply_macd_strategy
-from strategies.bollinger_strategy_trailing import apply_bollinger_strategy
-from strategies.ma_cross_strategy_trailing import apply_ma_cross_strategy
-from strategies.custom_strategy_trailing import apply_custom_strategy
+from strategies.rsi_strategy_trailing import apply_rsi_strategy, RSIStrategy
+from strategies.macd_strategy_trailing import apply_macd_strategy, MACDStrategy
+from strategies.bollinger_strategy_trailing import apply_bollinger_strategy, BollingerStrategy
+from strategies.ma_cross_strategy_trailing import apply_ma_cross_strategy, MACrossStrategy
+from strategies.custom_strategy_trailing import apply_custom_strategy, CustomStrategy
+from services.indicator_cache import IndicatorContext, StreamContext
 from services.simulation import Simulation
-from services.logger import log_trade
+from services.logger import flush_logs, log_trade
 
 SYMBOL = os.getenv("SYMBOL", "BTC/USDT")
 TIMEFRAME = os.getenv("TIMEFRAME", "1m")
-CHECK_INTERVAL_SECONDS = 0.01   # fast-forward (10 ms per "bar")
+DATA_PATH = os.getenv("REPLAY_DATA", "data/BTCUSDT-1m-sample.csv")
 
 # --- exec logger (paper fills) ---
-LOG_DIR = Path("logs"); LOG_DIR.mkdir(exist_ok=True)
+LOG_DIR = Path("logs")
 EXEC = LOG_DIR / "exec_log.csv"
-if not EXEC.exists():
-    with open(EXEC, "w", newline="", encoding="utf-8") as f:
-        csv.writer(f).writerow(["timestamp","strategy_name","side","price"])
 
 def log_exec(ts, strat, side, price):
     with open(EXEC, "a", newline="", encoding="utf-8") as f:
@@ -30,13 +28,6 @@ def log_exec(ts, strat, side, price):
 # --- options ---
 ENFORCE_TRANSITIONS = True  # BUY only when flat; SELL only when long (set False to log every BUY/SELL)
 
-# --- state ---
-pos = {"RSI":0, "MACD":0, "BOLLINGER":0, "MA_CROSS":0, "CUSTOM":0}
-exec_rows = 0
-
-# --- data ---
-df_all = pd.read_csv("data/BTCUSDT-1m-sample.csv", parse_dates=["timestamp"])
-
 # --- strategies ---
 strategies = {
     "RSI": apply_rsi_strategy,
@@ -46,7 +37,14 @@ strategies = {
     "CUSTOM": apply_custom_strategy,
 }
 
-sim = Simulation()
+# streaming twins of the functions above, used by the fast replay mode
+streaming_strategies = {
+    "RSI": RSIStrategy,
+    "MACD": MACDStrategy,
+    "BOLLINGER": BollingerStrategy,
+    "MA_CROSS": MACrossStrategy,
+    "CUSTOM": CustomStrategy,
+}
 
 def normalize_side(sig) -> str | None:
     """Map many signal variants to 'BUY'/'SELL'; return None for hold/unknown."""
@@ -63,47 +61,149 @@ def normalize_side(sig) -> str | None:
         return "SELL"
     return None
 
-print(f"\n[OFFLINE] Replaying {len(df_all)} candles for {SYMBOL} @ {TIMEFRAME}\n")
-
-# simple warmup so indicators have history
-WARMUP = 120
-for i in range(max(WARMUP, len(df_all))):
-    if i >= len(df_all):
-        break
-    df = df_all.iloc[: i + 1].copy()
-    price = float(df.iloc[-1]["close"])
-    ts = df.iloc[-1]["timestamp"]
-
-    for name, strat in strategies.items():
-        try:
-            signal, value, *_ = strat(df)
-        except Exception as e:
-            # indicator not ready yet; skip
-            continue
-
-        # keep your existing signal log
-        log_trade(ts, SYMBOL, TIMEFRAME, value, price, signal, strategy_name=name)
-
-        # normalize and decide whether to log an execution
-        side = normalize_side(signal)
-        if not side:
-            continue
-
-        # still call your simulator so behavior matches your previous runs
-        sim.place_order(side, price)
-
-        if ENFORCE_TRANSITIONS:
-            if side == "BUY" and pos[name] == 0:
-                log_exec(ts, name, "BUY", price); exec_rows += 1
-                pos[name] = 1
-            elif side == "SELL" and pos[name] == 1:
-                log_exec(ts, name, "SELL", price); exec_rows += 1
-                pos[name] = 0
-        else:
-            # log every normalized BUY/SELL regardless of position
-            log_exec(ts, name, side, price); exec_rows += 1
-
-    time.sleep(CHECK_INTERVAL_SECONDS)
-
-print("\n[OFFLINE] Done.")
-print(f"Wrote {exec_rows} execution row(s) to {EXEC}")
+
+def replay_prefix(df_all):
+    """Original replay: rerun every strategy on the growing prefix (O(N^2)).
+
+    Yields ``(ts, price, outputs)`` per bar where ``outputs`` lists
+    ``(name, signal, value)`` for the strategies that produced a result.
+    """
+    for i in range(len(df_all)):
+        # the strategies copy before adding columns; one indicator context per
+        # prefix is shared by all of them
+        df = df_all.iloc[: i + 1]
+        ctx = IndicatorContext(df)
+        price = float(df.iloc[-1]["close"])
+        ts = df.iloc[-1]["timestamp"]
+
+        outputs = []
+        for name, strat in strategies.items():
+            try:
+                signal, value, *_ = strat(df, ctx=ctx)
+            except Exception as e:
+                # indicator not ready yet; skip
+                continue
+            if signal is None and value is None:
+                continue  # not ready either (Bollinger returns this while short)
+            outputs.append((name, signal, value))
+        yield ts, price, outputs
+
+
+def replay_fast(df_all):
+    """Single pass: each strategy sees every bar exactly once (O(N)).
+
+    Yields the same ``(ts, price, outputs)`` tuples as :func:`replay_prefix`.
+    """
+    ctx = StreamContext()
+    engines = {name: cls(ctx=ctx) for name, cls in streaming_strategies.items()}
+    for bar in df_all.to_dict("records"):
+        ctx.update(bar)
+        outputs = []
+        for name, engine in engines.items():
+            signal, value = engine.step(bar)
+            if engine.ready:
+                outputs.append((name, signal, value))
+        yield bar["timestamp"], float(bar["close"]), outputs
+
+
+def _same_value(a, b):
+    if a is None or b is None:
+        return a is None and b is None
+    return float(a) == float(b) or (a != a and b != b)
+
+
+def check_equivalence(df_all, bars):
+    """Compare the fast replay with the prefix replay on the first ``bars`` rows.
+
+    Returns a list of human readable mismatches (empty when they agree).
+    """
+    df = df_all.iloc[:bars]
+    mismatches = []
+    for i, (slow, fast) in enumerate(zip(replay_prefix(df), replay_fast(df))):
+        slow_out = {name: (sig, val) for name, sig, val in slow[2]}
+        fast_out = {name: (sig, val) for name, sig, val in fast[2]}
+        for name in strategies:
+            a, b = slow_out.get(name), fast_out.get(name)
+            if a is None or b is None:
+                same = a is None and b is None
+            else:
+                same = a[0] == b[0] and _same_value(a[1], b[1])
+            if not same:
+                mismatches.append(f"bar {i} ({slow[0]}) {name}: prefix={a} fast={b}")
+    return mismatches
+
+
+def run(df_all, mode="fast", sleep=0.0):
+    """Replay ``df_all`` and write the usual signal and execution logs."""
+    LOG_DIR.mkdir(exist_ok=True)
+    if not EXEC.exists():
+        with open(EXEC, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerow(["timestamp","strategy_name","side","price"])
+
+    # --- state ---
+    pos = {"RSI":0, "MACD":0, "BOLLINGER":0, "MA_CROSS":0, "CUSTOM":0}
+    exec_rows = 0
+    sim = Simulation()
+
+    replay = replay_fast if mode == "fast" else replay_prefix
+    for ts, price, outputs in replay(df_all):
+        for name, signal, value in outputs:
+            # keep your existing signal log
+            log_trade(ts, SYMBOL, TIMEFRAME, value, price, signal, strategy_name=name)
+
+            # normalize and decide whether to log an execution
+            side = normalize_side(signal)
+            if not side:
+                continue
+
+            # still call your simulator so behavior matches your previous runs
+            sim.place_order(side, price)
+
+            if ENFORCE_TRANSITIONS:
+                if side == "BUY" and pos[name] == 0:
+                    log_exec(ts, name, "BUY", price); exec_rows += 1
+                    pos[name] = 1
+                elif side == "SELL" and pos[name] == 1:
+                    log_exec(ts, name, "SELL", price); exec_rows += 1
+                    pos[name] = 0
+            else:
+                # log every normalized BUY/SELL regardless of position
+                log_exec(ts, name, side, price); exec_rows += 1
+
+        if sleep:
+            time.sleep(sleep)
+    flush_logs()
+    return exec_rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a candle CSV through the strategies.")
+    parser.add_argument("--mode", choices=["fast", "prefix"], default=os.getenv("REPLAY_MODE", "fast"),
+                        help="fast: single pass with streaming strategies; prefix: rerun on every prefix (slow)")
+    parser.add_argument("--sleep", type=float, default=None,
+                        help="seconds to sleep per bar (default: 0.01 in prefix mode, 0 in fast mode)")
+    parser.add_argument("--check", type=int, metavar="BARS", default=0,
+                        help="only verify that fast and prefix modes agree on the first BARS candles")
+    parser.add_argument("--data", default=DATA_PATH)
+    args = parser.parse_args()
+
+    # --- data ---
+    df_all = pd.read_csv(args.data, parse_dates=["timestamp"])
+
+    if args.check:
+        t0 = time.perf_counter()
+        problems = check_equivalence(df_all, args.check)
+        print(f"[CHECK] compared {min(args.check, len(df_all))} bars in {time.perf_counter() - t0:.1f}s")
+        for line in problems[:20]:
+            print("  ", line)
+        if problems:
+            raise SystemExit(f"[CHECK] {len(problems)} mismatch(es) between fast and prefix replay")
+        print("[CHECK] fast replay matches prefix replay")
+        raise SystemExit(0)
+
+    sleep = args.sleep if args.sleep is not None else (0.01 if args.mode == "prefix" else 0.0)
+    print(f"\n[OFFLINE] Replaying {len(df_all)} candles for {SYMBOL} @ {TIMEFRAME} ({args.mode} mode)\n")
+    exec_rows = run(df_all, mode=args.mode, sleep=sleep)
+
+    print("\n[OFFLINE] Done.")
+    print(f"Wrote {exec_rows} execution row(s) to {EXEC}")
@@ -0,0 +1,61 @@
+# robustness.py
+"""Monte Carlo robustness of the trailing strategies' backtests.
+
+    python robustness.py --data data/BTCUSDT-1m-sample.csv
+    python robustness.py --limit 20000 --strategies RSI MACD --paths 100000 --workers 4
+    python robustness.py --data candles.csv --methods shuffle offset --confidence 0.9
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from services.robustness import METHODS, run_robustness
+from strategies.registry import TRAILING_STRATEGIES
+from settings import SYMBOL, TIMEFRAME
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Confidence intervals for backtest return, drawdown and win rate.")
+    parser.add_argument("--data", help="candle CSV to use instead of downloading")
+    parser.add_argument("--symbol", default=SYMBOL)
+    parser.add_argument("--timeframe", default=TIMEFRAME)
+    parser.add_argument("--limit", type=int, default=5000)
+    parser.add_argument("--strategies", nargs="+", default=list(TRAILING_STRATEGIES))
+    parser.add_argument("--methods", nargs="+", choices=METHODS, default=METHODS)
+    parser.add_argument("--paths", type=int, default=10_000, help="resampled paths per method")
+    parser.add_argument("--block", type=int, help="bars per block for the block bootstrap")
+    parser.add_argument("--max-offset", type=float, default=0.5,
+                        help="random starts are drawn from this share of the bars")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--out", help="write the summary table to this CSV")
+    args = parser.parse_args()
+
+    if args.data:
+        df = pd.read_csv(args.data, parse_dates=["timestamp"])
+    else:
+        from services.data_service import fetch_ohlcv
+        df = fetch_ohlcv(symbol=args.symbol, timeframe=args.timeframe, limit=args.limit)
+
+    tables = []
+    for name in args.strategies:
+        t0 = time.perf_counter()
+        try:
+            summary, path = run_robustness(df, name, methods=args.methods, n_paths=args.paths,
+                                           confidence=args.confidence, block=args.block,
+                                           max_offset=args.max_offset, workers=args.workers,
+                                           seed=args.seed)
+        except ValueError as e:
+            print(f"[{name}] skipped: {e}\n")
+            continue
+        print(f"[{name}] {path.metrics['trades']} trades on {len(df)} bars, "
+              f"{args.paths} paths x {len(args.methods)} methods in {time.perf_counter() - t0:.1f}s")
+        with pd.option_context("display.width", 200, "display.float_format", "{:.4f}".format):
+            print(summary.to_string(index=False))
+        print()
+        tables.append(summary.assign(strategy=name))
+    if args.out and tables:
+        pd.concat(tables, ignore_index=True).to_csv(args.out, index=False)
+        print(f"Wrote {args.out}")
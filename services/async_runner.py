@@ -0,0 +1,179 @@
+# services/async_runner.py
+"""Watch many (symbol, timeframe) pairs from one asyncio event loop.
+
+Every cycle fetches all pairs concurrently under one shared rate limiter and
+feeds each pair's newly closed bars to its own set of streaming strategies.
+The exchange is anything with an awaitable ``fetch_ohlcv`` (a
+``ccxt.async_support`` client, or :class:`services.fake_exchange.AsyncFakeExchange`
+in tests), so the fetch layer can be swapped without touching the runner.
+"""
+import asyncio
+import time
+
+import pandas as pd
+
+from services.indicator_cache import StreamContext
+from services.market_feed import timeframe_seconds
+from strategies.registry import STREAMING_STRATEGIES, check_window, max_lookback
+
+
+class AsyncRateLimiter:
+    """Token bucket for coroutines: ``rate`` requests per second, bursts up to ``capacity``."""
+
+    def __init__(self, rate=10.0, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, weight=1.0):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= weight:
+                    self._tokens -= weight
+                    return
+                await asyncio.sleep((weight - self._tokens) / self.rate)
+
+
+def make_exchange(exchange_id="binance", **config):
+    """Create a ``ccxt.async_support`` client (remember to ``await ex.close()``).
+
+    Markets are preloaded from the disk cache of :mod:`services.exchange`
+    when it is fresh, which saves the ``load_markets`` request.
+    """
+    import ccxt.async_support as ccxt_async
+
+    from services.exchange import read_markets
+
+    client = getattr(ccxt_async, exchange_id)({"enableRateLimit": False, **config})
+    cached = read_markets(exchange_id)
+    if cached is not None:
+        client.set_markets(cached["markets"], cached.get("currencies"))
+    return client
+
+
+class PairState:
+    """Strategies and progress for one (symbol, timeframe) pair.
+
+    ``strategies`` maps names to factories called as ``factory(ctx=...)``; all
+    of a pair's strategies share one :class:`StreamContext`.
+    """
+
+    def __init__(self, symbol, timeframe, strategies=None):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.ctx = StreamContext()
+        factories = strategies or STREAMING_STRATEGIES
+        self.strategies = {name: factory(ctx=self.ctx) for name, factory in factories.items()}
+        self.lookback = max_lookback(self.strategies.values())
+        self.tf = timeframe_seconds(timeframe)
+        self.last_ts = None
+
+    def fetch_limit(self, now=None, limit=None):
+        """Candles to request: the warm-up window first, then the bars closed since.
+
+        One extra row is the candle still forming.  ``limit`` caps the result.
+        """
+        if self.last_ts is None:
+            wanted = self.lookback + 1
+        else:
+            now = time.time() if now is None else now
+            wanted = max(2, int((now - self.last_ts.timestamp()) // self.tf) + 1)
+        return wanted if limit is None else min(wanted, limit)
+
+    def feed(self, df):
+        """Process the closed bars of ``df`` not seen yet.
+
+        The last row is the candle still forming and is ignored.  On the first
+        call the history is used to warm the strategies up and only the newest
+        closed bar is reported.  Returns ``[(bar, [(name, signal, value), ...])]``.
+        """
+        closed = df.iloc[:-1]
+        if self.last_ts is None:
+            check_window(f"{self.symbol} {self.timeframe}", len(closed), self.lookback)
+            for bar in closed.iloc[:-1].to_dict("records"):
+                self.ctx.update(bar)
+                for strategy in self.strategies.values():
+                    strategy.step(bar)
+            new_bars = closed.iloc[-1:]
+        else:
+            new_bars = closed[closed["timestamp"] > self.last_ts]
+
+        results = []
+        for bar in new_bars.to_dict("records"):
+            self.ctx.update(bar)
+            outputs = []
+            for name, strategy in self.strategies.items():
+                signal, value = strategy.step(bar)
+                if strategy.ready:
+                    outputs.append((name, signal, value))
+            results.append((bar, outputs))
+            self.last_ts = bar["timestamp"]
+        return results
+
+
+class MultiPairRunner:
+    """Fetch and evaluate many pairs per cycle.
+
+    Parameters
+    ----------
+    exchange
+        Object with ``async fetch_ohlcv(symbol, timeframe, limit=...)``.
+    pairs : list of (symbol, timeframe)
+    limit : int
+        Cap on the candles requested per pair (Binance serves up to 1000).
+        Each pair asks for its strategies' lookback on the first cycle and
+        only for the bars closed since on the next ones.
+    rate_limiter : AsyncRateLimiter, optional
+    max_concurrency : int
+        Requests in flight at once.
+    on_result : callable, optional
+        ``on_result(pair_state, bar, outputs)`` for every new closed bar.
+    """
+
+    def __init__(self, exchange, pairs, limit=1000, rate_limiter=None,
+                 max_concurrency=20, on_result=None, strategies=None):
+        self.exchange = exchange
+        self.limit = limit
+        self.rate_limiter = rate_limiter or AsyncRateLimiter()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.on_result = on_result
+        self.pairs = [PairState(symbol, tf, strategies) for symbol, tf in pairs]
+
+    async def _fetch(self, pair):
+        async with self._semaphore:
+            await self.rate_limiter.acquire()
+            now = self.exchange.milliseconds() / 1000  # ccxt clients and the fake exchange both have it
+            ohlcv = await self.exchange.fetch_ohlcv(pair.symbol, pair.timeframe,
+                                                    limit=pair.fetch_limit(now, self.limit))
+        df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        df['price'] = df['close']
+        return df
+
+    async def _process(self, pair):
+        df = await self._fetch(pair)
+        results = pair.feed(df)
+        if self.on_result:
+            for bar, outputs in results:
+                self.on_result(pair, bar, outputs)
+        return len(results)
+
+    async def run_cycle(self):
+        """One fetch+evaluate pass over every pair; returns cycle statistics."""
+        t0 = time.perf_counter()
+        outcomes = await asyncio.gather(*(self._process(p) for p in self.pairs),
+                                        return_exceptions=True)
+        errors = {}
+        bars = 0
+        for pair, outcome in zip(self.pairs, outcomes):
+            if isinstance(outcome, Exception):
+                errors[(pair.symbol, pair.timeframe)] = outcome
+            else:
+                bars += outcome
+        return {"wall_time": time.perf_counter() - t0, "pairs": len(self.pairs),
+                "new_bars": bars, "errors": errors}
@@ -1,8 +1,34 @@
+import inspect
 import pandas as pd
 from typing import Callable, Dict
 
-from services.data_service import fetch_ohlcv
-from services.simulation import BacktestSimulation
+from services.fill_engine import align_signals, simulate_fills
+from services.indicator_cache import IndicatorContext
+
+
+def strategy_signals(strat: Callable, df: pd.DataFrame, ctx: IndicatorContext = None,
+                     **options) -> pd.DataFrame:
+    """Run ``strat`` on ``df`` and return its signal frame.
+
+    Accepts strategies that return a DataFrame directly as well as the
+    trailing strategies, which return ``(signal, value, signals_df)`` when
+    called with ``return_df=True``.  ``ctx`` is handed to strategies that
+    take one, so indicators are shared between them; so are ``options``
+    (e.g. ``intrabar=True``) that the strategy accepts.
+    """
+    params = inspect.signature(strat).parameters
+    kwargs = {k: v for k, v in options.items() if k in params}
+    if "return_df" in params:
+        kwargs["return_df"] = True
+    if ctx is not None and "ctx" in params:
+        kwargs["ctx"] = ctx
+    out = strat(df.copy(), **kwargs)
+    if isinstance(out, tuple):
+        out = out[-1] if out and isinstance(out[-1], pd.DataFrame) else None
+    if not isinstance(out, pd.DataFrame) or out.empty:
+        # normal strategies might return tuple (signal, value)
+        return pd.DataFrame([], columns=["timestamp", "signal", "price", "value"])
+    return out
 
 
 def run_backtest(
@@ -11,6 +37,9 @@ def run_backtest(
     timeframe: str = "5m",
     limit: int = 500,
     initial_balance: float = 1000.0,
+    df: pd.DataFrame = None,
+    intrabar: bool = False,
+    take_profit: float = None,
 ) -> Dict[str, Dict[str, float]]:
     """Run backtest for provided strategies.
 
@@ -27,46 +56,51 @@ def run_backtest(
         Number of bars to fetch.
     initial_balance: float
         Starting balance for each strategy simulation.
+    df: pandas.DataFrame, optional
+        Candles to use instead of fetching them.
+    intrabar: bool
+        Let the trailing strategies trigger their stops on the bars'
+        high/low and sell at the stop fill instead of the close.
+    take_profit: float, optional
+        Target above the entry price, for strategies that support one.
 
     Returns
     -------
     dict
         Metrics for each strategy containing total_return, win_rate and
-        max_drawdown.
+        drawdown, plus the per-trade returns (``trades``) and the per-bar
+        marked-to-market ``equity_curve`` as NumPy arrays.
     """
-    df = fetch_ohlcv(symbol=symbol, timeframe=timeframe, limit=limit)
-    df = df.rename(columns={"close": "price"}).set_index("timestamp")
+    if df is None:
+        from services.data_service import fetch_ohlcv
+        df = fetch_ohlcv(symbol=symbol, timeframe=timeframe, limit=limit)
+    df = df.set_index("timestamp")
+    if "price" not in df.columns:
+        df["price"] = df["close"]
+    price = df["price"].to_numpy(dtype=float)
+    ctx = IndicatorContext(df)
 
-    # Pre-compute all strategy signals on the full dataframe
-    strategy_signals = {}
-    simulations = {}
-    for name, strat in strategies.items():
-        signals = strat(df.copy())
-        if not isinstance(signals, pd.DataFrame) or signals.empty:
-            # normal strategies might return tuple (signal, value)
-            signals = pd.DataFrame([], columns=["timestamp", "signal", "price", "value"])
-        signals = signals.set_index("timestamp") if not signals.empty else signals
-        strategy_signals[name] = signals
-        simulations[name] = BacktestSimulation(initial_balance=initial_balance)
-
-    # Iterate through each bar and feed signals to simulations
-    for ts, row in df.iterrows():
-        price = row["price"]
-        for name, signals in strategy_signals.items():
-            if not signals.empty and ts in signals.index:
-                signal = signals.loc[ts]["signal"]
-                simulations[name].process_signal(signal, price)
+    options = {}
+    if intrabar:
+        options["intrabar"] = True
+    if take_profit is not None:
+        options["take_profit"] = take_profit
 
-    # Close any open position at final price
-    final_price = df.iloc[-1]["price"]
     metrics = {}
-    for name, sim in simulations.items():
-        sim.close_final(final_price)
-        total_ret, win_rate, drawdown = sim.get_metrics()
+    for name, strat in strategies.items():
+        signals = strategy_signals(strat, df, ctx, **options)
+        # one vectorised join of the signals onto the bars, then array fills;
+        # any open position is closed at the final price
+        if intrabar:
+            buy, sell, exit_price = align_signals(df.index, signals, prices=True)
+        else:
+            (buy, sell), exit_price = align_signals(df.index, signals), None
+        result = simulate_fills(price, buy, sell, initial_balance=initial_balance, exit_price=exit_price)
         metrics[name] = {
-            "total_return": total_ret,
-            "win_rate": win_rate,
-            "drawdown": drawdown,
+            "total_return": result["total_return"],
+            "win_rate": result["win_rate"],
+            "drawdown": result["drawdown"],
+            "trades": result["trades"],
+            "equity_curve": result["equity_curve"],
         }
     return metrics
-
@@ -1,7 +1,7 @@
 import os
 from typing import Callable, Dict
 import pandas as pd
-from services.data_service import fetch_ohlcv
+from services.backtest_service import strategy_signals
 from services.simulation import Simulation
 
 
@@ -29,16 +29,20 @@ def compute_metrics(trade_history):
 class Backtester:
     """Utility for running strategy backtests."""
 
-    def __init__(self, strategies: Dict[str, Callable]):
+    def __init__(self, strategies: Dict[str, Callable], log_dir: str = os.path.join("logs", "backtests")):
         self.strategies = strategies
+        self.log_dir = log_dir
 
-    def run(self, symbol: str, timeframe: str, limit: int = 500):
-        df = fetch_ohlcv(symbol=symbol, timeframe=timeframe, limit=limit)
+    def run(self, symbol: str, timeframe: str, limit: int = 500, df: pd.DataFrame = None):
+        if df is None:
+            from services.data_service import fetch_ohlcv
+            df = fetch_ohlcv(symbol=symbol, timeframe=timeframe, limit=limit)
         results = {}
         for name, strategy in self.strategies.items():
-            sim = Simulation(log_dir=os.path.join("logs", "backtests"),
+            sim = Simulation(log_dir=self.log_dir,
                              log_file=f"{name.lower()}_backtest.csv")
-            signals = strategy(df.copy())
+            # trailing strategies return (signal, value, signals_df)
+            signals = strategy_signals(strategy, df)
             for _, row in signals.iterrows():
                 sim.place_order(row["signal"], row["price"])
             profit, drawdown, winrate = compute_metrics(sim.trade_history)
@@ -1,21 +1,56 @@
 import os
-import ccxt
+import threading
+
 import pandas as pd
 from dotenv import load_dotenv
 
+from services.exchange import get_exchange, load_markets
+from services.history_loader import HistoryLoader, RateLimiter
+from services.ohlcv_store import OHLCVStore, to_frame
+
 load_dotenv()
 
-binance = ccxt.binance({
-    'apiKey': os.getenv('BINANCE_API_KEY'),
-    'secret': os.getenv('BINANCE_API_SECRET'),
-    'enableRateLimit': True,
-    'options': {
-        'defaultType': 'spot'
-    }
-})
-
-def fetch_ohlcv(symbol="BTC/USDT", timeframe="5m", limit=100):
-    ohlcv = binance.fetch_ohlcv(symbol, timeframe, limit=limit)
+# the client (and ccxt with it) is only built when something actually has to
+# go to the exchange; reading cached candles never does
+EXCHANGE_ID = "binance"
+
+# candles are cached on disk and only the tail is fetched from the exchange;
+# set OHLCV_CACHE=0 to always download the full window instead
+OHLCV_CACHE = os.getenv("OHLCV_CACHE", "1") == "1"
+store = OHLCVStore(os.getenv("OHLCV_CACHE_DIR", os.path.join("data", "ohlcv")))
+# the largest page Binance hands out for klines
+MAX_PAGE = 1000
+
+_history = None
+_history_lock = threading.Lock()
+
+
+def get_client():
+    """The Binance client, created on first use with its markets from the disk cache."""
+    client = get_exchange(EXCHANGE_ID)
+    load_markets(client)
+    return client
+
+
+def get_history():
+    """The shared :class:`HistoryLoader` (created on first use)."""
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = HistoryLoader(get_client(), store, rate_limiter=RateLimiter(rate=10), page_limit=MAX_PAGE)
+    return _history
+
+
+def __getattr__(name):
+    # ``binance`` and ``history`` used to be module attributes built at import
+    if name == "binance":
+        return get_client()
+    if name == "history":
+        return get_history()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _frame_from_exchange(ohlcv):
     df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
     df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
     # many strategy modules expect a ``price`` column which mirrors ``close``.
@@ -23,5 +58,63 @@ def fetch_ohlcv(symbol="BTC/USDT", timeframe="5m", limit=100):
     df['price'] = df['close']
     return df
 
+
+def fetch_ohlcv(symbol="BTC/USDT", timeframe="5m", limit=100, refresh=True):
+    """Return the newest ``limit`` candles for ``symbol``/``timeframe``.
+
+    With the cache enabled only bars from the newest stored one onwards are
+    requested (that bar is refetched since it may have still been forming),
+    plus whatever part of the window lies before the oldest stored bar;
+    everything else is served from the local store.  A store whose newest bar
+    is older than the window is caught up from that bar, so it never holds
+    a gap.  ``refresh=False`` skips
+    the exchange entirely when the store already holds ``limit`` bars.
+    """
+    if not OHLCV_CACHE:
+        return _frame_from_exchange(get_client().fetch_ohlcv(symbol, timeframe, limit=limit))
+
+    exchange_id = EXCHANGE_ID
+    if refresh or store.count(exchange_id, symbol, timeframe) < limit:
+        binance = get_client()
+        history = get_history()
+        tf_ms = binance.parse_timeframe(timeframe) * 1000
+        # open time of the oldest of the ``limit`` bars ending with the forming one
+        window_start = (binance.milliseconds() // tf_ms - (limit - 1)) * tf_ms
+        if store.last_timestamp(exchange_id, symbol, timeframe) is None and limit <= MAX_PAGE:
+            # cold cache: one regular request for the whole window
+            store.append(exchange_id, symbol, timeframe, binance.fetch_ohlcv(symbol, timeframe, limit=limit))
+        else:
+            # bring the tail up to date from the newest stored bar and backfill
+            # the front of the window if the store does not reach back that far
+            history.download(symbol, timeframe, since=window_start)
+
+    return to_frame(store.read(exchange_id, symbol, timeframe, limit=limit))
+
+
+def load_history(symbol="BTC/USDT", timeframe="5m", since=None, until=None):
+    """Download (or resume) ``[since, until)`` into the store and return it.
+
+    ``since``/``until`` are epoch milliseconds; ``until`` defaults to now and
+    ``since`` to the oldest stored candle (so only the tail is refreshed).
+    """
+    get_history().download(symbol, timeframe, since=since, until=until)
+    return to_frame(store.read(EXCHANGE_ID, symbol, timeframe, start=since, end=until))
+
+def fetch_resampled(symbol="BTC/USDT", timeframe="5m", limit=100, base="1m", refresh=True):
+    """The newest ``limit`` ``timeframe`` bars, built from the ``base`` series.
+
+    A drop-in for :func:`fetch_ohlcv` (the last row is the bar still
+    forming) where only the base candles go through the exchange and the
+    store, so every timeframe of a symbol shares one download; with
+    ``refresh=False`` and enough base bars stored no request is made at all.
+    """
+    from services.resampler import resample, timeframe_ms
+
+    per_bar = timeframe_ms(timeframe) // timeframe_ms(base)
+    # one extra bar's worth so the oldest bucket is complete
+    df = fetch_ohlcv(symbol=symbol, timeframe=base, limit=(limit + 1) * per_bar, refresh=refresh)
+    return resample(df, timeframe, base=base, closed_only=False).iloc[-limit:].reset_index(drop=True)
+
+
 def get_available_timeframes():
     return ["1m", "3m", "5m", "15m", "30m", "1h", "2h", "4h", "6h", "8h", "12h", "1d"]
@@ -0,0 +1,101 @@
+# services/exchange.py
+"""Exchange clients built on first use, with market metadata cached on disk.
+
+Importing ``ccxt`` alone takes about half a second and ``load_markets()`` is
+a multi-megabyte request on Binance, so neither should happen just because a
+module was imported.  :func:`get_exchange` creates one client per exchange
+id the first time it is asked for (``ccxt`` is imported then), and
+:func:`load_markets` serves ``exchange.markets`` from a JSON file under
+``MARKETS_CACHE_DIR`` (default ``data/markets``) while it is younger than
+``MARKETS_TTL`` seconds (default one day).
+"""
+import json
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MARKETS_CACHE_DIR = os.getenv("MARKETS_CACHE_DIR", os.path.join("data", "markets"))
+MARKETS_TTL = float(os.getenv("MARKETS_TTL", "86400"))
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def exchange_config(exchange_id):
+    """Client options for ``exchange_id``; keys come from ``<ID>_API_KEY`` / ``<ID>_API_SECRET``."""
+    prefix = exchange_id.upper()
+    return {
+        "apiKey": os.getenv(f"{prefix}_API_KEY"),
+        "secret": os.getenv(f"{prefix}_API_SECRET"),
+        "enableRateLimit": True,
+        "options": {"defaultType": "spot"},
+    }
+
+
+def get_exchange(exchange_id="binance", **config):
+    """The shared ccxt client for ``exchange_id``, created on the first call.
+
+    ``config`` is merged over :func:`exchange_config` and only applies when
+    the client is created.
+    """
+    client = _clients.get(exchange_id)
+    if client is None:
+        with _lock:
+            client = _clients.get(exchange_id)
+            if client is None:
+                import ccxt
+
+                client = getattr(ccxt, exchange_id)({**exchange_config(exchange_id), **config})
+                _clients[exchange_id] = client
+    return client
+
+
+def markets_path(exchange_id, cache_dir=None):
+    return os.path.join(cache_dir or MARKETS_CACHE_DIR, f"{exchange_id}.json")
+
+
+def read_markets(exchange_id, ttl=None, cache_dir=None):
+    """Cached ``{"saved", "markets", "currencies"}`` for ``exchange_id``, or None when missing or stale."""
+    ttl = MARKETS_TTL if ttl is None else ttl
+    try:
+        with open(markets_path(exchange_id, cache_dir), encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() - cached.get("saved", 0) > ttl:
+        return None
+    return cached
+
+
+def write_markets(exchange, cache_dir=None):
+    path = markets_path(exchange.id, cache_dir)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"saved": time.time(), "markets": exchange.markets,
+                   "currencies": exchange.currencies}, f, default=str)
+    os.replace(tmp, path)
+
+
+def load_markets(exchange, ttl=None, reload=False, cache_dir=None):
+    """``exchange.load_markets()`` backed by the disk cache.
+
+    A fresh cache file is handed to ``exchange.set_markets`` without any
+    request; otherwise the markets are fetched and the file rewritten.
+    ``reload=True`` always fetches.
+    """
+    if exchange.markets and not reload:
+        return exchange.markets
+    cached = None if reload else read_markets(exchange.id, ttl, cache_dir)
+    if cached is not None:
+        return exchange.set_markets(cached["markets"], cached.get("currencies"))
+    markets = exchange.load_markets(reload=True)
+    try:
+        write_markets(exchange, cache_dir)
+    except OSError as e:
+        print(f"[WARN] could not cache {exchange.id} markets: {e}")
+    return markets
@@ -0,0 +1,222 @@
+# services/fake_exchange.py
+"""Offline stand-in for a ccxt exchange.
+
+Serves deterministic synthetic candles for any symbol/timeframe, so loaders,
+runners and backtests can be exercised without network access.  Only the
+bits of the ccxt interface this repo uses are implemented.
+"""
+import asyncio
+import json
+import threading
+import time
+import zlib
+
+import numpy as np
+
+_TIMEFRAME_SECONDS = {"m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+class FakeExchange:
+    """Looks enough like ``ccxt.binance`` for ``fetch_ohlcv``-based code.
+
+    Parameters
+    ----------
+    now_ms : int, optional
+        Frozen "current time"; defaults to the wall clock.
+    history_start_ms : int
+        No candles exist before this time.
+    latency : float
+        Seconds to sleep per request, to imitate a network round trip.
+    max_limit : int
+        Largest page the exchange hands out, like Binance's 1000.
+    """
+
+    id = "fake"
+
+    def __init__(self, now_ms=None, history_start_ms=1_577_836_800_000,
+                 latency=0.0, max_limit=1000):
+        self.now_ms = now_ms
+        self.history_start_ms = history_start_ms
+        self.latency = latency
+        self.max_limit = max_limit
+        self.calls = 0
+        self._calls_lock = threading.Lock()
+
+    @staticmethod
+    def parse_timeframe(timeframe):
+        return int(timeframe[:-1]) * _TIMEFRAME_SECONDS[timeframe[-1]]
+
+    def milliseconds(self):
+        return self.now_ms if self.now_ms is not None else int(time.time() * 1000)
+
+    def load_markets(self):
+        return {s: {"symbol": s} for s in ("BTC/USDT", "ETH/USDT", "BNB/USDT")}
+
+    def candles(self, symbol, timeframe, start_ms, count):
+        """Synthetic candles starting at bar-aligned ``start_ms``."""
+        tf_ms = self.parse_timeframe(timeframe) * 1000
+        ts = start_ms + tf_ms * np.arange(count, dtype=np.int64)
+        k = (ts // 60_000).astype(float)  # minute number, same path for every timeframe
+        seed = zlib.crc32(symbol.encode()) % 1000
+        base = 100.0 + seed * 50
+
+        def path(x):
+            noise = np.sin(x * 12.9898 + seed) * 43758.5453
+            noise -= np.floor(noise)
+            return base * (1 + 0.05 * np.sin(x / 1440) + 0.01 * np.sin(x / 97) + 0.002 * (noise - 0.5))
+
+        close = path(k)
+        open_ = path(k - tf_ms / 60_000)
+        high = np.maximum(open_, close) * 1.0005
+        low = np.minimum(open_, close) * 0.9995
+        volume = 10 + 5 * np.abs(np.sin(k / 13))
+        return [list(row) for row in zip(ts.tolist(), open_, high, low, close, volume)]
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None, params=None):
+        with self._calls_lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self._serve(symbol, timeframe, since, limit)
+
+    def _serve(self, symbol, timeframe, since, limit):
+        tf_ms = self.parse_timeframe(timeframe) * 1000
+        limit = min(limit or 500, self.max_limit)
+        # the newest bar is the one still forming
+        newest = self.milliseconds() // tf_ms * tf_ms
+        if since is None:
+            start = newest - (limit - 1) * tf_ms
+        else:
+            start = -(-since // tf_ms) * tf_ms  # first bar at or after ``since``
+        start = max(start, -(-self.history_start_ms // tf_ms) * tf_ms)
+        count = min(limit, (newest - start) // tf_ms + 1)
+        if count <= 0:
+            return []
+        return self.candles(symbol, timeframe, start, count)
+
+
+class AsyncFakeExchange(FakeExchange):
+    """``ccxt.async_support`` flavoured :class:`FakeExchange`.
+
+    Latency is awaited instead of slept, so concurrent requests overlap the
+    way real network round trips do.
+    """
+
+    async def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None, params=None):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._serve(symbol, timeframe, since, limit)
+
+    async def close(self):
+        pass
+
+
+class FakeKlineServer:
+    """Local stand-in for the Binance kline websocket, backed by a :class:`FakeExchange`.
+
+    Clients connect to ``<url>/<symbol>@kline_<tf>`` (e.g. ``btcusdt@kline_1m``).
+    Every ``bar_seconds`` of real time the exchange clock jumps one bar ahead
+    and each client gets the bar that just closed (``"x": true``), so a
+    stream of 1m bars can be tested in seconds.  ``drop_after`` closes every
+    connection after that many bars, to exercise reconnects, and
+    ``connect_delay`` holds every handshake back that many seconds, so bars
+    close while a client is (re)connecting.  Needs the optional
+    ``websockets`` package.
+    """
+
+    def __init__(self, exchange=None, timeframe="1m", bar_seconds=0.2, host="127.0.0.1", port=0,
+                 drop_after=None, connect_delay=0.0):
+        self.exchange = exchange or FakeExchange()
+        self.timeframe = timeframe
+        self.tf_ms = FakeExchange.parse_timeframe(timeframe) * 1000
+        if self.exchange.now_ms is None:
+            self.exchange.now_ms = int(time.time() * 1000) // self.tf_ms * self.tf_ms
+        self.bar_seconds = bar_seconds
+        self.host = host
+        self.port = port
+        self.drop_after = drop_after
+        self.connect_delay = connect_delay
+        self.connections = 0
+        self.sent = {}  # bar open time (ms) -> wall clock when it was pushed
+        self._clients = {}  # websocket -> [symbol, bars sent]
+        self._loop = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}/ws"
+
+    def _symbol(self, stream):
+        name = stream.split("@")[0].upper()
+        for symbol in self.exchange.load_markets():
+            if symbol.replace("/", "") == name:
+                return symbol
+        return name
+
+    async def _process_request(self, ws, request):
+        if self.connect_delay:
+            await asyncio.sleep(self.connect_delay)
+        return None
+
+    async def _handler(self, ws):
+        self.connections += 1
+        stream = ws.request.path.rstrip("/").rsplit("/", 1)[-1]
+        symbol = self._symbol(stream)
+        self._clients[ws] = [symbol, 0]
+        try:
+            await ws.wait_closed()
+        finally:
+            self._clients.pop(ws, None)
+
+    async def _tick(self):
+        while True:
+            await asyncio.sleep(self.bar_seconds)
+            closed_ms = self.exchange.now_ms // self.tf_ms * self.tf_ms
+            self.exchange.now_ms = closed_ms + self.tf_ms
+            self.sent[closed_ms] = time.time()
+            for ws, client in list(self._clients.items()):
+                symbol = client[0]
+                t, o, h, l, c, v = self.exchange.candles(symbol, self.timeframe, closed_ms, 1)[0]
+                msg = {"e": "kline", "E": self.exchange.now_ms, "s": symbol.replace("/", ""),
+                       "k": {"t": t, "T": t + self.tf_ms - 1, "i": self.timeframe, "o": str(o), "h": str(h),
+                             "l": str(l), "c": str(c), "v": str(v), "x": True}}
+                try:
+                    await ws.send(json.dumps(msg))
+                except Exception:
+                    continue
+                client[1] += 1
+                if self.drop_after and client[1] >= self.drop_after:
+                    await ws.close()
+
+    def start(self):
+        """Serve from a background thread; returns ``self`` once listening."""
+        import websockets
+
+        async def main():
+            async with websockets.serve(self._handler, self.host, self.port,
+                                        process_request=self._process_request) as server:
+                self.port = server.sockets[0].getsockname()[1]
+                self._ready.set()
+                await self._tick()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._main = self._loop.create_task(main())
+            try:
+                self._loop.run_until_complete(self._main)
+            except asyncio.CancelledError:
+                pass
+            finally:
+                self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="fake-kline-server", daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._main.cancel)
+            self._thread.join(timeout=5)
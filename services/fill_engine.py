@@ -0,0 +1,130 @@
+# services/fill_engine.py
+"""Array-based replacement for feeding signals bar by bar to ``BacktestSimulation``.
+
+Signals are aligned to the bar index in one step, the long/flat position is
+derived with a forward fill, and trade returns plus the per-bar equity curve
+come out as NumPy arrays.  The metrics are computed exactly the way
+:meth:`services.simulation.BacktestSimulation.get_metrics` computes them.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _bar_positions(bar_index, signals):
+    """Positions of the signal rows in ``bar_index`` (-1: not a bar) and the frame."""
+    if "timestamp" in getattr(signals, "columns", ()):
+        signals = signals.set_index("timestamp")
+    bar_index = pd.Index(bar_index)
+    if bar_index.is_monotonic_increasing and bar_index.dtype == signals.index.dtype:
+        # binary search instead of hashing every bar of a long index
+        keys = signals.index.to_numpy()
+        bars = bar_index.to_numpy()
+        pos = np.minimum(bars.searchsorted(keys), len(bars) - 1)
+        pos[bars[pos] != keys] = -1
+    else:
+        pos = bar_index.get_indexer(signals.index)
+    return pos, signals
+
+
+def align_signals(bar_index, signals, prices=False):
+    """Turn a signal frame into BUY/SELL masks over ``bar_index``.
+
+    ``signals`` is indexed by (or has a column named) ``timestamp`` with a
+    ``signal`` column; rows whose timestamp is not a bar are ignored.  With
+    ``prices=True`` the price of each SELL row on its bar (NaN elsewhere) is
+    returned as a third array, for :func:`simulate_fills`'s ``exit_price``.
+    """
+    n = len(bar_index)
+    buy = np.zeros(n, dtype=bool)
+    sell = np.zeros(n, dtype=bool)
+    exit_price = np.full(n, np.nan) if prices else None
+    if signals is None or len(signals) == 0 or n == 0:
+        return (buy, sell, exit_price) if prices else (buy, sell)
+    pos, signals = _bar_positions(bar_index, signals)
+    found = pos >= 0
+    sig = np.asarray(signals["signal"], dtype=object)[found]
+    pos = pos[found]
+    buy[pos[sig == "BUY"]] = True
+    sell[pos[sig == "SELL"]] = True
+    if prices:
+        exit_price[pos[sig == "SELL"]] = np.asarray(signals["price"], dtype=float)[found][sig == "SELL"]
+        return buy, sell, exit_price
+    return buy, sell
+
+
+def position_from_signals(buy, sell):
+    """Long (``True``) / flat per bar for a BUY-when-flat, SELL-when-long book.
+
+    A BUY while long and a SELL while flat are no-ops, so the position after a
+    bar is simply "the latest signal so far was a BUY".
+    """
+    n = len(buy)
+    event = np.zeros(n, dtype=np.int8)
+    event[sell] = -1
+    event[buy] = 1
+    last = np.where(event != 0, np.arange(n), -1)
+    np.maximum.accumulate(last, out=last)
+    return (last >= 0) & (event[np.maximum(last, 0)] == 1)
+
+
+def simulate_fills(price, buy, sell, initial_balance=1000.0, close_final=True, exit_price=None):
+    """Compounding all-in long backtest over bar arrays.
+
+    Parameters
+    ----------
+    price : array-like of float
+        Fill price per bar.
+    buy, sell : array-like of bool
+        Signal masks per bar (see :func:`align_signals`).
+    initial_balance : float
+    close_final : bool
+        Close an open position at the last bar, like ``BacktestSimulation.close_final``.
+    exit_price : array-like of float, optional
+        Fill price of a SELL per bar (NaN: ``price``), see :func:`align_signals`.
+
+    Returns
+    -------
+    dict
+        ``total_return``, ``win_rate``, ``drawdown`` (as ``BacktestSimulation``),
+        ``trades`` (per-trade returns), ``entries``/``exits`` (bar positions)
+        and ``equity_curve`` (marked-to-market balance per bar).
+    """
+    price = np.asarray(price, dtype=float)
+    n = len(price)
+    pos = position_from_signals(np.asarray(buy, bool), np.asarray(sell, bool))
+    prev = np.concatenate([[False], pos[:-1]])
+    entries = np.flatnonzero(pos & ~prev)
+    exits = np.flatnonzero(~pos & prev)
+    holding = pos.copy()
+    if close_final and n and pos[-1]:
+        # sold at the last price, even when the BUY came on the last bar
+        exits = np.append(exits, n - 1)
+        holding[-1] = False
+    entries_closed = entries[:len(exits)]
+
+    exit_fill = price if exit_price is None else np.where(np.isnan(exit_price), price, exit_price)
+    trades = exit_fill[exits] / price[entries_closed] - 1
+    # same multiplication order as BacktestSimulation: balance *= 1 + ret
+    trade_equity = np.cumprod(np.concatenate([[float(initial_balance)], 1 + trades]))
+
+    # equity per bar: realised balance, marked to market while in a position
+    closed_so_far = np.zeros(n, dtype=np.intp)
+    closed_so_far[exits] = 1
+    closed_so_far = np.cumsum(closed_so_far)
+    equity = trade_equity[closed_so_far]
+    if len(entries):
+        trade_id = np.cumsum(pos & ~prev) - 1
+        in_pos = np.flatnonzero(holding)
+        equity[in_pos] = equity[in_pos] * price[in_pos] / price[entries[trade_id[in_pos]]]
+
+    balance = trade_equity[-1]
+    peak = np.maximum.accumulate(trade_equity)
+    return {
+        "total_return": float(balance / initial_balance - 1),
+        "win_rate": float((trades > 0).sum() / len(trades)) if len(trades) else 0.0,
+        "drawdown": float(((peak - trade_equity) / peak).max()),
+        "trades": trades,
+        "entries": entries,
+        "exits": exits,
+        "equity_curve": equity,
+    }
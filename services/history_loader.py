@@ -0,0 +1,138 @@
+# services/history_loader.py
+"""Bulk OHLCV history download for backtests.
+
+Pages through ``since`` windows and writes every page straight into the
+:class:`~services.ohlcv_store.OHLCVStore`, so memory use does not grow with
+the length of the history.  Several (symbol, timeframe) jobs can run at once
+on a thread pool; they share one request budget.  The store itself records
+the progress: a download fills the gap before the oldest stored candle and
+then resumes after the newest one, so an interrupted download (or a store
+the live loop has been appending to) picks up where the data stops.  The
+gap before the oldest candle is filled newest first in segments of
+``segment_pages`` pages, each merged into the store as soon as it is
+complete, so an interruption loses at most one segment.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class RateLimiter:
+    """Token bucket shared by every thread that talks to one exchange.
+
+    ``rate`` requests (or weight units) per second with bursts up to
+    ``capacity``.
+    """
+
+    def __init__(self, rate=10.0, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, weight=1.0):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= weight:
+                    self._tokens -= weight
+                    return
+                wait = (weight - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class HistoryLoader:
+    """Download candle history from a ccxt-like exchange into a store.
+
+    Parameters
+    ----------
+    exchange
+        Anything with ``id``, ``parse_timeframe``, ``milliseconds`` and
+        ``fetch_ohlcv(symbol, timeframe, since=..., limit=...)``.
+    store : OHLCVStore
+    rate_limiter : RateLimiter, optional
+        Shared request budget; one is created if omitted.
+    page_limit : int
+        Candles requested per page.
+    segment_pages : int
+        Pages backfilled before they are merged into the store.  Every merge
+        rewrites the file, so this trades the work an interruption loses
+        against copying a long file over and over.
+    """
+
+    def __init__(self, exchange, store, rate_limiter=None, page_limit=1000, segment_pages=50):
+        self.exchange = exchange
+        self.store = store
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.page_limit = page_limit
+        self.segment_pages = segment_pages
+
+    # --- downloading ---
+    def _pages(self, symbol, timeframe, since, until):
+        """Pages of ``[since, until)`` (epoch ms), oldest first."""
+        tf_ms = self.exchange.parse_timeframe(timeframe) * 1000
+        while since < until:
+            self.rate_limiter.acquire()
+            page = self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=self.page_limit)
+            page = [row for row in page if row[0] < until]
+            if not page:
+                return
+            yield page
+            since = int(page[-1][0]) + tf_ms
+
+    def download(self, symbol, timeframe, since=None, until=None):
+        """Fetch ``[since, until)`` (epoch ms) into the store.
+
+        Candles missing before the oldest stored bar are backfilled first,
+        then the download resumes from the newest stored bar (refetched, it
+        may have still been forming) even when that is older than ``since``,
+        so the stored series never has a hole.  ``since`` defaults to the
+        oldest stored bar, i.e. only the tail is brought up to date.  Returns
+        the number of candles written.
+        """
+        ex_id = self.exchange.id
+        tf_ms = self.exchange.parse_timeframe(timeframe) * 1000
+        until = until if until is not None else self.exchange.milliseconds()
+        first = self.store.first_timestamp(ex_id, symbol, timeframe)
+        if since is None:
+            if first is None:
+                raise ValueError(f"{ex_id} {symbol} {timeframe}: nothing stored yet, pass since")
+            since = first
+
+        written = 0
+        # backfill ``[since, first)`` newest segment first; each one is in the
+        # store before the next is requested
+        segment_ms = self.segment_pages * self.page_limit * tf_ms
+        while first is not None and first - since >= tf_ms:
+            start = max(since, first - segment_ms)
+            added = self.store.prepend(ex_id, symbol, timeframe, self._pages(symbol, timeframe, start, first))
+            if not added:
+                break  # nothing older on the exchange
+            written += added
+            first = self.store.first_timestamp(ex_id, symbol, timeframe)
+        last = self.store.last_timestamp(ex_id, symbol, timeframe)
+        for page in self._pages(symbol, timeframe, since if last is None else last, until):
+            written += self.store.append(ex_id, symbol, timeframe, page)
+        return written
+
+    def download_many(self, jobs, since, until=None, max_workers=4):
+        """Run several ``(symbol, timeframe)`` downloads concurrently.
+
+        Returns ``{(symbol, timeframe): candles_written}``.  A failing job does
+        not stop the others; its exception is stored in place of the count.
+        """
+        until = until if until is not None else self.exchange.milliseconds()
+        results = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(self.download, symbol, tf, since, until): (symbol, tf)
+                       for symbol, tf in jobs}
+            for future, job in futures.items():
+                try:
+                    results[job] = future.result()
+                except Exception as e:
+                    print(f"[HISTORY] {job[0]} {job[1]} failed: {e}")
+                    results[job] = e
+        return results
@@ -0,0 +1,248 @@
+# services/indicator_cache.py
+"""Indicators computed once per (indicator, params) and shared by the strategies.
+
+Several strategies read the same series: RSI and CUSTOM both use a 14-bar
+RSI, MA_CROSS and BOLLINGER both use a 20-bar rolling mean.  Instead of every
+strategy computing its own copy, strategies ask a context for
+``("rsi", window=14)`` and the context computes each distinct key once,
+resolving dependencies first (``macd`` needs two ``ema`` series, the
+Bollinger bands need ``sma`` and ``std``).
+
+* :class:`IndicatorContext` -- whole columns for one candle frame (batch
+  functions, backtests, sweeps).  Results live in an :class:`IndicatorCache`,
+  an LRU that can be shared by the contexts of many symbols to bound memory.
+* :class:`StreamContext` -- the newest value of every registered indicator,
+  advanced once per closed bar for all the streaming strategies of one pair.
+
+Both use the same arithmetic as the code they replace (``ta``/pandas for the
+columns, :mod:`services.indicators` for the stream), so signals do not change.
+"""
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+import ta
+
+from services import indicators
+
+Indicator = namedtuple("Indicator", ["defaults", "deps", "batch", "stream"])
+
+
+def _source(p):
+    return [("source", {"column": p["source"]})]
+
+
+def _ewm(x, span):
+    return pd.Series(x).ewm(span=span, min_periods=span, adjust=False).mean().to_numpy()
+
+
+def _rsi(p, x):
+    return ta.momentum.RSIIndicator(close=pd.Series(x), window=p["window"]).rsi().to_numpy()
+
+
+def _band(sign):
+    def combine(p, mavg, std):
+        return mavg + sign * p["window_dev"] * std
+    return combine
+
+
+# name -> Indicator(defaults, deps(params), batch(params, *dep_arrays), stream(params))
+# ``stream(params)`` returns a callable taking the dependency values of one bar.
+INDICATORS = {
+    "rsi": Indicator(
+        {"window": 14, "source": "price"}, _source, _rsi,
+        lambda p: indicators.RSI(p["window"]).update),
+    "ema": Indicator(
+        {"span": 12, "source": "price"}, _source,
+        lambda p, x: _ewm(x, p["span"]),
+        lambda p: indicators.EMA(span=p["span"]).update),
+    "macd": Indicator(
+        {"window_fast": 12, "window_slow": 26, "source": "price"},
+        lambda p: [("ema", {"span": p["window_fast"], "source": p["source"]}),
+                   ("ema", {"span": p["window_slow"], "source": p["source"]})],
+        lambda p, fast, slow: fast - slow,
+        lambda p: lambda fast, slow: fast - slow),
+    "macd_signal": Indicator(
+        {"window_fast": 12, "window_slow": 26, "window_sign": 9, "source": "price"},
+        lambda p: [("macd", {"window_fast": p["window_fast"], "window_slow": p["window_slow"],
+                             "source": p["source"]})],
+        lambda p, macd: _ewm(macd, p["window_sign"]),
+        lambda p: indicators.EMA(span=p["window_sign"]).update),
+    "sma": Indicator(
+        {"window": 20, "source": "price"}, _source,
+        lambda p, x: pd.Series(x).rolling(p["window"]).mean().to_numpy(),
+        lambda p: indicators.RollingMean(p["window"]).update),
+    "std": Indicator(
+        {"window": 20, "ddof": 1, "source": "price"}, _source,
+        lambda p, x: pd.Series(x).rolling(p["window"]).std(ddof=p["ddof"]).to_numpy(),
+        lambda p: indicators.RollingStd(p["window"], ddof=p["ddof"]).update),
+    "min": Indicator(
+        {"window": 20, "source": "price"}, _source,
+        lambda p, x: pd.Series(x).rolling(p["window"]).min().to_numpy(),
+        lambda p: indicators.RollingMin(p["window"]).update),
+    "bb_high": Indicator(
+        {"window": 20, "window_dev": 2, "source": "price"},
+        lambda p: [("sma", {"window": p["window"], "source": p["source"]}),
+                   ("std", {"window": p["window"], "ddof": 0, "source": p["source"]})],
+        _band(1), lambda p: lambda mavg, std: _band(1)(p, mavg, std)),
+    "bb_low": Indicator(
+        {"window": 20, "window_dev": 2, "source": "price"},
+        lambda p: [("sma", {"window": p["window"], "source": p["source"]}),
+                   ("std", {"window": p["window"], "ddof": 0, "source": p["source"]})],
+        _band(-1), lambda p: lambda mavg, std: _band(-1)(p, mavg, std)),
+}
+
+
+def _params(name, params, alias):
+    if name == "source":
+        column = params["column"]
+        return (("column", alias.get(column, column)),)
+    if name not in INDICATORS:
+        raise KeyError(f"unknown indicator {name!r}")
+    merged = {**INDICATORS[name].defaults, **params}
+    unknown = set(merged) - set(INDICATORS[name].defaults)
+    if unknown:
+        raise TypeError(f"{name}: unexpected parameter(s) {sorted(unknown)}")
+    merged["source"] = alias.get(merged["source"], merged["source"])
+    return tuple(sorted(merged.items()))
+
+
+class IndicatorCache:
+    """LRU store of computed indicator columns.
+
+    One cache can back the :class:`IndicatorContext` of many symbols; once
+    more than ``maxsize`` columns are held the least recently used go first.
+    ``maxsize=None`` never evicts.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if self.maxsize is not None:
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+
+class IndicatorContext:
+    """Indicator columns of one candle frame, each computed at most once.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Candles with a ``close`` column (and optionally ``price``).
+    cache : IndicatorCache, optional
+        Where results are kept; a private unbounded cache by default.
+    key : hashable, optional
+        Identifies the frame inside a shared cache, e.g.
+        ``(symbol, timeframe, len(df), last_timestamp)``.  Contexts with the
+        same key reuse each other's columns, so the key must change whenever
+        the candles do.  Defaults to a key private to this context.
+    """
+
+    def __init__(self, df, cache=None, key=None):
+        self.df = df
+        self.cache = cache if cache is not None else IndicatorCache(maxsize=None)
+        self.key = key if key is not None else object()
+        # the strategies read ``price`` but it is normally just ``close``;
+        # treat them as one column so e.g. MA and Bollinger share their mean
+        self.alias = {}
+        if "price" not in df.columns or (
+                "close" in df.columns and np.array_equal(df["price"].to_numpy(dtype=float),
+                                                         df["close"].to_numpy(dtype=float))):
+            self.alias["price"] = "close"
+
+    def get(self, name, **params):
+        """Column of ``name`` with ``params`` as a float array aligned to the frame."""
+        return self._resolve(name, _params(name, params, self.alias), ())
+
+    def _resolve(self, name, params, stack):
+        entry = (self.key, name, params)
+        value = self.cache.get(entry)
+        if value is not None:
+            return value
+        if (name, params) in stack:
+            raise ValueError(f"circular indicator dependency at {name}{dict(params)}")
+        p = dict(params)
+        if name == "source":
+            value = self.df[p["column"]].to_numpy(dtype=float)
+        else:
+            spec = INDICATORS[name]
+            deps = [self._resolve(dep, _params(dep, dep_params, self.alias), stack + ((name, params),))
+                    for dep, dep_params in spec.deps(p)]
+            value = spec.batch(p, *deps)
+        self.cache.put(entry, value)
+        return value
+
+
+class StreamContext:
+    """Newest value of each registered indicator, advanced once per bar.
+
+    Strategies :meth:`require` their indicators up front and read them with
+    ``ctx[key]`` after the owner has called :meth:`update` for the bar; an
+    indicator required by several strategies is still updated once per bar.
+    """
+
+    def __init__(self):
+        self.alias = {"price": "close"}
+        self.bars = 0
+        self.values = {}
+        self._nodes = []  # (key, fn, dep_keys), dependencies first
+        self._keys = set()
+
+    def require(self, name, **params):
+        """Register ``name`` (and its dependencies); return the key to read it with."""
+        return self._register(name, _params(name, params, self.alias))
+
+    def _register(self, name, params):
+        key = (name, params)
+        if key in self._keys:
+            return key
+        if self.bars:
+            raise ValueError("register indicators before the first update()")
+        if name == "source":
+            self._keys.add(key)
+            return key
+        p = dict(params)
+        spec = INDICATORS[name]
+        dep_keys = [self._register(dep, _params(dep, dep_params, self.alias))
+                    for dep, dep_params in spec.deps(p)]
+        self._nodes.append((key, spec.stream(p), dep_keys))
+        self._keys.add(key)
+        self.values[key] = indicators.NAN
+        return key
+
+    def update(self, bar):
+        """Feed one closed bar to every registered indicator."""
+        close = float(bar["close"])
+        if "price" in bar and float(bar["price"]) != close:
+            raise ValueError("bar price differs from close; StreamContext assumes they are the same")
+        values = self.values
+        values[("source", (("column", "close"),))] = close
+        for key, fn, dep_keys in self._nodes:
+            values[key] = fn(*[values[k] for k in dep_keys])
+        self.bars += 1
+
+    def __getitem__(self, key):
+        return self.values[key]
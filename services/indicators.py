@@ -0,0 +1,258 @@
+# services/indicators.py
+"""Streaming (O(1) per bar) versions of the indicators used by the strategies.
+
+Each indicator is fed one closed bar at a time through ``update(x)`` and
+returns its current value, or ``nan`` while it is still warming up.  The
+arithmetic mirrors what pandas/``ta`` do internally, so feeding a whole
+series through ``update`` reproduces the batch columns bar for bar.
+"""
+import math
+import sys
+from collections import deque
+
+NAN = float("nan")
+
+
+class EMA:
+    """Exponential moving average, same as ``Series.ewm(adjust=False).mean()``.
+
+    Pass either ``span`` (MACD style) or ``alpha`` (Wilder style).
+    """
+
+    def __init__(self, span=None, alpha=None, min_periods=None):
+        if (span is None) == (alpha is None):
+            raise ValueError("pass exactly one of span or alpha")
+        # pandas converts everything to a centre of mass first; do the same so
+        # the weights are bit-identical.
+        com = (span - 1) / 2 if span is not None else (1 - alpha) / alpha
+        self.alpha = 1.0 / (1.0 + com)
+        self._old_wt = 1.0 - self.alpha
+        self.min_periods = int(min_periods if min_periods is not None else (span or 1))
+        self.nobs = 0
+        self._weighted = NAN
+        self.value = NAN
+
+    def update(self, x):
+        x = float(x)
+        if x == x:
+            self.nobs += 1
+        w = self._weighted
+        if w == w:
+            if x == x and w != x:
+                w = (self._old_wt * w + self.alpha * x) / (self._old_wt + self.alpha)
+        else:
+            w = x
+        self._weighted = w
+        self.value = w if self.nobs >= self.min_periods else NAN
+        return self.value
+
+
+class RSI:
+    """Wilder RSI, same as ``ta.momentum.RSIIndicator(...).rsi()``."""
+
+    def __init__(self, window=14):
+        self.window = window
+        self._up = EMA(alpha=1 / window, min_periods=window)
+        self._down = EMA(alpha=1 / window, min_periods=window)
+        self._prev = None
+        self.value = NAN
+
+    def update(self, close):
+        close = float(close)
+        # ta treats the undefined first diff as a zero move
+        diff = close - self._prev if self._prev is not None else NAN
+        self._prev = close
+        up = diff if diff > 0 else 0.0
+        down = -diff if diff < 0 else -0.0
+        emaup = self._up.update(up)
+        emadn = self._down.update(down)
+        if emadn == 0:
+            self.value = 100.0
+        else:
+            self.value = 100 - (100 / (1 + emaup / emadn))
+        return self.value
+
+
+class MACD:
+    """MACD line and signal line, same as ``ta.trend.MACD``."""
+
+    def __init__(self, window_fast=12, window_slow=26, window_sign=9):
+        self._fast = EMA(span=window_fast)
+        self._slow = EMA(span=window_slow)
+        self._sign = EMA(span=window_sign)
+        self.macd = NAN
+        self.signal = NAN
+
+    def update(self, close):
+        self.macd = self._fast.update(close) - self._slow.update(close)
+        self.signal = self._sign.update(self.macd)
+        return self.macd, self.signal
+
+
+class RollingMean:
+    """Fixed-window mean, same as ``Series.rolling(window).mean()``.
+
+    Keeps the Kahan-compensated running sum pandas uses (separate compensation
+    terms for values entering and leaving the window), so the result does not
+    drift away from the batch value over long streams.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self._buf = deque()
+        self._sum = 0.0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+        self._neg = 0
+        self._same = 0
+        self._last = NAN
+        self.value = NAN
+
+    def update(self, x):
+        x = float(x)
+        if len(self._buf) == self.window:
+            old = self._buf.popleft()
+            y = -old - self._comp_remove
+            t = self._sum + y
+            self._comp_remove = t - self._sum - y
+            self._sum = t
+            if math.copysign(1.0, old) < 0:
+                self._neg -= 1
+        self._buf.append(x)
+        y = x - self._comp_add
+        t = self._sum + y
+        self._comp_add = t - self._sum - y
+        self._sum = t
+        if math.copysign(1.0, x) < 0:
+            self._neg += 1
+        self._same = self._same + 1 if x == self._last else 1
+        self._last = x
+
+        n = len(self._buf)
+        if n < self.window:
+            self.value = NAN
+        else:
+            mean = self._sum / n
+            if self._same >= n:
+                mean = self._last
+            elif self._neg == 0 and mean < 0:
+                mean = 0.0
+            elif self._neg == n and mean > 0:
+                mean = 0.0
+            self.value = mean
+        return self.value
+
+
+# pandas recomputes a rolling variance from scratch when an update loses more
+# than this fraction of the sum of squares (catastrophic cancellation)
+_INV_COND_TOL = sys.float_info.epsilon * 1e3
+
+
+class RollingStd:
+    """Fixed-window standard deviation, same as ``rolling(window).std(ddof)``.
+
+    Welford's online update with removal, including pandas' fallback to a full
+    recompute of the window when the running sum of squares becomes unstable.
+    """
+
+    def __init__(self, window, ddof=1):
+        self.window = window
+        self.ddof = ddof
+        self._buf = deque()
+        self._reset()
+        self.value = NAN
+
+    def _reset(self):
+        self._nobs = 0
+        self._mean = 0.0
+        self._ssqdm = 0.0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+        self._unstable = False
+
+    def _add(self, x):
+        prev_m2 = self._ssqdm
+        self._nobs += 1
+        prev_mean = self._mean - self._comp_add
+        y = x - self._comp_add
+        t = y - self._mean
+        self._comp_add = t + self._mean - y
+        self._mean += t / self._nobs
+        self._ssqdm += (x - prev_mean) * (x - self._mean)
+        if prev_m2 * _INV_COND_TOL > self._ssqdm:
+            self._unstable = True
+
+    def _remove(self, x):
+        prev_m2 = self._ssqdm
+        self._nobs -= 1
+        if self._nobs:
+            prev_mean = self._mean - self._comp_remove
+            y = x - self._comp_remove
+            t = y - self._mean
+            self._comp_remove = t + self._mean - y
+            self._mean -= t / self._nobs
+            self._ssqdm -= (x - prev_mean) * (x - self._mean)
+            if prev_m2 * _INV_COND_TOL > self._ssqdm:
+                self._unstable = True
+        else:
+            self._mean = 0.0
+            self._ssqdm = 0.0
+            self._unstable = False
+
+    def update(self, x):
+        x = float(x)
+        if len(self._buf) == self.window:
+            self._remove(self._buf.popleft())
+        self._buf.append(x)
+        self._add(x)
+        if self._unstable:
+            self._reset()
+            for v in self._buf:
+                self._add(v)
+            self._unstable = False
+
+        n = self._nobs
+        if n < self.window or n <= self.ddof:
+            self.value = NAN
+        else:
+            self.value = math.sqrt(max(self._ssqdm / (n - self.ddof), 0.0))
+        return self.value
+
+
+class RollingMin:
+    """Fixed-window minimum using a monotonic deque (amortised O(1))."""
+
+    def __init__(self, window):
+        self.window = window
+        self._count = 0
+        self._q = deque()  # (index, value), values increasing
+        self.value = NAN
+
+    def update(self, x):
+        x = float(x)
+        i = self._count
+        self._count += 1
+        while self._q and self._q[-1][1] >= x:
+            self._q.pop()
+        self._q.append((i, x))
+        if self._q[0][0] <= i - self.window:
+            self._q.popleft()
+        self.value = self._q[0][1] if self._count >= self.window else NAN
+        return self.value
+
+
+class BollingerBands:
+    """Moving average and bands, same as ``ta.volatility.BollingerBands``."""
+
+    def __init__(self, window=20, window_dev=2):
+        self.window_dev = window_dev
+        self._mean = RollingMean(window)
+        self._std = RollingStd(window, ddof=0)
+        self.mavg = self.hband = self.lband = NAN
+
+    def update(self, close):
+        self.mavg = self._mean.update(close)
+        std = self._std.update(close)
+        self.hband = self.mavg + self.window_dev * std
+        self.lband = self.mavg - self.window_dev * std
+        return self.mavg, self.hband, self.lband
@@ -0,0 +1,139 @@
+# services/log_tail.py
+"""Follow a growing ``<strategy>_log.csv`` without re-reading it.
+
+:class:`LogTail` remembers how far into the file it has read and parses only
+the lines appended since the last :meth:`LogTail.refresh`, keeping the newest
+``maxlen`` rows in a ring buffer.  The cost of a refresh depends on how much
+was appended, not on how big the file has grown.  :class:`BinaryLogTail`
+does the same for the binary ``<strategy>_log.bin`` files.
+"""
+import csv
+import io
+import math
+import os
+from collections import deque, namedtuple
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from services.signal_log import SignalLog
+
+LogRow = namedtuple("LogRow", ["timestamp", "value", "price", "signal"])
+
+# bytes to look back on first open; comfortably more than ``maxlen`` rows
+_BYTES_PER_ROW = 256
+
+
+def _to_float(x):
+    try:
+        return float(x) if x != "" else math.nan
+    except ValueError:
+        return math.nan
+
+
+def _to_datetime(x):
+    try:
+        return datetime.fromisoformat(x)
+    except ValueError:
+        return None
+
+
+class LogTail:
+    """Ring buffer over the last ``maxlen`` rows of a CSV signal log."""
+
+    def __init__(self, path, maxlen=50):
+        self.path = path
+        self.maxlen = maxlen
+        self.rows = deque(maxlen=maxlen)
+        self.columns = None
+        self.offset = 0
+        self._partial = b""
+
+    def _reset(self):
+        self.rows.clear()
+        self.columns = None
+        self.offset = 0
+        self._partial = b""
+
+    def _open_at_tail(self, f, size):
+        """Read the header, then jump close to the end of a big file."""
+        header = f.readline()
+        self.columns = [c.strip().lower() for c in next(csv.reader([header.decode("utf-8")]))]
+        start = size - self.maxlen * _BYTES_PER_ROW
+        if start > f.tell():
+            f.seek(start)
+            f.readline()  # drop the partial line we landed in
+        self.offset = f.tell()
+
+    def refresh(self):
+        """Parse newly appended lines; return how many rows were added."""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return 0
+        if size < self.offset:
+            self._reset()  # truncated or replaced
+        if size == self.offset:
+            return 0
+
+        with open(self.path, "rb") as f:
+            if self.columns is None:
+                self._open_at_tail(f, size)
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+        self.offset += len(data)
+
+        data = self._partial + data
+        cut = data.rfind(b"\n") + 1
+        self._partial = data[cut:]
+        if not cut:
+            return 0
+
+        cols = self.columns
+        i_ts, i_sig = cols.index("timestamp"), cols.index("signal")
+        i_val = cols.index("value") if "value" in cols else None
+        i_px = cols.index("price") if "price" in cols else None
+        added = 0
+        for rec in csv.reader(io.StringIO(data[:cut].decode("utf-8"))):
+            if len(rec) < len(cols):
+                continue
+            self.rows.append(LogRow(
+                _to_datetime(rec[i_ts]),
+                _to_float(rec[i_val]) if i_val is not None else math.nan,
+                _to_float(rec[i_px]) if i_px is not None else math.nan,
+                rec[i_sig],
+            ))
+            added += 1
+        return added
+
+
+class BinaryLogTail:
+    """:class:`LogTail` for ``<strategy>_log.bin`` files (see :mod:`services.signal_log`).
+
+    Records are fixed width, so a refresh just maps the new ones; nothing is
+    parsed.
+    """
+
+    def __init__(self, path, maxlen=50):
+        self.path = path
+        self.maxlen = maxlen
+        self.rows = deque(maxlen=maxlen)
+        self.log = SignalLog(path)
+        self.seen = 0
+
+    def refresh(self):
+        """Pick up newly appended records; return how many rows were added."""
+        n = self.log.count()
+        if n < self.seen:
+            self.rows.clear()  # truncated or replaced
+            self.seen = 0
+        if n == self.seen:
+            return 0
+        new = self.log.records()[max(self.seen, n - self.maxlen):n]
+        self.seen = n
+        times = pd.to_datetime(np.asarray(new["timestamp"]), unit="ns").to_pydatetime()
+        signals = self.log.decode(new, "signal")
+        for ts, value, price, signal in zip(times, new["value"].tolist(), new["price"].tolist(), signals):
+            self.rows.append(LogRow(ts, value, price, signal))
+        return len(new)
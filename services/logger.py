@@ -1,5 +1,9 @@
 # services/logger.py
-import os, csv, math
+import os, csv, math, time, atexit, threading, queue
+
+from services.signal_log import SignalLog
+
+HEADER = ["timestamp","symbol","timeframe","value","price","signal","strategy_name"]
 
 def _safe_round(x, ndigits=2):
     """Return rounded float or empty string for None/NaN/non-numeric."""
@@ -13,21 +17,177 @@ def _safe_round(x, ndigits=2):
     except (ValueError, TypeError):
         return ""
 
+
+class TradeLogger:
+    """Writes the per-strategy ``<name>_log.csv`` files.
+
+    Keeps one open handle per strategy file and batches rows in memory; they
+    are written when ``max_rows`` rows are pending, when the oldest pending
+    row is ``max_delay`` seconds old, on :meth:`flush` and at :meth:`close`.
+    With ``background=True`` rows are handed to a writer thread, so the
+    caller never waits on the disk.
+
+    ``formats`` picks the files: ``"csv"`` (``<name>_log.csv``), ``"binary"``
+    (``<name>_log.bin``, see :mod:`services.signal_log`) or both.
+
+    Logging after :meth:`close` raises ``ValueError``, like writing to a
+    closed file, instead of the row silently going nowhere.
+    """
+
+    def __init__(self, log_dir="logs", max_rows=500, max_delay=1.0, background=False, formats=("csv",)):
+        unknown = set(formats) - {"csv", "binary"}
+        if unknown:
+            raise ValueError(f"unknown log format(s): {sorted(unknown)}")
+        self.log_dir = log_dir
+        self.formats = tuple(formats)
+        self._binary = {}
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.background = background
+        self._files = {}
+        self._pending = {}
+        self._pending_rows = 0
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._closed = False
+        if background:
+            self._queue = queue.SimpleQueue()
+            self._thread = threading.Thread(target=self._run, name="trade-logger", daemon=True)
+            self._thread.start()
+
+    def log(self, timestamp, symbol, timeframe, indicator_value, price, signal, strategy_name="UNKNOWN"):
+        # raw values; each format renders them when the batch is written
+        row = (timestamp, symbol, timeframe, indicator_value, price, signal, strategy_name)
+        name = str(strategy_name).lower()
+        with self._lock:
+            if self._closed:
+                raise ValueError("log() on a closed TradeLogger")
+            if self.background:
+                self._queue.put((name, row))
+            else:
+                self._add(name, row)
+
+    def flush(self):
+        """Write every pending row to disk."""
+        if self._closed:
+            return  # close() wrote everything
+        if self.background:
+            done = threading.Event()
+            self._queue.put(done)
+            done.wait()
+        else:
+            with self._lock:
+                self._write_pending()
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self.background:
+                self._queue.put(None)  # after every row already queued
+            else:
+                self._write_pending()
+        if self.background:
+            self._thread.join()
+        for f, _ in self._files.values():
+            f.close()
+        self._files.clear()
+        # a SignalLog opens its file per append, so once the last batch is in
+        # there is nothing left to release
+        self._binary.clear()
+
+    # --- internals (called with the lock held or from the writer thread) ---
+    def _add(self, name, row):
+        self._pending.setdefault(name, []).append(row)
+        self._pending_rows += 1
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+        if self._pending_rows >= self.max_rows or time.monotonic() - self._oldest >= self.max_delay:
+            self._write_pending()
+
+    def _writer(self, name):
+        if name not in self._files:
+            os.makedirs(self.log_dir, exist_ok=True)
+            path = os.path.join(self.log_dir, f"{name}_log.csv")
+            f = open(path, "a", newline="", encoding="utf-8")
+            w = csv.writer(f)
+            if f.tell() == 0:
+                w.writerow(HEADER)
+            self._files[name] = (f, w)
+        return self._files[name]
+
+    def _write_pending(self):
+        for name, rows in self._pending.items():
+            if not rows:
+                continue
+            if "csv" in self.formats:
+                f, w = self._writer(name)
+                w.writerows([
+                    [ts, symbol, timeframe, _safe_round(value), _safe_round(price),
+                     (signal if signal else "-"), strategy_name]
+                    for ts, symbol, timeframe, value, price, signal, strategy_name in rows
+                ])
+                f.flush()
+            if "binary" in self.formats:
+                if name not in self._binary:
+                    self._binary[name] = SignalLog(os.path.join(self.log_dir, f"{name}_log.bin"))
+                self._binary[name].append(rows)
+        self._pending.clear()
+        self._pending_rows = 0
+        self._oldest = None
+
+    def _run(self):
+        while True:
+            timeout = None
+            if self._oldest is not None:
+                timeout = max(0.0, self.max_delay - (time.monotonic() - self._oldest))
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._write_pending()
+                continue
+            if item is None:
+                self._write_pending()
+                return
+            if isinstance(item, threading.Event):
+                self._write_pending()
+                item.set()
+                continue
+            self._add(*item)
+
+
+def log_formats():
+    """Formats selected by ``LOG_FORMAT`` (default ``csv``)."""
+    return tuple(f.strip().lower() for f in os.getenv("LOG_FORMAT", "csv").split(",") if f.strip())
+
+
+_default_logger = None
+_default_lock = threading.Lock()
+
+def get_logger():
+    """The shared logger behind :func:`log_trade` (created on first use).
+
+    Thresholds come from ``LOG_FLUSH_ROWS``, ``LOG_FLUSH_SECONDS`` and
+    ``LOG_BACKGROUND``, the file formats from ``LOG_FORMAT`` (``csv``,
+    ``binary`` or ``csv,binary``); pending rows are written at interpreter exit.
+    """
+    global _default_logger
+    with _default_lock:
+        if _default_logger is None:
+            _default_logger = TradeLogger(
+                max_rows=int(os.getenv("LOG_FLUSH_ROWS", "500")),
+                max_delay=float(os.getenv("LOG_FLUSH_SECONDS", "1.0")),
+                background=os.getenv("LOG_BACKGROUND", "0") == "1",
+                formats=log_formats(),
+            )
+            atexit.register(_default_logger.close)
+        return _default_logger
+
+def flush_logs():
+    """Write any rows :func:`log_trade` is still holding in memory."""
+    if _default_logger is not None:
+        _default_logger.flush()
+
 def log_trade(timestamp, symbol, timeframe, indicator_value, price, signal, strategy_name="UNKNOWN"):
-    os.makedirs("logs", exist_ok=True)
-    path = os.path.join("logs", f"{str(strategy_name).lower()}_log.csv")
-    write_header = not os.path.exists(path)
-
-    with open(path, "a", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        if write_header:
-            w.writerow(["timestamp","symbol","timeframe","value","price","signal","strategy_name"])
-        w.writerow([
-            timestamp,
-            symbol,
-            timeframe,
-            _safe_round(indicator_value),
-            _safe_round(price),
-            (signal if signal else "-"),
-            strategy_name
-        ])
+    get_logger().log(timestamp, symbol, timeframe, indicator_value, price, signal, strategy_name)
@@ -0,0 +1,312 @@
+# services/market_feed.py
+"""Bar-close events from interchangeable market data sources.
+
+A feed hands out closed candles as they happen instead of the runner
+sleeping a fixed interval and then looking for new rows:
+
+* :class:`PollFeed`      -- REST polling, woken right after each bar boundary.
+* :class:`WebsocketFeed` -- an exchange kline stream (Binance format); needs
+  the optional ``websockets`` package.
+* :class:`ReplayFeed`    -- candles from a DataFrame or CSV, for offline runs.
+
+Every feed has the same two calls: :meth:`MarketFeed.history` returns the
+closed bars available now (for warming the strategies up) and iterating the
+feed yields each newly closed bar as a dict with ``timestamp`` (naive UTC
+``pd.Timestamp`` of the bar open), ``open``, ``high``, ``low``, ``close``,
+``volume`` and ``price``, the same records ``df.to_dict("records")`` gives.
+"""
+import asyncio
+import json
+import os
+import queue
+import threading
+import time
+
+import pandas as pd
+
+_UNIT_SECONDS = {"m": 60, "h": 3600, "d": 86400, "w": 604800}
+BINANCE_WS = "wss://stream.binance.com:9443/ws"
+
+
+def timeframe_seconds(timeframe):
+    return int(timeframe[:-1]) * _UNIT_SECONDS[timeframe[-1]]
+
+
+def bar_close_time(bar, timeframe):
+    """Epoch seconds at which ``bar`` closed."""
+    return bar["timestamp"].timestamp() + timeframe_seconds(timeframe)
+
+
+def _bar(ts_ms, o, h, l, c, v):
+    return {"timestamp": pd.Timestamp(int(ts_ms), unit="ms"), "open": float(o), "high": float(h),
+            "low": float(l), "close": float(c), "volume": float(v), "price": float(c)}
+
+
+class MarketFeed:
+    """Base class; subclasses implement :meth:`history` and :meth:`__iter__`."""
+
+    symbol = None
+    timeframe = None
+
+    def history(self):
+        """Closed bars available right now as a DataFrame (oldest first)."""
+        raise NotImplementedError
+
+    def __iter__(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class PollFeed(MarketFeed):
+    """REST polling aligned to bar boundaries.
+
+    Sleeps until ``delay`` seconds after the next bar closes, then fetches;
+    if the exchange does not have the bar yet it retries every ``retry``
+    seconds.  A fetch error is printed and retried after ``error_delay``.
+
+    Parameters
+    ----------
+    fetch : callable
+        ``fetch(symbol=..., timeframe=..., limit=...) -> DataFrame``, e.g.
+        :func:`services.data_service.fetch_ohlcv`.
+    limit : int
+        Candles fetched for :meth:`history` (the forming one included); size
+        it from the strategies' lookback.  Later polls only ask for the bars
+        closed since the last one seen, capped at ``limit``.
+    clock, sleep : callable
+        Injected for tests; default to the wall clock.
+    """
+
+    def __init__(self, fetch, symbol, timeframe, limit=100, delay=0.5, retry=0.5,
+                 error_delay=60.0, clock=time.time, sleep=time.sleep):
+        self.fetch = fetch
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.tf = timeframe_seconds(timeframe)
+        self.limit = limit
+        self.delay = delay
+        self.retry = retry
+        self.error_delay = error_delay
+        self.clock = clock
+        self.sleep = sleep
+        self.last_ts = None
+        self._closed = False
+
+    def _fetch_limit(self):
+        if self.last_ts is None:
+            return self.limit
+        # bars opened since the last one seen (the forming one included), plus one for clock skew
+        missed = int((self.clock() - self.last_ts.timestamp()) // self.tf)
+        return max(2, min(self.limit, missed + 1))
+
+    def _closed_bars(self):
+        df = self.fetch(symbol=self.symbol, timeframe=self.timeframe, limit=self._fetch_limit())
+        if "price" not in df.columns:
+            df["price"] = df["close"]
+        # the newest row is the candle still forming; right after a boundary
+        # the exchange may not have opened the next one yet, in which case the
+        # row before it is not final either and is picked up on a retry
+        df = df.iloc[:-1]
+        now = pd.Timestamp(self.clock(), unit="s")
+        return df[df["timestamp"] + pd.Timedelta(seconds=self.tf) <= now]
+
+    def history(self):
+        closed = self._closed_bars()
+        if len(closed):
+            self.last_ts = closed["timestamp"].iloc[-1]
+        return closed.reset_index(drop=True)
+
+    def __iter__(self):
+        while not self._closed:
+            now = self.clock()
+            next_close = (now // self.tf + 1) * self.tf
+            self.sleep(max(0.0, next_close + self.delay - now))
+            while not self._closed:
+                try:
+                    closed = self._closed_bars()
+                except Exception as e:
+                    print(f"[ERROR] {self.symbol} {self.timeframe} fetch: {e}")
+                    self.sleep(self.error_delay)
+                    break
+                new = closed if self.last_ts is None else closed[closed["timestamp"] > self.last_ts]
+                if len(new) and new["timestamp"].iloc[-1].timestamp() + self.tf >= next_close:
+                    for bar in new.to_dict("records"):
+                        self.last_ts = bar["timestamp"]
+                        yield bar
+                    break
+                if self.clock() > next_close + self.tf:
+                    break  # the exchange skipped the bar; wait for the next one
+                self.sleep(self.retry)
+
+    def close(self):
+        self._closed = True
+
+
+class ReplayFeed(MarketFeed):
+    """Candles from ``source`` (a DataFrame or CSV path) replayed as bar closes.
+
+    The first ``warmup`` bars are :meth:`history`; the rest are yielded one by
+    one, ``speed`` times faster than real time (``0``: no waiting at all).
+    """
+
+    def __init__(self, source, symbol="REPLAY", timeframe="1m", warmup=100, speed=0.0, sleep=time.sleep):
+        if source is None:
+            raise ValueError("ReplayFeed needs a source: a candle DataFrame or CSV path "
+                             "(set MARKET_FEED_REPLAY when MARKET_FEED=replay)")
+        if isinstance(source, (str, os.PathLike)):
+            df = pd.read_csv(source, parse_dates=["timestamp"])
+        else:
+            df = source.copy()
+        if "price" not in df.columns:
+            df["price"] = df["close"]
+        self.df = df.reset_index(drop=True)
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.warmup = warmup
+        self.speed = speed
+        self.sleep = sleep
+
+    def history(self):
+        return self.df.iloc[:self.warmup]
+
+    def __iter__(self):
+        pause = timeframe_seconds(self.timeframe) / self.speed if self.speed else 0.0
+        for bar in self.df.iloc[self.warmup:].to_dict("records"):
+            if pause:
+                self.sleep(pause)
+            yield bar
+
+
+class WebsocketFeed(MarketFeed):
+    """Closed klines pushed by an exchange websocket (Binance message format).
+
+    The connection runs on an asyncio loop in a background thread and hands
+    bars over through a queue.  On every connect, bars closed since the last
+    one seen (after :meth:`history`, or while the socket was down) are filled
+    in from ``fetch`` when one is given.
+
+    Parameters
+    ----------
+    fetch : callable, optional
+        REST fetch as for :class:`PollFeed`; used for :meth:`history` and gap
+        filling.  Without it :meth:`history` is empty.
+    url : str
+        Base websocket URL; the stream name (``btcusdt@kline_5m``) is appended.
+    """
+
+    def __init__(self, symbol, timeframe, fetch=None, limit=100, url=BINANCE_WS,
+                 reconnect_delay=1.0, max_reconnect_delay=30.0):
+        try:
+            import websockets  # noqa: F401  (optional dependency)
+        except ImportError as e:
+            raise ImportError("WebsocketFeed needs the 'websockets' package (pip install websockets)") from e
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.fetch = fetch
+        self.limit = limit
+        self.stream = f"{symbol.replace('/', '').lower()}@kline_{timeframe}"
+        self.url = f"{url.rstrip('/')}/{self.stream}"
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.last_ts = None
+        self._queue = queue.SimpleQueue()
+        self._loop = None
+        self._task = None
+        self._thread = None
+        self._stop = threading.Event()
+        self.connected = threading.Event()
+
+    def history(self):
+        if self.fetch is None:
+            return pd.DataFrame(columns=["timestamp", "open", "high", "low", "close", "volume", "price"])
+        df = PollFeed(self.fetch, self.symbol, self.timeframe, self.limit).history()
+        if len(df):
+            self.last_ts = df["timestamp"].iloc[-1]
+        return df
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run_loop, name=f"ws-{self.stream}", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        self._task = self._loop.create_task(self._listen())
+        try:
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self._queue.put(e)
+        finally:
+            self._loop.close()
+
+    async def _listen(self):
+        import websockets
+
+        delay = self.reconnect_delay
+        while not self._stop.is_set():
+            try:
+                async with websockets.connect(self.url) as ws:
+                    self.connected.set()
+                    self._fill_gap()
+                    async for message in ws:
+                        if self._stop.is_set():
+                            return
+                        delay = self.reconnect_delay  # the stream works; back off from scratch next time
+                        k = json.loads(message).get("k")
+                        if k and k.get("x"):
+                            self._queue.put(_bar(k["t"], k["o"], k["h"], k["l"], k["c"], k["v"]))
+            except Exception as e:  # refused, dropped, bad handshake, ...
+                self.connected.clear()
+                if self._stop.is_set():
+                    return
+                print(f"[WARN] {self.stream}: {e!r}; reconnecting in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _fill_gap(self):
+        if self.fetch is None or self.last_ts is None:
+            return
+        try:
+            closed = PollFeed(self.fetch, self.symbol, self.timeframe, self.limit)._closed_bars()
+        except Exception as e:
+            print(f"[ERROR] {self.stream} gap fill: {e}")
+            return
+        for bar in closed[closed["timestamp"] > self.last_ts].to_dict("records"):
+            self._queue.put(bar)
+
+    def __iter__(self):
+        self.start()
+        while not self._stop.is_set():
+            item = self._queue.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            if self.last_ts is not None and item["timestamp"] <= self.last_ts:
+                continue  # already seen (gap fill overlapping the stream)
+            self.last_ts = item["timestamp"]
+            yield item
+
+    def close(self):
+        self._stop.set()
+        self._queue.put(None)
+        if self._thread is not None:
+            if self._task is not None:
+                self._loop.call_soon_threadsafe(self._task.cancel)
+            self._thread.join(timeout=5)
+
+
+def make_feed(kind, symbol, timeframe, fetch=None, **kwargs):
+    """Feed by name: ``"poll"``, ``"websocket"`` or ``"replay"`` (``source=`` required)."""
+    if kind == "poll":
+        return PollFeed(fetch, symbol, timeframe, **kwargs)
+    if kind == "websocket":
+        return WebsocketFeed(symbol, timeframe, fetch=fetch, **kwargs)
+    if kind == "replay":
+        return ReplayFeed(kwargs.pop("source"), symbol=symbol, timeframe=timeframe, **kwargs)
+    raise ValueError(f"unknown market feed {kind!r}; use poll, websocket or replay")
@@ -0,0 +1,262 @@
+# services/metrics.py
+"""Low-overhead runtime metrics for the live loop.
+
+A :class:`Registry` holds counters, gauges and latency histograms keyed by
+name and labels.  Recording is a dict lookup, a ``bisect`` and a few
+additions under a lock, so it can stay on in production.  The registry is
+exposed two ways:
+
+* :func:`serve` -- a local HTTP endpoint with the Prometheus text format at
+  ``/metrics`` (and the JSON snapshot at ``/metrics.json``).
+* :func:`start_snapshots` -- a background thread writing the JSON snapshot
+  to a file every few seconds.
+
+``METRICS`` is the process-wide registry used by main.py.
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# seconds; from a cached strategy step up to a slow exchange round trip
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Bucketed observations (cumulative on output, as Prometheus expects)."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        out, total = [], 0
+        for c in self.counts:
+            total += c
+            out.append(total)
+        return out
+
+    def quantile(self, q):
+        """Upper bucket bound below which a share ``q`` of observations fall."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        for bound, total in zip(self.buckets + (float("inf"),), self.cumulative()):
+            if total >= rank:
+                return bound
+        return float("inf")
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def _fmt_value(v):
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v))
+
+
+class _Timer:
+    # a plain class rather than @contextmanager, which costs a generator per block
+    __slots__ = ("registry", "name", "labels", "t0")
+
+    def __init__(self, registry, name, labels):
+        self.registry, self.name, self.labels = registry, name, labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.name, time.perf_counter() - self.t0, **self.labels)
+        if exc_type is not None and issubclass(exc_type, Exception):
+            self.registry.inc(self.name.removesuffix("_seconds") + "_errors", **self.labels)
+        return False
+
+
+class Registry:
+    """Counters, gauges and histograms, each identified by ``name`` plus labels."""
+
+    def __init__(self, prefix="bot_", buckets=DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._help = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def describe(self, name, text):
+        """Set the ``# HELP`` line of ``name``."""
+        self._help[name] = text
+
+    def inc(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._gauges[_key(name, labels)] = value
+
+    def observe(self, name, value, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram(self.buckets)
+            hist.observe(value)
+
+    def timer(self, name, **labels):
+        """Context manager observing the duration of its block in ``name`` (seconds).
+
+        An exception escaping the block also counts in ``<name>_errors``
+        (``stage_seconds`` -> ``stage_errors``).
+        """
+        return _Timer(self, name, labels)
+
+    # --- output ---
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            hists = sorted((k, (h.cumulative(), h.sum, h.count)) for k, h in self._histograms.items())
+        lines = []
+        seen = set()
+
+        def header(name, kind, suffix=""):
+            if name in seen:
+                return
+            seen.add(name)
+            if name in self._help:
+                lines.append(f"# HELP {self.prefix}{name}{suffix} {self._help[name]}")
+            lines.append(f"# TYPE {self.prefix}{name}{suffix} {kind}")
+
+        for (name, labels), value in counters:
+            header(name, "counter", "_total")
+            lines.append(f"{self.prefix}{name}_total{_fmt_labels(labels)} {_fmt_value(value)}")
+        for (name, labels), value in gauges:
+            header(name, "gauge")
+            lines.append(f"{self.prefix}{name}{_fmt_labels(labels)} {_fmt_value(value)}")
+        for (name, labels), (cumulative, total, count) in hists:
+            header(name, "histogram")
+            for bound, c in zip(self.buckets + (float("inf"),), cumulative):
+                lines.append(f"{self.prefix}{name}_bucket{_fmt_labels(labels, [('le', _fmt_value(bound))])} {c}")
+            lines.append(f"{self.prefix}{name}_sum{_fmt_labels(labels)} {_fmt_value(total)}")
+            lines.append(f"{self.prefix}{name}_count{_fmt_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """JSON-friendly dict; histograms are summarised as count/sum/mean/p50/p90/p99."""
+        def label_str(labels):
+            return ",".join(f"{k}={v}" for k, v in labels)
+
+        out = {"time": time.time(), "uptime": time.time() - self.started,
+               "counters": {}, "gauges": {}, "histograms": {}}
+        with self._lock:
+            for (name, labels), value in self._counters.items():
+                out["counters"].setdefault(name, {})[label_str(labels)] = value
+            for (name, labels), value in self._gauges.items():
+                out["gauges"].setdefault(name, {})[label_str(labels)] = value
+            for (name, labels), h in self._histograms.items():
+                out["histograms"].setdefault(name, {})[label_str(labels)] = {
+                    "count": h.count, "sum": h.sum,
+                    "mean": h.sum / h.count if h.count else None,
+                    "p50": h.quantile(0.5), "p90": h.quantile(0.9), "p99": h.quantile(0.99),
+                }
+        return out
+
+    def write_snapshot(self, path):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=1, default=str)
+        os.replace(tmp, path)
+
+
+def serve(registry, port, host="127.0.0.1"):
+    """Serve ``registry`` on ``http://host:port/metrics`` from a daemon thread.
+
+    Returns the server; ``server.shutdown()`` stops it.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] == "/metrics":
+                body, ctype = registry.render().encode(), "text/plain; version=0.0.4"
+            elif self.path.split("?")[0] == "/metrics.json":
+                body, ctype = json.dumps(registry.snapshot(), default=str).encode(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass  # keep scrapes out of the bot's console
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def start_snapshots(registry, path, interval=30.0):
+    """Write ``registry.snapshot()`` to ``path`` every ``interval`` seconds (daemon thread)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            try:
+                registry.write_snapshot(path)
+            except OSError as e:
+                print(f"[METRICS] snapshot failed: {e}")
+
+    threading.Thread(target=run, name="metrics-snapshot", daemon=True).start()
+    return stop
+
+
+METRICS = Registry()
+
+
+def start_from_env(registry=METRICS):
+    """Start the endpoint/snapshots selected by ``METRICS_PORT`` and ``METRICS_JSON``.
+
+    ``METRICS_PORT`` (unset or 0: off) serves on ``METRICS_HOST`` (default
+    127.0.0.1); ``METRICS_JSON`` is the snapshot path, written every
+    ``METRICS_JSON_SECONDS`` (default 30).
+    """
+    port = int(os.getenv("METRICS_PORT", "0") or 0)
+    if port:
+        serve(registry, port, host=os.getenv("METRICS_HOST", "127.0.0.1"))
+        print(f"[INFO] Metrics on http://{os.getenv('METRICS_HOST', '127.0.0.1')}:{port}/metrics")
+    path = os.getenv("METRICS_JSON")
+    if path:
+        start_snapshots(registry, path, float(os.getenv("METRICS_JSON_SECONDS", "30")))
@@ -0,0 +1,181 @@
+# services/ohlcv_store.py
+"""Append-only on-disk candle store.
+
+Candles live in one flat binary file per (exchange, symbol, timeframe) made of
+fixed-width records (see ``RECORD``), sorted by timestamp.  Reads are
+memory-mapped, so serving the last few hundred bars of a multi-year file
+costs the same as serving them from a tiny one, and appends only touch the
+end of the file.  Backfilling older candles (:meth:`OHLCVStore.prepend`) is
+the one operation that rewrites a file.
+"""
+import os
+import shutil
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RECORD = np.dtype([
+    ("timestamp", "<i8"),  # bar open time, epoch milliseconds
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+
+
+def to_records(rows):
+    """Convert ccxt style ``[[ts, o, h, l, c, v], ...]`` rows to ``RECORD``s."""
+    if isinstance(rows, np.ndarray) and rows.dtype == RECORD:
+        return rows
+    arr = np.asarray(rows, dtype=float).reshape(-1, 6)
+    out = np.empty(len(arr), dtype=RECORD)
+    out["timestamp"] = arr[:, 0].astype(np.int64)
+    for i, name in enumerate(RECORD.names[1:], start=1):
+        out[name] = arr[:, i]
+    return out
+
+
+def _sorted_unique(records):
+    ts = records["timestamp"]
+    if len(ts) > 1 and (ts[1:] < ts[:-1]).any():
+        records = records[np.argsort(ts, kind="stable")]
+    keep = np.ones(len(records), dtype=bool)
+    keep[1:] = records["timestamp"][1:] != records["timestamp"][:-1]
+    return records[keep]
+
+
+def to_frame(records):
+    """DataFrame in the shape ``data_service.fetch_ohlcv`` returns."""
+    df = pd.DataFrame({name: records[name] for name in RECORD.names})
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    df['price'] = df['close']
+    return df
+
+
+class OHLCVStore:
+    """Candle files under ``root/<exchange>/<symbol>/<timeframe>.bin``."""
+
+    def __init__(self, root=os.path.join("data", "ohlcv")):
+        self.root = Path(root)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def path(self, exchange, symbol, timeframe):
+        safe_symbol = symbol.replace("/", "-").replace(":", "_")
+        return self.root / exchange / safe_symbol / f"{timeframe}.bin"
+
+    def _lock(self, path):
+        with self._locks_guard:
+            return self._locks.setdefault(path, threading.Lock())
+
+    def count(self, exchange, symbol, timeframe):
+        path = self.path(exchange, symbol, timeframe)
+        return path.stat().st_size // RECORD.itemsize if path.exists() else 0
+
+    def first_timestamp(self, exchange, symbol, timeframe):
+        """Timestamp (ms) of the oldest stored bar, or ``None`` if empty."""
+        if not self.count(exchange, symbol, timeframe):
+            return None
+        with open(self.path(exchange, symbol, timeframe), "rb") as f:
+            return int(np.frombuffer(f.read(RECORD.itemsize), dtype=RECORD)["timestamp"][0])
+
+    def last_timestamp(self, exchange, symbol, timeframe):
+        """Timestamp (ms) of the newest stored bar, or ``None`` if empty."""
+        path = self.path(exchange, symbol, timeframe)
+        n = self.count(exchange, symbol, timeframe)
+        if not n:
+            return None
+        with open(path, "rb") as f:
+            f.seek((n - 1) * RECORD.itemsize)
+            return int(np.frombuffer(f.read(RECORD.itemsize), dtype=RECORD)["timestamp"][0])
+
+    def read(self, exchange, symbol, timeframe, start=None, end=None, limit=None):
+        """Return stored records as a (read-only, memory-mapped) array.
+
+        ``start``/``end`` are inclusive/exclusive epoch-ms bounds; ``limit``
+        keeps only the newest ``limit`` records of the selection.
+        """
+        n = self.count(exchange, symbol, timeframe)
+        if not n:
+            return np.empty(0, dtype=RECORD)
+        data = np.memmap(self.path(exchange, symbol, timeframe), dtype=RECORD, mode="r", shape=(n,))
+        lo = int(np.searchsorted(data["timestamp"], start)) if start is not None else 0
+        hi = int(np.searchsorted(data["timestamp"], end)) if end is not None else n
+        if limit is not None:
+            lo = max(lo, hi - limit)
+        return data[lo:hi]
+
+    def append(self, exchange, symbol, timeframe, rows):
+        """Add candles to the end of the file; return how many were written.
+
+        Rows at or before the newest stored bar are ignored, except for a bar
+        with exactly the newest timestamp: that one replaces the stored record,
+        because the last bar we saw may still have been forming.
+        """
+        records = to_records(rows)
+        if not len(records):
+            return 0
+        records = _sorted_unique(records)
+
+        path = self.path(exchange, symbol, timeframe)
+        with self._lock(path):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            last = self.last_timestamp(exchange, symbol, timeframe)
+            with open(path, "r+b" if last is not None else "wb") as f:
+                if last is not None:
+                    records = records[records["timestamp"] >= last]
+                    if len(records) and records["timestamp"][0] == last:
+                        f.seek(-RECORD.itemsize, os.SEEK_END)
+                        f.write(records[:1].tobytes())
+                        records = records[1:]
+                    f.seek(0, os.SEEK_END)
+                f.write(records.tobytes())
+        return len(records)
+
+    def prepend(self, exchange, symbol, timeframe, pages):
+        """Insert candles older than the oldest stored bar; return how many were written.
+
+        ``pages`` is an iterable of row batches, oldest first.  They are
+        streamed to a temporary ``.prepend`` file and the stored records are
+        copied after them, so memory does not grow with the length of the
+        backfill.  Nothing reaches the store until every page is in; if
+        fetching fails the temporary file is removed, and one left behind by
+        a killed process is deleted on the next call.  Rows at or after the
+        oldest stored bar are ignored; into an empty store this is the same
+        as appending every page.
+        """
+        path = self.path(exchange, symbol, timeframe)
+        tmp = path.with_suffix(".prepend")
+        tmp.unlink(missing_ok=True)
+        first = self.first_timestamp(exchange, symbol, timeframe)
+        if first is None:
+            return sum(self.append(exchange, symbol, timeframe, rows) for rows in pages)
+
+        written = 0
+        newest = None
+        try:
+            with open(tmp, "wb") as f:
+                for rows in pages:
+                    records = to_records(rows)
+                    if not len(records):
+                        continue
+                    records = _sorted_unique(records)
+                    records = records[records["timestamp"] < first]
+                    if newest is not None:
+                        records = records[records["timestamp"] > newest]
+                    if len(records):
+                        f.write(records.tobytes())
+                        written += len(records)
+                        newest = int(records["timestamp"][-1])
+            if not written:
+                return 0
+            with self._lock(path):
+                with open(tmp, "ab") as out, open(path, "rb") as src:
+                    shutil.copyfileobj(src, out)
+                os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        return written
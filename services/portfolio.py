@@ -0,0 +1,255 @@
+# services/portfolio.py
+"""Array-backed book for many strategies trading many symbols from one cash pool.
+
+:class:`Portfolio` keeps quantities, average entry prices, realised P/L and
+fees in ``(strategies, symbols)`` matrices next to a single cash balance.  A
+batch of fills is applied with a handful of NumPy operations whatever its
+size, and marking the whole book to market is one reduction, so hundreds
+of symbols per bar cost about the same as one.
+
+:func:`backtest_portfolio` runs the strategies over a dict of candle frames
+and trades their BUY/SELL signals through a portfolio bar by bar.
+"""
+import numpy as np
+import pandas as pd
+
+from services.backtest_service import strategy_signals
+from services.fill_engine import align_signals
+from services.indicator_cache import IndicatorContext
+
+
+class Portfolio:
+    """Cash plus a position per (strategy, symbol).
+
+    Parameters
+    ----------
+    strategies, symbols : list of str
+        Row and column labels of the book.
+    initial_cash : float
+    fee : float
+        Commission as a fraction of the traded notional (0.001 = 0.1 %).
+    slippage : float
+        Fraction of the price lost on every fill (buys pay more, sells get less).
+    position_size : float
+        Share of current equity a BUY commits to one (strategy, symbol) slot;
+        defaults to ``1 / (strategies * symbols)`` so every slot can be open
+        at once without leverage.
+    """
+
+    def __init__(self, strategies, symbols, initial_cash=10_000.0, fee=0.001, slippage=0.0,
+                 position_size=None):
+        self.strategies = list(strategies)
+        self.symbols = list(symbols)
+        self.strategy_index = {s: i for i, s in enumerate(self.strategies)}
+        self.symbol_index = {s: i for i, s in enumerate(self.symbols)}
+        shape = (len(self.strategies), len(self.symbols))
+        self.initial_cash = float(initial_cash)
+        self.cash = float(initial_cash)
+        self.fee = fee
+        self.slippage = slippage
+        self.position_size = position_size if position_size is not None else 1.0 / max(1, shape[0] * shape[1])
+        self.qty = np.zeros(shape)
+        self.avg_price = np.zeros(shape)
+        self.realized = np.zeros(shape)
+        self.fees = np.zeros(shape)
+        self.trades = np.zeros(shape, dtype=np.int64)  # closing fills
+        self.wins = np.zeros(shape, dtype=np.int64)
+        self.last_price = np.full(len(self.symbols), np.nan)
+        self.equity_curve = []
+
+    # --- fills ---
+    def fill(self, strategy, symbol, qty, price):
+        """Apply a batch of fills.
+
+        ``strategy``/``symbol`` are row/column positions (arrays of int),
+        ``qty`` is signed (positive buys) and ``price`` the quoted price;
+        slippage and fees are applied here.  Several fills for one slot in a
+        batch are netted at their volume-weighted price.
+        """
+        strategy = np.asarray(strategy, dtype=np.intp)
+        symbol = np.asarray(symbol, dtype=np.intp)
+        qty = np.asarray(qty, dtype=float)
+        price = np.asarray(price, dtype=float) * (1 + self.slippage * np.sign(qty))
+        keep = qty != 0
+        if not keep.any():
+            return
+        strategy, symbol, qty, price = strategy[keep], symbol[keep], qty[keep], price[keep]
+
+        notional = qty * price
+        fees = np.abs(notional) * self.fee
+        self.cash -= notional.sum() + fees.sum()
+
+        # net duplicates of a slot
+        flat = strategy * len(self.symbols) + symbol
+        slots, inverse = np.unique(flat, return_inverse=True)
+        dq = np.zeros(len(slots))
+        dn = np.zeros(len(slots))
+        df = np.zeros(len(slots))
+        np.add.at(dq, inverse, qty)
+        np.add.at(dn, inverse, notional)
+        np.add.at(df, inverse, fees)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            px = np.where(dq != 0, dn / dq, 0.0)
+        rows, cols = np.divmod(slots, len(self.symbols))
+
+        q0 = self.qty[rows, cols]
+        a0 = self.avg_price[rows, cols]
+        q1 = q0 + dq
+        closing = (q0 != 0) & (np.sign(dq) == -np.sign(q0))
+        closed = np.where(closing, np.minimum(np.abs(dq), np.abs(q0)) * np.sign(q0), 0.0)
+        pnl = closed * (px - a0)
+        flipped = closing & (np.sign(q1) == -np.sign(q0))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            grown = (q0 * a0 + dq * px) / q1
+        avg = np.where(q1 == 0, 0.0, np.where(flipped, px, np.where(closing, a0, grown)))
+
+        self.qty[rows, cols] = q1
+        self.avg_price[rows, cols] = avg
+        self.realized[rows, cols] += pnl
+        self.fees[rows, cols] += df
+        self.trades[rows, cols] += closing
+        self.wins[rows, cols] += closing & (pnl > 0)
+
+    def mark(self, prices):
+        """Mark the book at ``prices`` (one per symbol, NaN = unchanged); returns equity."""
+        prices = np.asarray(prices, dtype=float)
+        self.last_price = np.where(np.isnan(prices), self.last_price, prices)
+        equity = self.cash + np.nansum(self.qty.sum(axis=0) * self.last_price)
+        self.equity_curve.append(equity)
+        return equity
+
+    def equity(self):
+        return self.cash + np.nansum(self.qty.sum(axis=0) * self.last_price)
+
+    # --- sizing ---
+    def orders(self, buy, sell, prices):
+        """Signed quantities for ``(strategies, symbols)`` BUY/SELL masks.
+
+        A BUY on a flat slot buys ``position_size`` of the current equity
+        (scaled down together with the other buys when cash runs short); a
+        SELL closes a long slot.  Other signals are ignored.
+        """
+        prices = np.asarray(prices, dtype=float)
+        valid = ~np.isnan(prices)[None, :]
+        opening = buy & (self.qty == 0) & valid
+        closing = sell & (self.qty > 0) & valid
+        qty = np.where(closing, -self.qty, 0.0)
+        if opening.any():
+            budget = self.equity() * self.position_size
+            cost = budget * (1 + self.slippage) * (1 + self.fee)
+            # cash after this bar's sells, which are filled in the same batch
+            proceeds = np.sum(np.where(closing, self.qty, 0.0) * np.nan_to_num(prices)[None, :])
+            cash = self.cash + proceeds * (1 - self.slippage) * (1 - self.fee)
+            total = cost * opening.sum()
+            scale = min(1.0, max(0.0, cash) / total) if total > 0 else 0.0
+            with np.errstate(invalid="ignore", divide="ignore"):
+                qty = np.where(opening, budget * scale / prices[None, :], qty)
+        return qty
+
+    def step(self, buy, sell, prices):
+        """Trade the signals of one bar at ``prices`` and mark the book; returns equity."""
+        qty = self.orders(buy, sell, prices)
+        rows, cols = np.nonzero(qty)
+        if len(rows):
+            self.fill(rows, cols, qty[rows, cols], np.asarray(prices, dtype=float)[cols])
+        return self.mark(prices)
+
+    def close_all(self, prices=None):
+        """Sell every open position at ``prices`` (default: the last marks)."""
+        prices = self.last_price if prices is None else np.asarray(prices, dtype=float)
+        rows, cols = np.nonzero(self.qty)
+        if len(rows):
+            self.fill(rows, cols, -self.qty[rows, cols], prices[cols])
+
+    # --- reporting ---
+    def positions(self):
+        """One row per (strategy, symbol) slot that traded or is open."""
+        rows, cols = np.nonzero((self.qty != 0) | (self.fees != 0))
+        unrealized = self.qty * (self.last_price[None, :] - self.avg_price)
+        return pd.DataFrame({
+            "strategy": np.asarray(self.strategies, dtype=object)[rows],
+            "symbol": np.asarray(self.symbols, dtype=object)[cols],
+            "qty": self.qty[rows, cols],
+            "avg_price": self.avg_price[rows, cols],
+            "realized": self.realized[rows, cols],
+            "unrealized": unrealized[rows, cols],
+            "fees": self.fees[rows, cols],
+            "trades": self.trades[rows, cols],
+        })
+
+    def metrics(self):
+        """Whole-book ``total_return``, ``drawdown``, ``win_rate``, ``trades`` and ``fees``."""
+        curve = np.asarray(self.equity_curve if self.equity_curve else [self.equity()], dtype=float)
+        peak = np.maximum.accumulate(curve)
+        trades = int(self.trades.sum())
+        return {
+            "total_return": float(self.equity() / self.initial_cash - 1),
+            "drawdown": float(((peak - curve) / peak).max()),
+            "win_rate": float(self.wins.sum() / trades) if trades else 0.0,
+            "trades": trades,
+            "fees": float(self.fees.sum()),
+        }
+
+    def by_strategy(self):
+        """Realised P/L, fees and trades summed per strategy."""
+        return pd.DataFrame({
+            "realized": self.realized.sum(axis=1),
+            "fees": self.fees.sum(axis=1),
+            "trades": self.trades.sum(axis=1),
+            "open_positions": (self.qty != 0).sum(axis=1),
+        }, index=pd.Index(self.strategies, name="strategy"))
+
+
+def signal_masks(frames, strategies):
+    """BUY/SELL masks of shape ``(bars, strategies, symbols)`` plus prices ``(bars, symbols)``.
+
+    ``frames`` maps symbols to candle frames; they are aligned on the union of
+    their timestamps (a symbol without a bar has a NaN price there).
+    """
+    symbols = list(frames)
+    index = pd.Index(sorted(set().union(*(f["timestamp"] for f in frames.values()))), name="timestamp")
+    buy = np.zeros((len(index), len(strategies), len(symbols)), dtype=bool)
+    sell = np.zeros_like(buy)
+    prices = np.full((len(index), len(symbols)), np.nan)
+    for j, symbol in enumerate(symbols):
+        df = frames[symbol].set_index("timestamp")
+        if "price" not in df.columns:
+            df["price"] = df["close"]
+        prices[index.get_indexer(df.index), j] = df["price"].to_numpy(dtype=float)
+        ctx = IndicatorContext(df)
+        for i, strat in enumerate(strategies.values()):
+            b, s = align_signals(df.index, strategy_signals(strat, df, ctx))
+            rows = index.get_indexer(df.index)
+            buy[rows, i, j] = b
+            sell[rows, i, j] = s
+    return index, buy, sell, prices
+
+
+def backtest_portfolio(frames, strategies, close_final=True, **portfolio_args):
+    """Trade ``strategies`` on every frame in ``frames`` through one :class:`Portfolio`.
+
+    Parameters
+    ----------
+    frames : dict
+        ``{symbol: candles}`` with ``timestamp`` and ``close`` columns.
+    strategies : dict
+        ``{name: strategy function}`` as for :func:`services.backtest_service.run_backtest`.
+    close_final : bool
+        Sell whatever is still open at the last prices.
+    **portfolio_args
+        Passed to :class:`Portfolio` (``initial_cash``, ``fee``, ...).
+
+    Returns
+    -------
+    Portfolio
+        With ``equity_curve`` holding one value per bar of the aligned index.
+    """
+    index, buy, sell, prices = signal_masks(frames, strategies)
+    book = Portfolio(list(strategies), list(frames), **portfolio_args)
+    for t in range(len(index)):
+        book.step(buy[t], sell[t], prices[t])
+    if close_final:
+        book.close_all()
+        if book.equity_curve:
+            book.equity_curve[-1] = book.equity()
+    return book
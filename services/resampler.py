@@ -0,0 +1,228 @@
+# services/resampler.py
+"""Higher timeframes derived from one base (1m) candle series.
+
+Every timeframe the exchange offers is a whole number of 1m bars aligned to
+the epoch (weeks to Monday), so fetching the base series once is enough:
+
+* :func:`resample` / :func:`resample_all` aggregate a whole history at once
+  with ``reduceat`` over ``RECORD`` arrays (each timeframe built from the
+  largest finer timeframe that divides it, so a year of 1m into all of
+  them is a few passes over shrinking arrays).
+* :class:`Resampler` keeps the closed bars and the still-forming (partial)
+  bar of every timeframe up to date as base bars close, for the live loop.
+
+Bars come out in the shape :func:`services.data_service.fetch_ohlcv` returns.
+"""
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from services.market_feed import timeframe_seconds
+from services.ohlcv_store import RECORD, to_frame
+
+TIMEFRAMES = ["1m", "3m", "5m", "15m", "30m", "1h", "2h", "4h", "6h", "8h", "12h", "1d"]
+_WEEK_OFFSET_MS = 4 * 86_400_000  # 1970-01-01 was a Thursday; weekly bars open on Monday
+
+
+def timeframe_ms(timeframe):
+    return timeframe_seconds(timeframe) * 1000
+
+
+def bucket_start(ts_ms, timeframe):
+    """Open time (epoch ms) of the ``timeframe`` bar containing ``ts_ms`` (scalar or array)."""
+    tf = timeframe_ms(timeframe)
+    offset = _WEEK_OFFSET_MS if timeframe.endswith("w") else 0
+    return (ts_ms - offset) // tf * tf + offset
+
+
+def _records(df):
+    """``RECORD`` array from a candle frame (or pass a ``RECORD`` array through)."""
+    if isinstance(df, np.ndarray) and df.dtype == RECORD:
+        return df
+    out = np.empty(len(df), dtype=RECORD)
+    out["timestamp"] = df["timestamp"].to_numpy(dtype="datetime64[ms]").astype(np.int64)
+    for name in RECORD.names[1:]:
+        out[name] = df[name].to_numpy(dtype=float)
+    return out
+
+
+def _aggregate(rec, timeframe):
+    """Group sorted records into ``timeframe`` bars (the last one may be partial)."""
+    if not len(rec):
+        return rec[:0]
+    buckets = bucket_start(rec["timestamp"], timeframe)
+    starts = np.flatnonzero(np.concatenate([[True], buckets[1:] != buckets[:-1]]))
+    ends = np.concatenate([starts[1:], [len(rec)]]) - 1
+    out = np.empty(len(starts), dtype=RECORD)
+    out["timestamp"] = buckets[starts]
+    out["open"] = rec["open"][starts]
+    out["high"] = np.maximum.reduceat(rec["high"], starts)
+    out["low"] = np.minimum.reduceat(rec["low"], starts)
+    out["close"] = rec["close"][ends]
+    out["volume"] = np.add.reduceat(rec["volume"], starts)
+    return out
+
+
+def _closed(bars, timeframe, end_ms):
+    """Drop the last bar if it ends after ``end_ms`` (the close of the newest base bar)."""
+    if len(bars) and bars["timestamp"][-1] + timeframe_ms(timeframe) > end_ms:
+        return bars[:-1]
+    return bars
+
+
+def resample_all(df, timeframes=None, base="1m", closed_only=True, frames=True):
+    """Every timeframe in ``timeframes`` from the base candles ``df``.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame or numpy.ndarray
+        Base candles, oldest first (``timestamp``/``open``/.../``volume``
+        columns or a ``RECORD`` array).
+    timeframes : list of str
+        Defaults to :data:`TIMEFRAMES`.
+    base : str
+        Timeframe of ``df``.
+    closed_only : bool
+        Leave out the last bar of a timeframe when the base series does not
+        reach its close yet.
+    frames : bool
+        Return DataFrames (``fetch_ohlcv`` shape) rather than ``RECORD`` arrays.
+
+    Returns
+    -------
+    dict
+        ``{timeframe: bars}``.
+    """
+    rec = _records(df)
+    base_ms = timeframe_ms(base)
+    end_ms = int(rec["timestamp"][-1]) + base_ms if len(rec) else 0
+    # finest first, so each timeframe can start from the coarsest one that divides it
+    wanted = sorted(timeframes or TIMEFRAMES, key=timeframe_ms)
+    built = {base: rec}
+    out = {}
+    for tf in wanted:
+        if tf not in built:
+            tf_ms = timeframe_ms(tf)
+            if tf_ms % base_ms:
+                raise ValueError(f"{tf} is not a multiple of the base timeframe {base}")
+            offset = _WEEK_OFFSET_MS if tf.endswith("w") else 0
+            source = max((s for s in built
+                          if s == base or (not s.endswith("w") and tf_ms % timeframe_ms(s) == 0
+                                           and offset % timeframe_ms(s) == 0)),
+                         key=timeframe_ms)
+            built[tf] = _aggregate(built[source], tf)
+        bars = _closed(built[tf], tf, end_ms) if closed_only else built[tf]
+        out[tf] = to_frame(bars) if frames else bars
+    return out
+
+
+def resample(df, timeframe, base="1m", closed_only=True):
+    """``timeframe`` bars from the base candles ``df`` (see :func:`resample_all`)."""
+    return resample_all(df, [timeframe], base=base, closed_only=closed_only)[timeframe]
+
+
+def _bar(row):
+    ts, o, h, l, c, v = row
+    return {"timestamp": pd.Timestamp(int(ts), unit="ms"), "open": o, "high": h, "low": l,
+            "close": c, "volume": v, "price": c}
+
+
+class Resampler:
+    """Closed and partial bars of several timeframes, fed one base bar at a time.
+
+    Parameters
+    ----------
+    timeframes : list of str
+        Defaults to :data:`TIMEFRAMES`; the base timeframe is always kept.
+    base : str
+    max_bars : int
+        Closed bars kept per timeframe.
+    """
+
+    def __init__(self, timeframes=None, base="1m", max_bars=5000):
+        self.base = base
+        self.base_ms = timeframe_ms(base)
+        self.timeframes = sorted(set(timeframes or TIMEFRAMES) | {base}, key=timeframe_ms)
+        for tf in self.timeframes:
+            if timeframe_ms(tf) % self.base_ms:
+                raise ValueError(f"{tf} is not a multiple of the base timeframe {base}")
+        self.max_bars = max_bars
+        self._bars = {tf: deque(maxlen=max_bars) for tf in self.timeframes}
+        # per timeframe: [open time, open, high, low, close, volume] of the forming bar
+        self._partial = dict.fromkeys(self.timeframes)
+        self._spans = [(tf, timeframe_ms(tf), _WEEK_OFFSET_MS if tf.endswith("w") else 0)
+                       for tf in self.timeframes]
+        self.last_ts = None
+
+    @classmethod
+    def from_frame(cls, df, timeframes=None, base="1m", max_bars=5000):
+        """Resampler primed with a history of base candles in one vectorised pass."""
+        self = cls(timeframes, base=base, max_bars=max_bars)
+        rec = _records(df)
+        if not len(rec):
+            return self
+        end_ms = int(rec["timestamp"][-1]) + self.base_ms
+        for tf, bars in resample_all(rec, self.timeframes, base=base, closed_only=False,
+                                     frames=False).items():
+            closed = _closed(bars, tf, end_ms)
+            self._bars[tf].extend(closed[-max_bars:].tolist())
+            if len(closed) < len(bars):
+                self._partial[tf] = list(bars[-1].tolist())
+        self.last_ts = int(rec["timestamp"][-1])
+        return self
+
+    def update(self, bar):
+        """Add one closed base bar; returns ``{timeframe: [bars closed by it]}``.
+
+        ``bar`` is a dict/Series as the market feeds yield.  Bars at or before
+        the last one seen are ignored.  A timeframe's bar closes with its
+        last base bar; if base bars are missing it closes when the first bar
+        of a later bucket arrives.
+        """
+        ts = int(pd.Timestamp(bar["timestamp"]).value // 1_000_000)
+        if self.last_ts is not None and ts <= self.last_ts:
+            return {}
+        self.last_ts = ts
+        o, h, l, c = float(bar["open"]), float(bar["high"]), float(bar["low"]), float(bar["close"])
+        v = float(bar.get("volume", 0.0))
+        closed = {}
+        for tf, tf_ms, offset in self._spans:
+            start = (ts - offset) // tf_ms * tf_ms + offset
+            part = self._partial[tf]
+            if part is not None and part[0] != start:
+                self._close(tf, part, closed)  # base bars went missing
+                part = None
+            if part is None:
+                part = self._partial[tf] = [start, o, h, l, c, v]
+            else:
+                part[2] = max(part[2], h)
+                part[3] = min(part[3], l)
+                part[4] = c
+                part[5] += v
+            if ts + self.base_ms >= start + tf_ms:
+                self._close(tf, part, closed)
+        return closed
+
+    def _close(self, tf, part, closed):
+        row = tuple(part)
+        self._bars[tf].append(row)
+        self._partial[tf] = None
+        closed.setdefault(tf, []).append(_bar(row))
+
+    def frame(self, timeframe, limit=None, partial=False):
+        """Closed ``timeframe`` bars (newest ``limit``) as a ``fetch_ohlcv`` frame.
+
+        ``partial=True`` appends the forming bar, if any.
+        """
+        rows = list(self._bars[timeframe])
+        if limit is not None:
+            rows = rows[-limit:] if limit else []
+        if partial and self._partial[timeframe] is not None:
+            rows.append(tuple(self._partial[timeframe]))
+        return to_frame(np.array(rows, dtype=RECORD))
+
+    def partial(self, timeframe):
+        """The forming ``timeframe`` bar as a dict, or None."""
+        part = self._partial[timeframe]
+        return None if part is None else _bar(part)
@@ -0,0 +1,281 @@
+# services/robustness.py
+"""Monte Carlo robustness of a backtest.
+
+One backtest gives one total return, drawdown and win rate; how much of
+that is luck of the order and timing of trades is what this module
+estimates.  Each method resamples the backtest into many alternative paths
+and reports the spread of the metrics over them:
+
+* ``shuffle``   -- the same trades in random order.  Total return and win
+  rate do not change, the drawdown does.
+* ``bootstrap`` -- trades drawn with replacement.
+* ``block``     -- circular block bootstrap of the per-bar strategy returns
+  (marked to market), which keeps runs of consecutive bars together.  Bars
+  have no win rate, so only return and drawdown are reported.
+* ``offset``    -- the backtest started flat at a random bar, as
+  :func:`services.sweep.evaluate` does with ``start``: trades entered
+  before it are dropped.
+
+Paths are generated as ``(paths, trades)`` matrices a batch at a time and
+the chunks of every method run in a process pool.  Every chunk has its own
+seed spawned from ``seed``, so the result does not depend on ``workers``.
+"""
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from services.simulation import BacktestSimulation
+from strategies.registry import TRAILING_STRATEGIES
+
+METHODS = ["shuffle", "bootstrap", "block", "offset"]
+METRICS = ["total_return", "drawdown", "win_rate"]
+
+CHUNK_PATHS = 5000  # paths per pool task
+BATCH_ELEMENTS = 1 << 22  # matrix cells per batch (32 MB of float64)
+LOOP_MIN_PATHS = 256  # path_metrics steps through time from this many paths per batch
+
+# per-trade returns, entry/exit rows and exit prices, every BUY signal (row,
+# price), the per-bar strategy returns and the evaluate() metrics
+BacktestPath = namedtuple("BacktestPath", ["trades", "entries", "exits", "exit_prices", "buy_rows",
+                                           "buy_prices", "bar_returns", "metrics"])
+
+
+def backtest_path(df, strategy, params=None, initial_balance=1000.0):
+    """Backtest ``strategy`` on ``df`` like :func:`services.sweep.evaluate`, keeping the path.
+
+    Returns a :class:`BacktestPath`: the trade returns of
+    ``BacktestSimulation.trades`` with the rows and prices they entered and
+    exited at, every BUY signal (also those ignored while in a position),
+    the strategy's return on every bar (flat bars are 0; entries and exits
+    are taken at the signal prices, so the bar returns compound to the same
+    total) and the ``evaluate`` metrics.
+    """
+    fn = TRAILING_STRATEGIES[strategy]
+    _, _, signals = fn(df, return_df=True, **(params or {}))
+    close = df["close"].to_numpy(dtype=float)
+    sim = BacktestSimulation(initial_balance=initial_balance)
+    spans = []  # (entry row, entry price, exit row, exit price)
+    entry = None
+    buys = []
+    if signals is not None and not signals.empty:
+        rows = df.index.get_indexer(signals["timestamp"])
+        for sig, px, row in zip(signals["signal"].to_numpy(), signals["price"].to_numpy(dtype=float), rows):
+            if sig == "BUY":
+                buys.append((row, px))
+            if sig == "BUY" and entry is None:
+                entry = (row, px)
+            elif sig == "SELL" and entry is not None:
+                spans.append((*entry, row, px))
+                entry = None
+            sim.process_signal(sig, px)
+    if entry is not None:
+        spans.append((*entry, len(close) - 1, close[-1]))
+    sim.close_final(float(close[-1]))
+
+    bar_returns = np.zeros(len(close))
+    for i, buy, j, sell in spans:
+        if i == j:
+            bar_returns[j] = (1 + bar_returns[j]) * sell / buy - 1
+            continue
+        marks = close[i:j + 1].copy()
+        marks[0], marks[-1] = buy, sell
+        bar_returns[i + 1:j + 1] = marks[1:] / marks[:-1] - 1
+
+    total_return, win_rate, drawdown = sim.get_metrics()
+    metrics = {"total_return": float(total_return), "win_rate": float(win_rate),
+               "drawdown": float(drawdown), "trades": len(sim.trades)}
+    spans = np.array(spans, dtype=float).reshape(-1, 4)
+    buys = np.array(buys, dtype=float).reshape(-1, 2)
+    return BacktestPath(np.asarray(sim.trades, dtype=float), spans[:, 0].astype(np.int64),
+                        spans[:, 2].astype(np.int64), spans[:, 3], buys[:, 0].astype(np.int64),
+                        buys[:, 1], bar_returns, metrics)
+
+
+def path_metrics(returns, counted=None):
+    """Metrics of every row of a ``(paths, steps)`` matrix of simple returns.
+
+    The drawdown is measured on the compounded equity starting at 1, as
+    ``BacktestSimulation`` does.  ``counted`` (same shape, bool) limits the
+    win rate to the trades that actually happened on each path.
+    """
+    paths, steps = returns.shape
+    if paths >= LOOP_MIN_PATHS:
+        # many short paths: one step at a time across all of them, which is
+        # cheaper than cumprod/maximum.accumulate over the matrix (fastest
+        # when ``returns`` is the transpose of a (steps, paths) array)
+        equity, peak, low, ratio = np.ones(paths), np.ones(paths), np.ones(paths), np.empty(paths)
+        for r in returns.T:
+            np.multiply(equity, r, out=ratio)
+            equity += ratio
+            np.maximum(peak, equity, out=peak)
+            np.divide(equity, peak, out=ratio)
+            np.minimum(low, ratio, out=low)
+    else:
+        equity = np.cumprod(1 + returns, axis=1)
+        peak = np.maximum.accumulate(equity, axis=1)
+        np.maximum(peak, 1.0, out=peak)
+        low = np.divide(equity, peak, out=peak).min(axis=1, initial=1.0)
+        equity = equity[:, -1] if steps else np.ones(paths)
+    wins = returns > 0
+    if counted is None:
+        win_rate = wins.mean(axis=1) if steps else np.zeros(paths)
+    else:
+        n = counted.sum(axis=1)
+        win_rate = np.divide((wins & counted).sum(axis=1), n, out=np.zeros(paths), where=n > 0)
+    return {"total_return": equity - 1, "drawdown": 1 - low, "win_rate": win_rate}
+
+
+def _offset_paths(path, starts):
+    """Trade returns of the backtest started flat at each of the rows ``starts``.
+
+    Trades entered before the start are dropped.  If the full run was in a
+    trade at the start, the late run may still enter on a later BUY (one
+    the full run ignored) and leaves with that trade; that extra trade comes
+    first, then the full run's trades entered at or after the start.
+    """
+    held = np.searchsorted(path.entries, starts) - 1  # the full run's trade entered before the start
+    spanning = held >= 0
+    held = np.where(spanning, held, 0)
+    spanning &= path.exits[held] >= starts
+    nxt = np.searchsorted(path.buy_rows, starts)  # first BUY at or after the start
+    has_buy = nxt < len(path.buy_rows)
+    nxt = np.where(has_buy, nxt, 0)
+    extra = spanning & has_buy & (path.buy_rows[nxt] < path.exits[held])
+    late = np.where(extra, path.exit_prices[held] / path.buy_prices[nxt] - 1, 0.0)
+
+    # built as (steps, paths) and returned transposed, see path_metrics
+    counted = np.concatenate([extra[None], path.entries[:, None] >= starts], axis=0)
+    returns = np.concatenate([late[None], np.broadcast_to(path.trades[:, None], counted[1:].shape)], axis=0)
+    return np.where(counted, returns, 0.0).T, counted.T
+
+
+def _paths(method, rng, size, path, block, max_offset):
+    """One batch of ``size`` resampled paths: ``(returns, counted or None)``, paths by steps."""
+    trades, bar_returns = path.trades, path.bar_returns
+    if method == "shuffle":
+        return rng.permuted(np.broadcast_to(trades[:, None], (len(trades), size)), axis=0).T, None
+    if method == "bootstrap":
+        return trades[rng.integers(0, len(trades), (len(trades), size))].T, None
+    if method == "block":
+        n = len(bar_returns)
+        windows = sliding_window_view(np.concatenate([bar_returns, bar_returns[:block - 1]]), block)
+        return windows[rng.integers(0, n, (size, -(-n // block)))].reshape(size, -1)[:, :n], None
+    if method == "offset":
+        return _offset_paths(path, rng.integers(0, max_offset + 1, size))
+    raise ValueError(f"unknown method {method!r}; use one of {', '.join(METHODS)}")
+
+
+def _simulate_chunk(task):
+    method, n_paths, seed, path, options = task
+    rng = np.random.default_rng(seed)
+    width = len(path.bar_returns) if method == "block" else len(path.trades) + 1
+    batch = max(1, BATCH_ELEMENTS // max(1, width))
+    out = {name: [] for name in METRICS}
+    for done in range(0, n_paths, batch):
+        returns, counted = _paths(method, rng, min(batch, n_paths - done), path, **options)
+        for name, values in path_metrics(returns, counted).items():
+            out[name].append(values)
+    return method, {name: np.concatenate(values) for name, values in out.items()}
+
+
+def simulate(path, methods=None, n_paths=10_000, block=None, max_offset=0.5, workers=None, seed=None):
+    """Resampled metrics of a backtest.
+
+    Parameters
+    ----------
+    path : BacktestPath or array-like
+        From :func:`backtest_path`, or just the per-trade returns
+        (``BacktestSimulation.trades``), which allows ``shuffle`` and
+        ``bootstrap`` only.
+    methods : list of str
+        Subset of :data:`METHODS` (default: every one the input allows).
+    n_paths : int
+        Paths per method.
+    block : int, optional
+        Bars per block for ``block``; defaults to the mean holding time in
+        bars (at least ``len(bars) ** (1/3)``).
+    max_offset : float
+        ``offset`` starts are drawn from the first ``max_offset`` of the bars.
+    workers : int, optional
+        Process count; defaults to ``os.cpu_count()``.
+    seed : int, optional
+
+    Returns
+    -------
+    dict
+        ``{method: {metric: array of n_paths}}``.
+    """
+    if not isinstance(path, BacktestPath):
+        path = BacktestPath(np.asarray(path, dtype=float), *[None] * 6, {})
+    allowed = METHODS if path.bar_returns is not None else ["shuffle", "bootstrap"]
+    methods = list(methods or allowed)
+    for method in methods:
+        if method not in allowed:
+            raise ValueError(f"{method!r} needs a BacktestPath; per-trade returns allow {', '.join(allowed)}")
+    if not len(path.trades):
+        raise ValueError("the backtest made no trades")
+
+    n_bars = 0 if path.bar_returns is None else len(path.bar_returns)
+    if block is None and n_bars:
+        held = np.count_nonzero(path.bar_returns) / len(path.trades)
+        block = max(held, n_bars ** (1 / 3))
+    options = {"block": max(1, min(int(round(block or 1)), n_bars or 1)),
+               "max_offset": int(max_offset * max(n_bars - 1, 0))}
+
+    tasks = []
+    for method, method_seed in zip(methods, np.random.SeedSequence(seed).spawn(len(methods))):
+        sizes = [min(CHUNK_PATHS, n_paths - done) for done in range(0, n_paths, CHUNK_PATHS)]
+        tasks += [(method, size, chunk_seed, path, options)
+                  for size, chunk_seed in zip(sizes, method_seed.spawn(len(sizes)))]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_simulate_chunk, tasks))
+    else:
+        chunks = [_simulate_chunk(task) for task in tasks]
+    results = {}
+    for method, metrics in chunks:
+        for name, values in metrics.items():
+            results.setdefault(method, {}).setdefault(name, []).append(values)
+    return {method: {name: np.concatenate(parts) for name, parts in metrics.items()}
+            for method, metrics in results.items()}
+
+
+def summarize(results, observed=None, confidence=0.95):
+    """Confidence intervals per method and metric.
+
+    Returns a DataFrame with one row per (method, metric): the ``observed``
+    backtest value (if given), mean, standard deviation, the central
+    ``confidence`` interval (``lower``/``median``/``upper``) and the share
+    of paths that lost money (``total_return`` only).
+    """
+    tail = (1 - confidence) / 2
+    rows = []
+    for method, metrics in results.items():
+        for name in METRICS:
+            if method == "block" and name == "win_rate":
+                continue
+            values = metrics[name]
+            lower, median, upper = np.quantile(values, [tail, 0.5, 1 - tail])
+            rows.append({"method": method, "metric": name,
+                         "observed": (observed or {}).get(name, np.nan),
+                         "mean": values.mean(), "std": values.std(), "lower": lower,
+                         "median": median, "upper": upper,
+                         "p_loss": (values < 0).mean() if name == "total_return" else np.nan})
+    return pd.DataFrame(rows)
+
+
+def run_robustness(df, strategy, params=None, methods=None, n_paths=10_000, confidence=0.95,
+                   initial_balance=1000.0, **options):
+    """Backtest ``strategy`` once and summarize ``n_paths`` resamples per method.
+
+    ``options`` go to :func:`simulate`.  Returns ``(summary, path)``.
+    """
+    path = backtest_path(df, strategy, params, initial_balance)
+    results = simulate(path, methods=methods, n_paths=n_paths, **options)
+    return summarize(results, path.metrics, confidence), path
@@ -0,0 +1,232 @@
+# services/signal_log.py
+"""Fixed-width binary version of the ``<strategy>_log.csv`` signal logs.
+
+Every ``log_trade`` row becomes one packed ``RECORD`` (29 bytes): an epoch-ns
+timestamp, float64 value and price, and small integer codes for the signal,
+strategy, symbol and timeframe.  Codes are looked up in string tables kept
+in a JSON sidecar (``<file>.json``); ``-``/``BUY``/``SELL`` are always 0/1/2.
+
+A second sidecar (``<file>.idx``) is a sparse time index: the min and max
+timestamp of every ``BLOCK`` records, so a time-range read only touches the
+blocks that can match.  Reads are memory-mapped and return NumPy arrays
+without parsing anything; :func:`export_csv` turns a file back into the CSV
+layout for humans.
+"""
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+RECORD = np.dtype([
+    ("timestamp", "<i8"),  # epoch nanoseconds
+    ("value", "<f8"),
+    ("price", "<f8"),
+    ("signal", "u1"),
+    ("strategy", "u1"),
+    ("symbol", "<u2"),
+    ("timeframe", "u1"),
+])
+
+SIGNALS = ["-", "BUY", "SELL"]
+BLOCK = 1024  # records per sparse-index entry
+INDEX = np.dtype([("min", "<i8"), ("max", "<i8")])
+
+_TABLES = {"signal": 255, "strategy": 255, "symbol": 65535, "timeframe": 255}
+
+
+def _float(x):
+    try:
+        return float(x) if x is not None and x != "" else np.nan
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class SignalLog:
+    """One binary signal log file (plus its ``.json`` and ``.idx`` sidecars).
+
+    Appending is meant for a single writer; any number of processes can read
+    while it writes.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.meta_path = self.path + ".json"
+        self.index_path = self.path + ".idx"
+        self._lock = threading.Lock()
+        self._meta = None
+        self._meta_mtime = None
+
+    # --- string tables ---
+    def meta(self):
+        """``{"signal": [...], "strategy": [...], "symbol": [...], "timeframe": [...]}``."""
+        try:
+            mtime = os.path.getmtime(self.meta_path)
+        except OSError:
+            if self._meta is None:
+                self._meta = {"signal": list(SIGNALS), "strategy": [], "symbol": [], "timeframe": []}
+            return self._meta
+        if mtime != self._meta_mtime:
+            with open(self.meta_path, encoding="utf-8") as f:
+                self._meta = json.load(f)
+            self._meta_mtime = mtime
+        return self._meta
+
+    def _codes(self, table, values):
+        names = self.meta()[table]
+        lookup = {name: i for i, name in enumerate(names)}
+        out = np.empty(len(values), dtype=RECORD[table])
+        added = False
+        for i, v in enumerate(values):
+            code = lookup.get(v)
+            if code is None:
+                if len(names) > _TABLES[table]:
+                    raise ValueError(f"too many distinct {table} values for {self.path}")
+                code = lookup[v] = len(names)
+                names.append(v)
+                added = True
+            out[i] = code
+        return out, added
+
+    def _save_meta(self):
+        tmp = self.meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._meta, f)
+        os.replace(tmp, self.meta_path)
+        self._meta_mtime = os.path.getmtime(self.meta_path)
+
+    # --- writing ---
+    def append(self, rows):
+        """Append ``(timestamp, symbol, timeframe, value, price, signal, strategy_name)`` rows."""
+        if not rows:
+            return 0
+        ts, symbol, timeframe, value, price, signal, strategy = zip(*rows)
+        with self._lock:
+            rec = np.empty(len(rows), dtype=RECORD)
+            rec["timestamp"] = pd.to_datetime(pd.Series(ts), errors="coerce").to_numpy("datetime64[ns]").view("i8")
+            rec["value"] = [_float(v) for v in value]
+            rec["price"] = [_float(p) for p in price]
+            added = False
+            for table, values in (("signal", [s if s else "-" for s in signal]),
+                                  ("strategy", [str(s) for s in strategy]),
+                                  ("symbol", [str(s) for s in symbol]),
+                                  ("timeframe", [str(t) for t in timeframe])):
+                rec[table], new = self._codes(table, values)
+                added |= new
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            if added:
+                # tables first, so a reader never sees a code it cannot decode
+                self._save_meta()
+            with open(self.path, "ab") as f:
+                # drop a torn record left by a crash mid-write
+                tail = f.tell() % RECORD.itemsize
+                if tail:
+                    f.truncate(f.tell() - tail)
+                    f.seek(0, os.SEEK_END)
+                f.write(rec.tobytes())
+            self._update_index()
+        return len(rows)
+
+    def _update_index(self):
+        n = self.count()
+        have = os.path.getsize(self.index_path) // INDEX.itemsize if os.path.exists(self.index_path) else 0
+        full = n // BLOCK
+        if full <= have:
+            return
+        data = self.records()[have * BLOCK: full * BLOCK]["timestamp"].reshape(-1, BLOCK)
+        entries = np.empty(len(data), dtype=INDEX)
+        entries["min"] = data.min(axis=1)
+        entries["max"] = data.max(axis=1)
+        with open(self.index_path, "ab") as f:
+            f.write(entries.tobytes())
+
+    # --- reading ---
+    def count(self):
+        try:
+            return os.path.getsize(self.path) // RECORD.itemsize
+        except OSError:
+            return 0
+
+    def records(self):
+        """Every complete record as a read-only memory-mapped array."""
+        n = self.count()
+        if not n:
+            return np.empty(0, dtype=RECORD)
+        return np.memmap(self.path, dtype=RECORD, mode="r", shape=(n,))
+
+    def tail(self, n):
+        """The newest ``n`` records (a view, no copy)."""
+        data = self.records()
+        return data[max(0, len(data) - n):]
+
+    def read(self, start=None, end=None):
+        """Records with ``start <= timestamp < end`` (anything ``pd.Timestamp`` accepts).
+
+        Without bounds this is :meth:`records` itself.  With bounds only the
+        blocks whose index range overlaps are scanned; the result is a copy.
+        """
+        data = self.records()
+        if start is None and end is None:
+            return data
+        lo = pd.Timestamp(start).value if start is not None else np.iinfo(np.int64).min
+        hi = pd.Timestamp(end).value if end is not None else np.iinfo(np.int64).max
+        index = self.index()
+        hit = np.flatnonzero((index["max"] >= lo) & (index["min"] < hi))
+        spans = [data[b * BLOCK:(b + 1) * BLOCK] for b in hit]
+        spans.append(data[len(index) * BLOCK:])  # the not yet indexed tail
+        picked = np.concatenate(spans) if spans else data[:0]
+        ts = picked["timestamp"]
+        return picked[(ts >= lo) & (ts < hi)]
+
+    def index(self):
+        if not os.path.exists(self.index_path):
+            return np.empty(0, dtype=INDEX)
+        n = min(os.path.getsize(self.index_path) // INDEX.itemsize, self.count() // BLOCK)
+        if not n:
+            return np.empty(0, dtype=INDEX)
+        return np.memmap(self.index_path, dtype=INDEX, mode="r", shape=(n,))
+
+    def decode(self, records, table):
+        """Code column ``table`` of ``records`` as an object array of strings."""
+        names = np.asarray(self.meta()[table], dtype=object)
+        return names[records[table]]
+
+    def to_frame(self, records=None):
+        """Records as a DataFrame with the columns of the CSV log."""
+        records = self.records() if records is None else records
+        return pd.DataFrame({
+            "timestamp": pd.to_datetime(np.asarray(records["timestamp"]), unit="ns"),
+            "symbol": self.decode(records, "symbol"),
+            "timeframe": self.decode(records, "timeframe"),
+            "value": np.round(records["value"], 2),
+            "price": np.round(records["price"], 2),
+            "signal": self.decode(records, "signal"),
+            "strategy_name": self.decode(records, "strategy"),
+        })
+
+
+def export_csv(path, csv_path=None):
+    """Write binary log ``path`` as CSV (``rsi_log.bin`` -> ``rsi_log_export.csv`` by default).
+
+    The default name keeps clear of the ``*_log.csv`` files the CSV logger writes.
+    """
+    log = SignalLog(path)
+    csv_path = csv_path or (path[:-4] if path.endswith(".bin") else path) + "_export.csv"
+    log.to_frame().to_csv(csv_path, index=False, na_rep="")
+    return csv_path
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export binary signal logs to CSV.")
+    parser.add_argument("paths", nargs="+", help="logs/<strategy>_log.bin files")
+    parser.add_argument("--out-dir", help="directory for the CSV files (default: next to each log)")
+    args = parser.parse_args()
+    for p in args.paths:
+        out = None
+        if args.out_dir:
+            os.makedirs(args.out_dir, exist_ok=True)
+            out = os.path.join(args.out_dir, os.path.basename(p)[:-4] + "_export.csv")
+        print("Wrote", export_csv(p, out))
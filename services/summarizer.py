@@ -0,0 +1,259 @@
+# services/summarizer.py
+"""Incremental summary of the per-strategy signal logs.
+
+The summarize_*.py scripts used to read every log in full and rebuild the
+summary from scratch.  :class:`Summarizer` keeps a checkpoint instead: for
+every log the byte offset it has read up to, and per strategy the open
+position, running P/L and signal counts.  A rerun parses only the bytes
+appended since then (in chunks, several files at once) and folds them into
+the saved state, so its cost follows the new rows rather than the history.
+
+A full rebuild happens when there is no checkpoint, when a log was truncated
+or replaced, or when the trades file was rewritten by someone else.  Each
+script sharing a ``log_dir`` therefore needs its own ``trades_file``.
+"""
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from services.fill_engine import position_from_signals
+
+STATE_VERSION = 1
+OUTPUTS = {"summary_counts.csv", "summary_pnl.csv", "summary.txt", "trades.csv"}
+_HEAD_BYTES = 4096  # fingerprint of a file's start, to notice a replaced log
+
+
+def _head_hash(path, size):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read(min(size, _HEAD_BYTES))).hexdigest()
+
+
+def naive_pnl_step(state, signals, prices):
+    """Fold ``signals``/``prices`` into ``state`` (long only, BUY->SELL pairs).
+
+    ``state`` is ``{"pos": 0|1, "entry": price|None, "pnl": float, "trades": int}``
+    and is updated in place; a BUY while long and a SELL while flat are ignored.
+    """
+    signals = np.asarray(signals, dtype=object)
+    prices = np.asarray(prices, dtype=float)
+    buy = signals == "BUY"
+    sell = signals == "SELL"
+    if state["pos"]:
+        # carry the open position in as a BUY at its entry price
+        buy = np.concatenate([[True], buy])
+        sell = np.concatenate([[False], sell])
+        prices = np.concatenate([[state["entry"]], prices])
+    if not len(prices):
+        return state
+    pos = position_from_signals(buy, sell)
+    prev = np.concatenate([[False], pos[:-1]])
+    entries = np.flatnonzero(pos & ~prev)
+    exits = np.flatnonzero(~pos & prev)
+    pnl = state["pnl"]
+    for diff in (prices[exits] - prices[entries[:len(exits)]]).tolist():
+        pnl += diff  # same summation order as the old row loop
+    state["pnl"] = pnl
+    state["trades"] += len(exits)
+    if pos[-1]:
+        state["pos"], state["entry"] = 1, float(prices[entries[-1]])
+    else:
+        state["pos"], state["entry"] = 0, None
+    return state
+
+
+class Summarizer:
+    """Checkpointed summary of ``log_dir``'s signal logs.
+
+    Parameters
+    ----------
+    normalize : callable
+        ``normalize(raw_df, path) -> df`` turning a chunk of a log into rows
+        with at least ``timestamp``, ``price``, ``signal`` and
+        ``strategy_name`` (these become the trades file's columns), or
+        ``None`` to skip the chunk.  ``df.attrs["before"]`` may carry the row
+        count prior to filtering, for :attr:`report`.
+    log_dir : str or Path
+    pattern : str
+        Glob for the logs, e.g. ``"*_log.csv"``.
+    recursive : bool
+        Search sub directories too.
+    state_file : str, optional
+        Checkpoint path; ``<log_dir>/.summary_state.json`` by default.
+    trades_file : str
+        Name of the combined trades CSV written to ``log_dir``.
+    workers : int
+        Files parsed concurrently.
+    chunk_bytes : int
+        How much of a file is parsed at a time.
+    """
+
+    def __init__(self, normalize, log_dir="logs", pattern="*_log.csv", recursive=False,
+                 state_file=None, trades_file="trades.csv", workers=4, chunk_bytes=16 << 20):
+        self.normalize = normalize
+        self.log_dir = Path(log_dir)
+        self.pattern = pattern
+        self.recursive = recursive
+        self.state_file = Path(state_file) if state_file else self.log_dir / ".summary_state.json"
+        self.workers = workers
+        self.chunk_bytes = chunk_bytes
+        self.trades_path = self.log_dir / trades_file
+        self.report = []  # per-file (path, kept, before, first, last) of the last run
+
+    # --- state ---
+    def _empty_state(self):
+        return {"version": STATE_VERSION, "files": {}, "strategies": {}, "counts": {},
+                "rows": 0, "first": None, "last": None, "trades_size": None}
+
+    def _load_state(self):
+        try:
+            with open(self.state_file, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return self._empty_state()
+        if state.get("version") != STATE_VERSION:
+            return self._empty_state()
+        return state
+
+    def _save_state(self, state):
+        tmp = self.state_file.with_name(self.state_file.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.state_file)
+
+    def files(self):
+        found = self.log_dir.rglob(self.pattern) if self.recursive else self.log_dir.glob(self.pattern)
+        skip = OUTPUTS | {self.trades_path.name}
+        return sorted(f for f in found if f.is_file() and f.name not in skip)
+
+    def _needs_rebuild(self, state, files):
+        trades_size = self.trades_path.stat().st_size if self.trades_path.exists() else None
+        if state["trades_size"] != trades_size:
+            return True
+        for path in files:
+            entry = state["files"].get(str(path))
+            if entry is None:
+                continue
+            size = path.stat().st_size
+            if size < entry["offset"] or _head_hash(path, entry["offset"]) != entry["head"]:
+                return True
+        return any(not Path(p).exists() for p in state["files"])
+
+    # --- reading ---
+    def _read_new(self, path, entry):
+        """Parse what was appended to ``path`` since ``entry``; returns ``(entry, [frames])``."""
+        size = path.stat().st_size
+        entry = dict(entry) if entry else {"offset": 0, "columns": None}
+        frames = []
+        with open(path, "rb") as f:
+            if entry["columns"] is None:
+                header = f.readline()
+                if not header.endswith(b"\n"):
+                    entry["head"] = _head_hash(path, 0)
+                    return entry, frames  # header not complete yet
+                entry["columns"] = [c.strip().lower() for c in pd.read_csv(io.BytesIO(header), nrows=0).columns]
+                entry["offset"] = f.tell()
+            f.seek(entry["offset"])
+            pending = b""
+            while entry["offset"] + len(pending) < size:
+                block = f.read(min(self.chunk_bytes, size - entry["offset"] - len(pending)))
+                if not block:
+                    break
+                data = pending + block
+                cut = data.rfind(b"\n") + 1
+                pending = data[cut:]
+                if cut:
+                    raw = pd.read_csv(io.BytesIO(data[:cut]), header=None, names=entry["columns"])
+                    df = self.normalize(raw, path)
+                    if df is not None:
+                        frames.append(df)
+                    entry["offset"] += cut
+        entry["head"] = _head_hash(path, entry["offset"])
+        return entry, frames
+
+    # --- main entry ---
+    def run(self, full=False):
+        """Bring the summary up to date; returns ``(counts, pnl, summary_text, new_rows)``."""
+        files = self.files()
+        state = self._load_state()
+        if full or self._needs_rebuild(state, files):
+            state = self._empty_state()
+            if self.trades_path.exists():
+                self.trades_path.unlink()
+
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as pool:
+            results = list(pool.map(lambda p: self._read_new(p, state["files"].get(str(p))), files))
+
+        self.report = []
+        batches = []
+        for path, (entry, frames) in zip(files, results):
+            state["files"][str(path)] = entry
+            if frames:
+                new = pd.concat(frames, ignore_index=True)
+                before = sum(fr.attrs.get("before", len(fr)) for fr in frames)
+                self.report.append((path, len(new), before,
+                                    new["timestamp"].min() if len(new) else None,
+                                    new["timestamp"].max() if len(new) else None))
+                batches.append(new)
+
+        new_rows = 0
+        if batches:
+            batch = pd.concat(batches, ignore_index=True).sort_values("timestamp", kind="stable")
+            new_rows = len(batch)
+            self._fold(state, batch)
+            write_header = not self.trades_path.exists()
+            batch.to_csv(self.trades_path, mode="a", header=write_header, index=False)
+        state["trades_size"] = self.trades_path.stat().st_size if self.trades_path.exists() else None
+
+        counts, pnl, text = self._outputs(state)
+        self._save_state(state)
+        return counts, pnl, text, new_rows
+
+    def _fold(self, state, batch):
+        ts = batch["timestamp"].dropna()
+        if len(ts):
+            first, last = ts.min(), ts.max()
+            if state["first"] is not None:
+                first = min(first, pd.Timestamp(state["first"]))
+                last = max(last, pd.Timestamp(state["last"]))
+            state["first"], state["last"] = first.isoformat(), last.isoformat()
+        state["rows"] += len(batch)
+
+        for (strategy, signal), n in batch.groupby(["strategy_name", "signal"], sort=False).size().items():
+            per = state["counts"].setdefault(str(strategy), {})
+            per[str(signal)] = per.get(str(signal), 0) + int(n)
+        for strategy, group in batch.groupby("strategy_name", sort=False):
+            st = state["strategies"].setdefault(str(strategy), {"pos": 0, "entry": None, "pnl": 0.0, "trades": 0})
+            naive_pnl_step(st, group["signal"].to_numpy(), group["price"].to_numpy(dtype=float))
+
+    def _outputs(self, state):
+        counts = pd.DataFrame.from_dict(state["counts"], orient="index").fillna(0).astype(int)
+        counts = counts.sort_index().sort_index(axis=1)
+        counts.index.name = "strategy_name"
+        counts.columns.name = "signal"
+        pnl = pd.DataFrame(
+            {name: {"round_trips": float(st["trades"]), "pnl_points": st["pnl"]}
+             for name, st in state["strategies"].items()}
+        ).T.sort_index()
+        pnl.index.name = "strategy_name"
+
+        first = pd.Timestamp(state["first"]) if state["first"] else None
+        last = pd.Timestamp(state["last"]) if state["last"] else None
+        summary_txt = []
+        summary_txt.append(f"Rows: {state['rows']}")
+        summary_txt.append(f"Range: {first} → {last}")
+        summary_txt.append("\nCounts per strategy/signal:\n")
+        summary_txt.append(counts.to_string())
+        summary_txt.append("\nNaive long-only PnL (BUY->SELL pairs; ignores fees/size):\n")
+        summary_txt.append(pnl.to_string())
+        text = "\n".join(summary_txt)
+
+        (self.log_dir / "summary.txt").write_text(text, encoding="utf-8")
+        counts.to_csv(self.log_dir / "summary_counts.csv")
+        pnl.to_csv(self.log_dir / "summary_pnl.csv")
+        return counts, pnl, text
@@ -0,0 +1,184 @@
+# services/sweep.py
+"""Parallel parameter sweeps for the trailing strategies.
+
+The candle arrays are copied once into a shared-memory block; worker
+processes attach to it and rebuild the DataFrame from views, so nothing but
+``(strategy, params)`` and the resulting metrics crosses process boundaries.
+"""
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from services.indicator_cache import IndicatorCache, IndicatorContext
+from services.simulation import BacktestSimulation
+from strategies.registry import TRAILING_STRATEGIES
+
+COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+# indicator columns each worker keeps; combos that differ only in thresholds
+# or trailing_pct reuse them instead of recomputing
+WORKER_CACHE_SIZE = 32
+
+# metric -> higher is better?
+SELECTION_METRICS = {
+    "total_return": True,
+    "win_rate": True,
+    "drawdown": False,
+    "return_over_drawdown": True,
+}
+
+# a reasonable starting grid per strategy; pass your own to run_sweep
+DEFAULT_GRIDS = {
+    "RSI": {"trailing_pct": [0.01, 0.015, 0.02, 0.03], "rsi_window": [7, 14, 21],
+            "buy_threshold": [20, 25, 30, 35]},
+    "MACD": {"trailing_pct": [0.01, 0.015, 0.02, 0.03], "window_fast": [8, 12],
+             "window_slow": [21, 26], "window_sign": [5, 9]},
+    "BOLLINGER": {"trailing_pct": [None, 0.01, 0.02], "bb_len": [14, 20, 30],
+                  "bb_std": [1.5, 2, 2.5], "bb_bw_min": [0.0, 0.005, 0.01]},
+    "MA_CROSS": {"trailing_pct": [0.01, 0.015, 0.02, 0.03], "short_window": [3, 5, 10],
+                 "long_window": [20, 30, 50]},
+    "CUSTOM": {"trailing_pct": [0.01, 0.015, 0.02], "rsi_buy": [30, 35, 40],
+               "rsi_sell": [65, 70, 75], "dip_pct": [0.01, 0.02, 0.03]},
+}
+
+
+def check_metric(name):
+    if name not in SELECTION_METRICS:
+        raise ValueError(f"unknown metric {name!r}; use one of {', '.join(SELECTION_METRICS)}")
+
+
+def metric_value(metrics, name):
+    """``metrics[name]`` from a metrics dict or a results table.
+
+    ``return_over_drawdown`` is not a backtest output; it is derived here
+    from ``total_return`` and ``drawdown``.
+    """
+    if name == "return_over_drawdown":
+        return metrics["total_return"] / np.maximum(metrics["drawdown"], 1e-9)
+    return metrics[name]
+
+
+def expand_grid(grid):
+    """``{"a": [1, 2], "b": [3]}`` -> ``[{"a": 1, "b": 3}, {"a": 2, "b": 3}]``."""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def evaluate(df, strategy, params, initial_balance=1000.0, ctx=None, start=0):
+    """Backtest one parameter set on ``df``; return the metrics as a dict.
+
+    ``ctx`` is an optional :class:`IndicatorContext` over ``df`` shared by calls.
+    Rows before ``start`` only warm the indicators up: signals on them are
+    dropped and the simulation starts flat at row ``start``.
+    """
+    fn = TRAILING_STRATEGIES[strategy]
+    _, _, signals = fn(df, return_df=True, ctx=ctx, **params)
+    sim = BacktestSimulation(initial_balance=initial_balance)
+    if signals is not None and start:
+        signals = signals[signals["timestamp"].isin(df.index[start:])]
+    if signals is not None and not signals.empty:
+        for sig, px in zip(signals["signal"].to_numpy(), signals["price"].to_numpy()):
+            sim.process_signal(sig, px)
+    sim.close_final(float(df["close"].iloc[-1]))
+    total_return, win_rate, drawdown = sim.get_metrics()
+    return {"total_return": float(total_return), "win_rate": float(win_rate),
+            "drawdown": float(drawdown), "trades": len(sim.trades)}
+
+
+# --- shared memory plumbing ---
+_worker_df = None
+_worker_shm = None
+_worker_ctx = None
+
+
+def share_frame(df):
+    """Copy the OHLCV columns of ``df`` into a new shared-memory block.
+
+    Returns ``(shm, n_rows)``; the caller must ``close()`` and ``unlink()`` it.
+    """
+    n = len(df)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, n * len(COLUMNS) * 8))
+    block = np.ndarray((len(COLUMNS), n), dtype=np.float64, buffer=shm.buf)
+    ts = df["timestamp"]
+    if np.issubdtype(ts.dtype, np.datetime64):
+        ts = ts.astype("datetime64[ms]").astype(np.int64)
+    block[0] = np.asarray(ts, dtype=np.float64)
+    for i, col in enumerate(COLUMNS[1:], start=1):
+        block[i] = df[col].to_numpy(dtype=np.float64) if col in df else np.nan
+    return shm, n
+
+
+def frame_from_block(block):
+    """DataFrame over the shared arrays (the strategies copy before writing)."""
+    df = pd.DataFrame({col: block[i] for i, col in enumerate(COLUMNS)}, copy=False)
+    df["timestamp"] = pd.to_datetime(block[0].astype(np.int64), unit="ms")
+    df["price"] = df["close"]
+    return df
+
+
+def _attach(name, n):
+    global _worker_df, _worker_shm, _worker_ctx
+    _worker_shm = shared_memory.SharedMemory(name=name)
+    block = np.ndarray((len(COLUMNS), n), dtype=np.float64, buffer=_worker_shm.buf)
+    _worker_df = frame_from_block(block)
+    _worker_ctx = IndicatorContext(_worker_df, cache=IndicatorCache(WORKER_CACHE_SIZE))
+
+
+def _run_task(task):
+    strategy, params, initial_balance = task
+    try:
+        metrics = evaluate(_worker_df, strategy, params, initial_balance, ctx=_worker_ctx)
+    except Exception as e:
+        metrics = {"error": repr(e)}
+    return {"strategy": strategy, "params": params, **metrics}
+
+
+def run_sweep(df, grids=None, workers=None, initial_balance=1000.0, rank_by="total_return"):
+    """Evaluate every combination in ``grids`` across a process pool.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Candles with ``timestamp``, ``open``, ``high``, ``low``, ``close`` and
+        ``volume`` columns.
+    grids : dict, optional
+        ``{strategy_name: {param: [values, ...]}}``; defaults to ``DEFAULT_GRIDS``.
+    workers : int, optional
+        Process count; defaults to ``os.cpu_count()``.
+    rank_by : str
+        One of ``SELECTION_METRICS``; the result is sorted by it, best first
+        (drawdown sorts ascending).
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per combination: strategy, params, total_return, win_rate,
+        drawdown and trades, best first.
+    """
+    check_metric(rank_by)
+    grids = grids or DEFAULT_GRIDS
+    tasks = [(name, params, initial_balance)
+             for name, grid in grids.items() for params in expand_grid(grid)]
+    workers = workers or os.cpu_count() or 1
+
+    shm, n = share_frame(df)
+    try:
+        chunksize = max(1, len(tasks) // (workers * 8))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                 initargs=(shm.name, n)) as pool:
+            rows = list(pool.map(_run_task, tasks, chunksize=chunksize))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    result = pd.DataFrame(rows)
+    if "total_return" in result:  # absent only if every combination failed
+        if rank_by not in result:
+            result[rank_by] = metric_value(result, rank_by)
+        ascending = not SELECTION_METRICS.get(rank_by, True)
+        result = result.sort_values(rank_by, ascending=ascending, na_position="last")
+    return result.reset_index(drop=True)
@@ -0,0 +1,163 @@
+# services/synthetic.py
+"""Vectorised synthetic candles for many correlated symbols.
+
+Log returns are drawn for a whole chunk of bars at once, for all symbols
+together, so the cost is a handful of NumPy calls per chunk and memory stays
+at one chunk whatever the total length.  Three seeded price models:
+
+* ``gbm``    -- geometric Brownian motion.
+* ``regime`` -- GBM whose drift and volatility switch between a calm and a
+  volatile state (a two-state Markov chain shared by all symbols).
+* ``jump``   -- GBM plus Poisson jumps (Merton), independent per symbol.
+
+Shocks are correlated across symbols through a Cholesky factor.  Each chunk
+gets its own generator seeded from ``(seed, chunk_number)``, so the output
+depends only on the seed and the chunk size.
+"""
+import numpy as np
+
+from services.ohlcv_store import RECORD
+
+MINUTES_PER_YEAR = 365 * 24 * 60
+MODELS = ("gbm", "regime", "jump")
+
+
+def correlation_matrix(n, corr):
+    """``corr`` as an ``n x n`` matrix; a scalar means the same correlation for every pair."""
+    if np.ndim(corr) == 0:
+        m = np.full((n, n), float(corr))
+        np.fill_diagonal(m, 1.0)
+        return m
+    m = np.asarray(corr, dtype=float)
+    if m.shape != (n, n):
+        raise ValueError(f"correlation matrix must be {n}x{n}, got {m.shape}")
+    return m
+
+
+class SyntheticMarket:
+    """Seeded OHLCV generator for ``symbols``.
+
+    Parameters
+    ----------
+    symbols : list of str
+    model : {"gbm", "regime", "jump"}
+    seed : int
+    timeframe_minutes : int
+        Bar length; drift/volatility below are annual and scaled to it.
+    mu, sigma : float
+        Annual drift and volatility.
+    corr : float or array
+        Correlation of the per-bar shocks between symbols.
+    start_price : float or dict
+        First open, per symbol when a dict.
+    regime_sigma, regime_mu : tuple
+        Volatility multiplier and annual drift of the (calm, volatile) states.
+    regime_bars : tuple
+        Mean length in bars of the (calm, volatile) states.
+    jumps_per_year, jump_mean, jump_std : float
+        Poisson jump intensity and the normal log-size of a jump.
+    volume : float
+        Typical volume per bar; it rises with the size of the move.
+    """
+
+    def __init__(self, symbols, model="gbm", seed=0, timeframe_minutes=1,
+                 mu=0.0, sigma=0.6, corr=0.6, start_price=30000.0,
+                 regime_sigma=(0.7, 2.5), regime_mu=(0.2, -0.6), regime_bars=(4320, 720),
+                 jumps_per_year=25.0, jump_mean=-0.005, jump_std=0.03, volume=25.0):
+        if model not in MODELS:
+            raise ValueError(f"model must be one of {MODELS}, got {model!r}")
+        self.symbols = list(symbols)
+        self.model = model
+        self.seed = seed
+        self.dt = timeframe_minutes / MINUTES_PER_YEAR
+        self.mu, self.sigma = mu, sigma
+        self.chol = np.linalg.cholesky(correlation_matrix(len(self.symbols), corr))
+        if isinstance(start_price, dict):
+            prices = [start_price[s] for s in self.symbols]
+        else:
+            prices = [start_price] * len(self.symbols)
+        self.regime_sigma = np.asarray(regime_sigma, dtype=float)
+        self.regime_mu = np.asarray(regime_mu, dtype=float)
+        self.regime_bars = regime_bars
+        self.jump_prob = jumps_per_year * self.dt
+        self.jump_mean, self.jump_std = jump_mean, jump_std
+        self.volume = volume
+
+        # state carried from one chunk to the next
+        self._log_close = np.log(np.asarray(prices, dtype=float))
+        self._regime = 0
+        self._regime_left = None
+        self._chunks = 0
+
+    def _regimes(self, rng, n):
+        """Regime index per bar, drawn as alternating geometric durations."""
+        if self._regime_left is None:
+            self._regime_left = int(rng.geometric(1 / self.regime_bars[self._regime]))
+        out = np.empty(n, dtype=np.int8)
+        pos = 0
+        while pos < n:
+            take = min(self._regime_left, n - pos)
+            out[pos:pos + take] = self._regime
+            pos += take
+            self._regime_left -= take
+            if self._regime_left == 0:
+                self._regime ^= 1
+                self._regime_left = int(rng.geometric(1 / self.regime_bars[self._regime]))
+        return out
+
+    def log_returns(self, rng, n):
+        """``(returns, bar_sigma)`` arrays of shape ``(n, symbols)``."""
+        k = len(self.symbols)
+        z = rng.standard_normal((n, k)) @ self.chol.T
+        if self.model == "regime":
+            regime = self._regimes(rng, n)
+            sigma = (self.sigma * self.regime_sigma[regime])[:, None]
+            mu = self.regime_mu[regime][:, None]
+        else:
+            sigma = np.full((n, 1), self.sigma)
+            mu = self.mu
+        bar_sigma = sigma * np.sqrt(self.dt)
+        ret = (mu - 0.5 * sigma ** 2) * self.dt + bar_sigma * z
+        if self.model == "jump":
+            hit = rng.random((n, k)) < self.jump_prob
+            ret[hit] += rng.normal(self.jump_mean, self.jump_std, int(hit.sum()))
+        return ret, np.broadcast_to(bar_sigma, (n, k))
+
+    def chunk(self, start_ms, n, bar_ms):
+        """Next ``n`` bars for every symbol as ``{symbol: RECORD array}``."""
+        rng = np.random.default_rng([self.seed, self._chunks])
+        self._chunks += 1
+        ret, bar_sigma = self.log_returns(rng, n)
+        k = len(self.symbols)
+
+        log_close = self._log_close + np.cumsum(ret, axis=0)
+        log_open = np.vstack([self._log_close, log_close[:-1]])
+        self._log_close = log_close[-1].copy()
+
+        # intrabar excursions beyond the open/close, about half a bar's sigma
+        up = np.abs(rng.standard_normal((n, k))) * bar_sigma * 0.5
+        down = np.abs(rng.standard_normal((n, k))) * bar_sigma * 0.5
+        high = np.exp(np.maximum(log_open, log_close) + up)
+        low = np.exp(np.minimum(log_open, log_close) - down)
+        volume = self.volume * rng.lognormal(0.0, 0.5, (n, k)) * (1 + np.abs(ret) / bar_sigma)
+        ts = start_ms + bar_ms * np.arange(n, dtype=np.int64)
+
+        out = {}
+        for j, symbol in enumerate(self.symbols):
+            rec = np.empty(n, dtype=RECORD)
+            rec["timestamp"] = ts
+            rec["open"] = np.exp(log_open[:, j])
+            rec["high"] = high[:, j]
+            rec["low"] = low[:, j]
+            rec["close"] = np.exp(log_close[:, j])
+            rec["volume"] = volume[:, j]
+            out[symbol] = rec
+        return out
+
+    def generate(self, start_ms, bars, bar_ms=60_000, chunk_bars=1_000_000):
+        """Yield ``{symbol: RECORD array}`` chunks covering ``bars`` bars from ``start_ms``."""
+        done = 0
+        while done < bars:
+            n = min(chunk_bars, bars - done)
+            yield self.chunk(start_ms + done * bar_ms, n, bar_ms)
+            done += n
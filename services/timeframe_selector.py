@@ -0,0 +1,215 @@
+# services/timeframe_selector.py
+"""Pick a timeframe per strategy by backtesting every strategy on every timeframe.
+
+The recent window of 1m candles is loaded once (through the candle store,
+so repeated runs only fetch the tail) and copied into shared memory like
+:mod:`services.sweep`.  Worker processes resample it to the timeframe of
+their task with :mod:`services.resampler` and score the strategy with
+:func:`services.sweep.evaluate`; the best timeframe per strategy is then
+chosen by a configurable metric.
+
+:class:`TimeframeSelector` repeats that on a schedule in a background
+thread; the live loop only reads :attr:`TimeframeSelector.best`.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from services.resampler import TIMEFRAMES, resample, timeframe_ms
+from services.sweep import (COLUMNS, SELECTION_METRICS, check_metric, evaluate, frame_from_block,
+                            metric_value, share_frame)
+from strategies.registry import STREAMING_STRATEGIES, TRAILING_STRATEGIES
+
+
+# --- worker side ---
+_worker_base = None
+_worker_shm = None
+_worker_frames = {}
+
+
+def _attach(name, n, base):
+    global _worker_base, _worker_shm
+    _worker_shm = shared_memory.SharedMemory(name=name)
+    block = np.ndarray((len(COLUMNS), n), dtype=np.float64, buffer=_worker_shm.buf)
+    _worker_base = (frame_from_block(block), base)
+    _worker_frames.clear()
+
+
+def _run_task(task):
+    timeframe, strategy, initial_balance = task
+    base_df, base = _worker_base
+    try:
+        df = _worker_frames.get(timeframe)
+        if df is None:
+            df = _worker_frames[timeframe] = (base_df if timeframe == base
+                                              else resample(base_df, timeframe, base=base))
+        # a window shorter than the strategy's warm-up cannot produce a trade
+        lookback = STREAMING_STRATEGIES[strategy]().lookback
+        metrics = evaluate(df, strategy, {}, initial_balance) if len(df) >= lookback else {"trades": 0}
+        metrics["bars"] = len(df)
+    except Exception as e:
+        metrics = {"error": repr(e)}
+    return {"timeframe": timeframe, "strategy": strategy, **metrics}
+
+
+def _pool_context():
+    # the live loop has threads running; start workers from a clean process
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return None
+
+
+def evaluate_timeframes(base_df, timeframes=None, strategies=None, base="1m", workers=None,
+                        initial_balance=1000.0):
+    """Backtest every strategy on every timeframe resampled from ``base_df``.
+
+    Parameters
+    ----------
+    base_df : pandas.DataFrame
+        Closed ``base`` candles with ``timestamp``/``open``/.../``volume``.
+    timeframes : list of str
+        Defaults to :data:`services.resampler.TIMEFRAMES`.
+    strategies : list of str
+        Names from :data:`strategies.registry.TRAILING_STRATEGIES` (default: all).
+    workers : int, optional
+        Process count; defaults to ``os.cpu_count()``.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per (timeframe, strategy): total_return, win_rate, drawdown,
+        trades and the number of bars evaluated.
+    """
+    timeframes = [tf for tf in (timeframes or TIMEFRAMES) if timeframe_ms(tf) % timeframe_ms(base) == 0]
+    strategies = list(strategies or TRAILING_STRATEGIES)
+    # the short timeframes have the most bars, so they go first
+    tasks = [(tf, name, initial_balance)
+             for tf in sorted(timeframes, key=timeframe_ms) for name in strategies]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+
+    shm, n = share_frame(base_df)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context(), initializer=_attach,
+                                 initargs=(shm.name, n, base)) as pool:
+            rows = list(pool.map(_run_task, tasks))
+    finally:
+        shm.close()
+        shm.unlink()
+    return pd.DataFrame(rows)
+
+
+def pick_best(table, metric="total_return", min_trades=1, default=None):
+    """``{strategy: timeframe}`` with the best ``metric`` per strategy.
+
+    Timeframes with fewer than ``min_trades`` trades (or an error) are not
+    eligible; a strategy with no eligible timeframe gets ``default``.
+    """
+    check_metric(metric)
+    table = table.copy()
+    if "error" not in table:
+        table["error"] = np.nan
+    ok = table["error"].isna() & (table["trades"].fillna(0) >= min_trades)
+    table = table[ok]
+    if metric == "return_over_drawdown":
+        table["return_over_drawdown"] = metric_value(table, metric)
+    best = {}
+    for name, rows in table.groupby("strategy", sort=False):
+        rows = rows.sort_values(metric, ascending=not SELECTION_METRICS[metric], kind="stable")
+        best[name] = rows["timeframe"].iloc[0]
+    return best
+
+
+class TimeframeSelector:
+    """Re-runs :func:`evaluate_timeframes` on a schedule and keeps the picks.
+
+    Parameters
+    ----------
+    symbol : str
+    timeframes : list of str
+    strategies : list of str, optional
+    metric : str
+        One of :data:`SELECTION_METRICS`.
+    days : float
+        Length of the evaluation window.
+    interval : float
+        Seconds between background runs.
+    default : str, optional
+        Timeframe for strategies with no eligible result.
+    load : callable, optional
+        ``load(symbol, base, limit) -> DataFrame`` of base candles whose last
+        row may still be forming; defaults to
+        :func:`services.data_service.fetch_ohlcv`.
+    """
+
+    def __init__(self, symbol, timeframes=None, strategies=None, metric="total_return", days=7.0,
+                 interval=3600.0, workers=None, min_trades=1, default=None, base="1m", load=None):
+        check_metric(metric)
+        self.symbol = symbol
+        self.timeframes = list(timeframes or TIMEFRAMES)
+        self.strategies = list(strategies or TRAILING_STRATEGIES)
+        self.metric = metric
+        self.days = days
+        self.interval = interval
+        self.workers = workers
+        self.min_trades = min_trades
+        self.default = default
+        self.base = base
+        self.load = load
+        self.best = {}
+        self.table = None
+        self.base_df = None
+        self.updated = None  # wall clock of the last completed run
+        self.duration = None
+        self.version = 0  # bumped whenever ``best`` changes
+        self._stop = threading.Event()
+        self._thread = None
+
+    def load_window(self):
+        """Closed base candles covering the last ``days``."""
+        limit = int(self.days * 86_400_000 // timeframe_ms(self.base)) + 1
+        if self.load is None:
+            from services.data_service import fetch_ohlcv
+            df = fetch_ohlcv(symbol=self.symbol, timeframe=self.base, limit=limit)
+        else:
+            df = self.load(self.symbol, self.base, limit)
+        return df.iloc[:-1].reset_index(drop=True)  # the last row is still forming
+
+    def run_once(self):
+        """Load, evaluate and pick; returns the new ``{strategy: timeframe}``."""
+        t0 = time.perf_counter()
+        base_df = self.load_window()
+        table = evaluate_timeframes(base_df, self.timeframes, self.strategies, base=self.base,
+                                    workers=self.workers)
+        best = pick_best(table, self.metric, self.min_trades, self.default)
+        for name in self.strategies:
+            best.setdefault(name, self.default)
+        self.base_df, self.table = base_df, table
+        if best != self.best:
+            self.best = best  # replaced, never mutated, so readers need no lock
+            self.version += 1
+        self.updated = time.time()
+        self.duration = time.perf_counter() - t0
+        return best
+
+    def start(self):
+        """Re-evaluate every ``interval`` seconds in a daemon thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="timeframe-selector", daemon=True)
+            self._thread.start()
+        return self
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"[ERROR] timeframe selection: {e}")
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,178 @@
+# services/walk_forward.py
+"""Walk-forward evaluation of the trailing strategies.
+
+The history is cut into consecutive train/test folds, either rolling (the
+train window slides along) or anchored (it always starts at the first bar).
+For every fold and strategy the parameter grid is tuned on the train slice
+and the best combination is scored on the test slice that follows, so each
+test result is out of sample.  Folds run in a process pool attached to the
+same shared-memory candles as :mod:`services.sweep`.
+
+Indicators need history before they produce values, so every slice is
+evaluated with ``warmup`` extra bars in front of it.  Signals on those bars
+are dropped and the simulation starts flat at the first bar of the slice
+(see :func:`services.sweep.evaluate`).
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from services.indicator_cache import IndicatorCache, IndicatorContext
+from services.sweep import (COLUMNS, DEFAULT_GRIDS, SELECTION_METRICS, WORKER_CACHE_SIZE, check_metric,
+                            evaluate, expand_grid, frame_from_block, metric_value, share_frame)
+
+METRICS = ["total_return", "win_rate", "drawdown", "trades"]
+
+
+def make_folds(n, train, test, step=None, anchored=False):
+    """Row ranges ``(train_start, train_end, test_start, test_end)`` over ``n`` bars.
+
+    Each test window of ``test`` bars directly follows its train window; the
+    next fold starts ``step`` bars later (``test`` by default, so the test
+    windows tile the history).  With ``anchored`` every train window starts
+    at row 0 and grows, otherwise it is always ``train`` bars long.
+    """
+    if train <= 0 or test <= 0:
+        raise ValueError("train and test must be positive")
+    step = step or test
+    folds = []
+    start = 0
+    while start + train + test <= n:
+        test_start = start + train
+        folds.append((0 if anchored else start, test_start, test_start, test_start + test))
+        start += step
+    return folds
+
+
+# --- worker side ---
+_worker_df = None
+_worker_shm = None
+
+
+def _attach(name, n):
+    global _worker_df, _worker_shm
+    _worker_shm = shared_memory.SharedMemory(name=name)
+    block = np.ndarray((len(COLUMNS), n), dtype=np.float64, buffer=_worker_shm.buf)
+    _worker_df = frame_from_block(block)
+
+
+def _window(df, start, end, warmup):
+    """Rows ``start:end`` of ``df`` plus up to ``warmup`` rows before them."""
+    lo = max(0, start - warmup)
+    return df.iloc[lo:end].reset_index(drop=True), start - lo
+
+
+def tune(df, strategy, grid, start, end, warmup=200, initial_balance=1000.0, rank_by="total_return"):
+    """Best combination of ``grid`` on rows ``start:end``; returns ``(params, metrics)``."""
+    frame, offset = _window(df, start, end, warmup)
+    ctx = IndicatorContext(frame, cache=IndicatorCache(WORKER_CACHE_SIZE))
+    check_metric(rank_by)
+    sign = 1 if SELECTION_METRICS[rank_by] else -1  # drawdown: lower wins
+    best = None
+    for params in expand_grid(grid):
+        metrics = evaluate(frame, strategy, params, initial_balance, ctx=ctx, start=offset)
+        metrics[rank_by] = metric_value(metrics, rank_by)
+        if best is None or sign * metrics[rank_by] > sign * best[1][rank_by]:
+            best = (params, metrics)
+    return best
+
+
+def _run_fold(task):
+    fold, (train_start, train_end, test_start, test_end), strategy, grid, warmup, initial_balance, rank_by = task
+    ts = _worker_df["timestamp"]
+    row = {"fold": fold, "strategy": strategy,
+           "train_start": ts.iloc[train_start], "test_start": ts.iloc[test_start],
+           "test_end": ts.iloc[test_end - 1]}
+    try:
+        if len(expand_grid(grid)) > 1:
+            params, train_metrics = tune(_worker_df, strategy, grid, train_start, train_end,
+                                         warmup, initial_balance, rank_by)
+            row["train_" + rank_by] = train_metrics[rank_by]
+        else:
+            params = expand_grid(grid)[0]
+        frame, offset = _window(_worker_df, test_start, test_end, warmup)
+        row.update(params=params, **evaluate(frame, strategy, params, initial_balance, start=offset))
+    except Exception as e:
+        row["error"] = repr(e)
+    return row
+
+
+def summarize_folds(folds):
+    """Per-strategy report over the test windows of :func:`run_walk_forward`.
+
+    ``total_return`` compounds the fold returns, ``drawdown`` is the worst
+    fold, ``positive_folds`` the share of folds that made money.
+    """
+    ok = folds[folds["total_return"].notna()] if "total_return" in folds else folds.iloc[:0]
+    rows = []
+    for strategy, g in ok.groupby("strategy", sort=False):
+        r = g["total_return"].to_numpy(dtype=float)
+        rows.append({
+            "strategy": strategy,
+            "folds": len(g),
+            "total_return": float(np.prod(1 + r) - 1),
+            "mean_return": float(r.mean()),
+            "positive_folds": float((r > 0).mean()),
+            "win_rate": float(g["win_rate"].mean()),
+            "drawdown": float(g["drawdown"].max()),
+            "trades": int(g["trades"].sum()),
+        })
+    report = pd.DataFrame(rows, columns=["strategy", "folds", "total_return", "mean_return",
+                                         "positive_folds", "win_rate", "drawdown", "trades"])
+    return report.sort_values("total_return", ascending=False).reset_index(drop=True)
+
+
+def run_walk_forward(df, train, test, step=None, anchored=False, grids=None, warmup=200,
+                     workers=None, initial_balance=1000.0, rank_by="total_return"):
+    """Walk-forward every strategy in ``grids`` over ``df``.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Candles with ``timestamp``, ``open``, ``high``, ``low``, ``close`` and
+        ``volume`` columns, oldest first.
+    train, test, step : int
+        Fold sizes in bars (see :func:`make_folds`).
+    anchored : bool
+        Grow the train window from the first bar instead of rolling it.
+    grids : dict, optional
+        ``{strategy_name: {param: [values, ...]}}``; defaults to
+        ``DEFAULT_GRIDS``.  A grid with a single combination is not tuned,
+        it is just scored on each test window.
+    warmup : int
+        Bars of history in front of every train/test slice for the indicators.
+    workers : int, optional
+        Process count; defaults to ``os.cpu_count()``.
+    rank_by : str
+        Metric optimised on the train slices, in its ``SELECTION_METRICS``
+        direction (drawdown is minimised, the others maximised).
+
+    Returns
+    -------
+    tuple of pandas.DataFrame
+        ``(folds, report)``: one row per fold and strategy with the chosen
+        params and the test metrics, and :func:`summarize_folds` of it.
+    """
+    check_metric(rank_by)
+    grids = grids or DEFAULT_GRIDS
+    folds = make_folds(len(df), train, test, step, anchored)
+    if not folds:
+        raise ValueError(f"{len(df)} bars are not enough for one fold of {train}+{test}")
+    tasks = [(i, fold, name, grid, warmup, initial_balance, rank_by)
+             for i, fold in enumerate(folds) for name, grid in grids.items()]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+
+    shm, n = share_frame(df)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                 initargs=(shm.name, n)) as pool:
+            rows = list(pool.map(_run_fold, tasks))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    table = pd.DataFrame(rows)
+    return table, summarize_folds(table)
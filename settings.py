@@ -1,3 +1,4 @@
 CHECK_INTERVAL_SECONDS = 300  # süre saniye cinsinden
 TIMEFRAME = "5m"              # varsayılan zaman aralığı (eğer kullanıcı seçim yapmazsa)
 SYMBOL = "BTC/USDT"           # izlenen işlem çifti
+SYMBOLS = [SYMBOL]            # main_async.py ile izlenen çiftler (SYMBOLS=BTC/USDT,ETH/USDT ile değiştirilebilir)
@@ -1,26 +1,43 @@
 import os
 import pandas as pd
-from ta.volatility import BollingerBands
+
+from services.indicator_cache import IndicatorContext, StreamContext
+from strategies.trailing import signals_frame, stop_signals
 
 BB_LEN = int(os.getenv("BB_LEN", "20"))
 BB_STD = float(os.getenv("BB_STD", "2"))
 BB_BW_MIN = float(os.getenv("BB_BW_MIN", "0.01"))  # min band width (1%) to avoid chop
 
-def apply_bollinger_strategy(df: pd.DataFrame):
+def apply_bollinger_strategy(df: pd.DataFrame, trailing_pct=None, return_df=False,
+                             bb_len=None, bb_std=None, bb_bw_min=None, ctx=None,
+                             take_profit=None, intrabar=False):
+    """Bollinger mean-reversion strategy.
+
+    The returned signal only looks at the last bar.  With ``return_df`` the
+    full signal history is also returned; it is position aware (BUY when flat,
+    SELL when long) and ``trailing_pct`` optionally adds a trailing stop to it.
+    ``bb_len``/``bb_std``/``bb_bw_min`` default to ``BB_LEN``/``BB_STD``/``BB_BW_MIN``.
+    """
+    bb_len = BB_LEN if bb_len is None else bb_len
+    bb_std = BB_STD if bb_std is None else bb_std
+    bb_bw_min = BB_BW_MIN if bb_bw_min is None else bb_bw_min
+
     # Guard: need enough rows and a close column
-    if df is None or "close" not in df.columns or len(df) < BB_LEN + 2:
+    if df is None or "close" not in df.columns or len(df) < bb_len + 2:
+        if return_df:
+            return None, None, signals_frame([], [], [], [], [])
         return None, None
 
     close = df["close"].astype(float)
 
-    bb = BollingerBands(close=close, window=BB_LEN, window_dev=BB_STD, fillna=False)
-    mid = bb.bollinger_mavg()
-    low = bb.bollinger_lband()
-    high = bb.bollinger_hband()
+    ctx = IndicatorContext(df) if ctx is None else ctx
+    mid = pd.Series(ctx.get("sma", window=bb_len, source="close"), index=close.index)
+    low = pd.Series(ctx.get("bb_low", window=bb_len, window_dev=bb_std, source="close"), index=close.index)
+    high = pd.Series(ctx.get("bb_high", window=bb_len, window_dev=bb_std, source="close"), index=close.index)
 
     # Band width (% of mid) – we’ll skip signals when volatility is tiny
     bw = (high - low) / mid.replace(0, pd.NA)
-    enough_vol = bw > BB_BW_MIN
+    enough_vol = bw > bb_bw_min
 
     # Mean-reversion style:
     # BUY when price crosses back up through the lower band (after being below),
@@ -35,4 +52,68 @@ def apply_bollinger_strategy(df: pd.DataFrame):
         signal = "SELL"
 
     # Return a useful value to print; band width is a nice diagnostic
-    return signal, float(bw.iloc[-1])
+    value = float(bw.iloc[-1])
+
+    if return_df:
+        buy_idx, sell_idx, sell_price = stop_signals(
+            df,
+            close.to_numpy(dtype=float),
+            cross_up_low.to_numpy(dtype=bool),
+            exit=cross_down_mid.to_numpy(dtype=bool),
+            trailing_pct=trailing_pct,
+            take_profit=take_profit,
+            intrabar=intrabar,
+        )
+        signals_df = signals_frame(df.index, close, bw.to_numpy(dtype=float), buy_idx, sell_idx, sell_price)
+        return signal, value, signals_df
+
+    return signal, value
+
+
+class BollingerStrategy:
+    """Streaming counterpart of :func:`apply_bollinger_strategy`.
+
+    Feed closed bars one at a time with :meth:`step`; signals match the batch
+    function bar for bar over the same history.
+    """
+
+    def __init__(self, bb_len=None, bb_std=None, bb_bw_min=None, ctx=None):
+        self.bb_len = BB_LEN if bb_len is None else bb_len
+        self.bb_bw_min = BB_BW_MIN if bb_bw_min is None else bb_bw_min
+        self.lookback = self.bb_len + 2  # closed bars before the first possible signal
+        bb_std = BB_STD if bb_std is None else bb_std
+        self.ctx = StreamContext() if ctx is None else ctx
+        self._owns_ctx = ctx is None
+        self._mid = self.ctx.require("sma", window=self.bb_len, source="close")
+        self._high = self.ctx.require("bb_high", window=self.bb_len, window_dev=bb_std, source="close")
+        self._low = self.ctx.require("bb_low", window=self.bb_len, window_dev=bb_std, source="close")
+        self.bars = 0
+        self._prev = None  # (close, low, mid) of the previous bar
+
+    @property
+    def ready(self):
+        """``True`` once ``lookback`` bars are in; :meth:`step` returns ``(None, None)`` before."""
+        return self.bars >= self.lookback
+
+    def step(self, bar):
+        """Process one closed bar and return ``(signal, value)``."""
+        if self._owns_ctx:
+            self.ctx.update(bar)
+        close = float(bar["close"])
+        mid, high, low = self.ctx[self._mid], self.ctx[self._high], self.ctx[self._low]
+        self.bars += 1
+        prev, self._prev = self._prev, (close, low, mid)
+        if not self.ready:
+            return None, None
+
+        bw = (high - low) / mid if mid != 0 else float("nan")
+        enough_vol = bw > self.bb_bw_min
+        cross_up_low = prev[0] < prev[1] and close >= low and enough_vol
+        cross_down_mid = prev[0] >= prev[2] and close < mid
+
+        signal = None
+        if cross_up_low:
+            signal = "BUY"
+        elif cross_down_mid:
+            signal = "SELL"
+        return signal, bw
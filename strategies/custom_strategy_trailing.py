@@ -1,49 +1,37 @@
-import pandas as pd
-import ta
+from collections import deque
 
+import numpy as np
 
-def apply_custom_strategy(df, trailing_pct=0.015, return_df=False):
+from services.indicator_cache import IndicatorContext, StreamContext
+from strategies.trailing import TrailingStop, bar_price, signals_frame, stop_signals
+
+
+def apply_custom_strategy(df, trailing_pct=0.015, return_df=False, rsi_window=14, low_window=20,
+                          rsi_buy=35, rsi_sell=70, dip_pct=0.02, ctx=None,
+                          take_profit=None, intrabar=False):
     """Custom RSI/price momentum strategy with trailing stop."""
     df = df.copy()
     if 'price' not in df.columns:
         df['price'] = df['close']
 
-    df['rsi'] = ta.momentum.RSIIndicator(close=df['price'], window=14).rsi()
-    df['low_20'] = df['price'].rolling(window=20).min()
+    ctx = IndicatorContext(df) if ctx is None else ctx
+    df['rsi'] = ctx.get('rsi', window=rsi_window)
+    df['low_20'] = ctx.get('min', window=low_window)
     df.dropna(inplace=True)
 
-    signals = []
-    position = None
-    entry_price = 0
-    stop_price = 0
-    peak_price = 0
-
-    for i in range(2, len(df)):
-        timestamp = df.index[i]
-        price = df['price'].iloc[i]
-        rsi = df['rsi'].iloc[i]
-        low_20 = df['low_20'].iloc[i]
-
-        momentum = df['price'].iloc[i] > df['price'].iloc[i-1] > df['price'].iloc[i-2]
-        dip_near = (price - low_20) / low_20 < 0.02
+    price = df['price'].to_numpy(dtype=float)
+    rsi = df['rsi'].to_numpy(dtype=float)
+    low_20 = df['low_20'].to_numpy(dtype=float)
 
-        if rsi < 35 and momentum and dip_near and position is None:
-            signals.append({'timestamp': timestamp, 'signal': 'BUY', 'price': price, 'value': rsi})
-            position = 'LONG'
-            entry_price = price
-            stop_price = price * (1 - trailing_pct)
-            peak_price = price
+    momentum = np.zeros(len(df), dtype=bool)
+    momentum[2:] = (price[2:] > price[1:-1]) & (price[1:-1] > price[:-2])
+    dip_near = (price - low_20) / low_20 < dip_pct
 
-        elif position == 'LONG':
-            if price > peak_price:
-                peak_price = price
-                stop_price = max(stop_price, peak_price * (1 - trailing_pct))
-
-            if price < stop_price or rsi > 70:
-                signals.append({'timestamp': timestamp, 'signal': 'SELL', 'price': price, 'value': rsi})
-                position = None
-
-    signals_df = pd.DataFrame(signals)
+    buy_idx, sell_idx, sell_price = stop_signals(
+        df, price, (rsi < rsi_buy) & momentum & dip_near, exit=rsi > rsi_sell,
+        trailing_pct=trailing_pct, start=2, take_profit=take_profit, intrabar=intrabar,
+    )
+    signals_df = signals_frame(df.index, price, rsi, buy_idx, sell_idx, sell_price)
 
     latest_signal = None
     if not signals_df.empty and signals_df.iloc[-1]['timestamp'] == df.index[-1]:
@@ -55,3 +43,57 @@ def apply_custom_strategy(df, trailing_pct=0.015, return_df=False):
         return latest_signal, latest_value, signals_df
 
     return latest_signal, latest_value
+
+
+class CustomStrategy:
+    """Streaming counterpart of :func:`apply_custom_strategy`.
+
+    Feed closed bars one at a time with :meth:`step`; signals match the batch
+    function bar for bar over the same history.
+    """
+
+    def __init__(self, trailing_pct=0.015, rsi_window=14, low_window=20,
+                 rsi_buy=35, rsi_sell=70, dip_pct=0.02, ctx=None):
+        self.ctx = StreamContext() if ctx is None else ctx
+        self._owns_ctx = ctx is None
+        self._rsi = self.ctx.require('rsi', window=rsi_window)
+        self._low = self.ctx.require('min', window=low_window)
+        self.rsi_buy, self.rsi_sell, self.dip_pct = rsi_buy, rsi_sell, dip_pct
+        # closed bars before the first possible signal: both indicators, then three prices of momentum
+        self.lookback = max(rsi_window, low_window) + 2
+        self.stop = TrailingStop(trailing_pct)
+        self.valid_bars = 0
+        self._prices = deque(maxlen=3)
+
+    @property
+    def ready(self):
+        """``True`` once the batch function would return a value."""
+        return self.valid_bars > 0
+
+    def step(self, bar):
+        """Process one closed bar and return ``(signal, value)``."""
+        if self._owns_ctx:
+            self.ctx.update(bar)
+        price = bar_price(bar)
+        rsi, low_20 = self.ctx[self._rsi], self.ctx[self._low]
+        if rsi != rsi or low_20 != low_20:
+            return None, None
+        self.valid_bars += 1
+        self._prices.append(price)
+        if self.valid_bars < 3:
+            return None, rsi
+
+        p2, p1, _ = self._prices
+        momentum = price > p1 > p2
+        dip_near = (price - low_20) / low_20 < self.dip_pct
+
+        signal = None
+        if rsi < self.rsi_buy and momentum and dip_near and self.stop.position is None:
+            signal = 'BUY'
+            self.stop.enter(price)
+        elif self.stop.position == 'LONG':
+            stop_hit = self.stop.update(price)
+            if stop_hit or rsi > self.rsi_sell:
+                signal = 'SELL'
+                self.stop.exit()
+        return signal, rsi
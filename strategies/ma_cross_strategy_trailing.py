@@ -1,46 +1,30 @@
-import pandas as pd
+import numpy as np
 
+from services.indicator_cache import IndicatorContext, StreamContext
+from strategies.trailing import TrailingStop, bar_price, signals_frame, stop_signals
 
-def apply_ma_cross_strategy(df, trailing_pct=0.015, return_df=False):
+
+def apply_ma_cross_strategy(df, trailing_pct=0.015, return_df=False, short_window=5, long_window=20,
+                            ctx=None, take_profit=None, intrabar=False):
     """Moving Average cross strategy with trailing stop."""
     df = df.copy()
     if 'price' not in df.columns:
         df['price'] = df['close']
 
-    df['ma_short'] = df['price'].rolling(window=5).mean()
-    df['ma_long'] = df['price'].rolling(window=20).mean()
+    ctx = IndicatorContext(df) if ctx is None else ctx
+    df['ma_short'] = ctx.get('sma', window=short_window)
+    df['ma_long'] = ctx.get('sma', window=long_window)
     df.dropna(inplace=True)
 
-    signals = []
-    position = None
-    entry_price = 0
-    stop_price = 0
-    peak_price = 0
-
-    for i in range(1, len(df)):
-        timestamp = df.index[i]
-        price = df['price'].iloc[i]
-        short = df['ma_short'].iloc[i]
-        long = df['ma_long'].iloc[i]
-
-        if short > long and df['ma_short'].iloc[i-1] <= df['ma_long'].iloc[i-1]:
-            # Golden Cross - BUY sinyali
-            signals.append({'timestamp': timestamp, 'signal': 'BUY', 'price': price, 'value': short})
-            position = 'LONG'
-            entry_price = price
-            stop_price = price * (1 - trailing_pct)
-            peak_price = price
-
-        elif position == 'LONG':
-            if price > peak_price:
-                peak_price = price
-                stop_price = max(stop_price, peak_price * (1 - trailing_pct))
-
-            if price < stop_price:
-                signals.append({'timestamp': timestamp, 'signal': 'SELL', 'price': price, 'value': short})
-                position = None
-
-    signals_df = pd.DataFrame(signals)
+    price = df['price'].to_numpy(dtype=float)
+    short = df['ma_short'].to_numpy(dtype=float)
+    long = df['ma_long'].to_numpy(dtype=float)
+    # Golden Cross - BUY sinyali (also fires while already long, restarting the stop)
+    golden = np.zeros(len(df), dtype=bool)
+    golden[1:] = (short[1:] > long[1:]) & (short[:-1] <= long[:-1])
+    buy_idx, sell_idx, sell_price = stop_signals(df, price, golden, trailing_pct=trailing_pct, reenter=True,
+                                                 take_profit=take_profit, intrabar=intrabar)
+    signals_df = signals_frame(df.index, price, short, buy_idx, sell_idx, sell_price)
 
     latest_signal = None
     if not signals_df.empty and signals_df.iloc[-1]['timestamp'] == df.index[-1]:
@@ -52,3 +36,50 @@ def apply_ma_cross_strategy(df, trailing_pct=0.015, return_df=False):
         return latest_signal, latest_value, signals_df
 
     return latest_signal, latest_value
+
+
+class MACrossStrategy:
+    """Streaming counterpart of :func:`apply_ma_cross_strategy`.
+
+    Feed closed bars one at a time with :meth:`step`; signals match the batch
+    function bar for bar over the same history.
+    """
+
+    def __init__(self, trailing_pct=0.015, short_window=5, long_window=20, ctx=None):
+        self.ctx = StreamContext() if ctx is None else ctx
+        self._owns_ctx = ctx is None
+        self._short = self.ctx.require('sma', window=short_window)
+        self._long = self.ctx.require('sma', window=long_window)
+        self.lookback = max(short_window, long_window) + 1  # closed bars before the first possible cross
+        self.stop = TrailingStop(trailing_pct)
+        self.valid_bars = 0
+        self._prev = None
+
+    @property
+    def ready(self):
+        """``True`` once the batch function would return a value."""
+        return self.valid_bars > 0
+
+    def step(self, bar):
+        """Process one closed bar and return ``(signal, value)``."""
+        if self._owns_ctx:
+            self.ctx.update(bar)
+        price = bar_price(bar)
+        short, long = self.ctx[self._short], self.ctx[self._long]
+        if short != short or long != long:
+            return None, None
+        self.valid_bars += 1
+        prev, self._prev = self._prev, (short, long)
+        if prev is None:
+            return None, short
+
+        signal = None
+        if short > long and prev[0] <= prev[1]:
+            # Golden Cross - BUY sinyali
+            signal = 'BUY'
+            self.stop.enter(price)
+        elif self.stop.position == 'LONG':
+            if self.stop.update(price):
+                signal = 'SELL'
+                self.stop.exit()
+        return signal, short
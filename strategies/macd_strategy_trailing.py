@@ -1,47 +1,31 @@
-import pandas as pd
-import ta
+import numpy as np
 
+from services.indicator_cache import IndicatorContext, StreamContext
+from strategies.trailing import TrailingStop, bar_price, signals_frame, stop_signals
 
-def apply_macd_strategy(df, trailing_pct=0.015, return_df=False):
+
+def apply_macd_strategy(df, trailing_pct=0.015, return_df=False,
+                        window_fast=12, window_slow=26, window_sign=9, ctx=None,
+                        take_profit=None, intrabar=False):
     """Apply MACD strategy with trailing stop."""
     df = df.copy()
     if 'price' not in df.columns:
         df['price'] = df['close']
 
-    macd = ta.trend.MACD(close=df['price'])
-    df['macd'] = macd.macd()
-    df['signal_line'] = macd.macd_signal()
+    ctx = IndicatorContext(df) if ctx is None else ctx
+    df['macd'] = ctx.get('macd', window_fast=window_fast, window_slow=window_slow)
+    df['signal_line'] = ctx.get('macd_signal', window_fast=window_fast,
+                                window_slow=window_slow, window_sign=window_sign)
     df.dropna(inplace=True)
 
-    signals = []
-    position = None
-    entry_price = 0
-    stop_price = 0
-    peak_price = 0
-
-    for i in range(1, len(df)):
-        timestamp = df.index[i]
-        price = df['price'].iloc[i]
-        macd_val = df['macd'].iloc[i]
-        signal_val = df['signal_line'].iloc[i]
-
-        if macd_val > signal_val and df['macd'].iloc[i-1] <= df['signal_line'].iloc[i-1] and position is None:
-            signals.append({'timestamp': timestamp, 'signal': 'BUY', 'price': price, 'value': macd_val})
-            position = 'LONG'
-            entry_price = price
-            stop_price = price * (1 - trailing_pct)
-            peak_price = price
-
-        elif position == 'LONG':
-            if price > peak_price:
-                peak_price = price
-                stop_price = max(stop_price, peak_price * (1 - trailing_pct))
-
-            if price < stop_price:
-                signals.append({'timestamp': timestamp, 'signal': 'SELL', 'price': price, 'value': macd_val})
-                position = None
-
-    signals_df = pd.DataFrame(signals)
+    price = df['price'].to_numpy(dtype=float)
+    macd_val = df['macd'].to_numpy(dtype=float)
+    signal_val = df['signal_line'].to_numpy(dtype=float)
+    cross_up = np.zeros(len(df), dtype=bool)
+    cross_up[1:] = (macd_val[1:] > signal_val[1:]) & (macd_val[:-1] <= signal_val[:-1])
+    buy_idx, sell_idx, sell_price = stop_signals(df, price, cross_up, trailing_pct=trailing_pct,
+                                                 take_profit=take_profit, intrabar=intrabar)
+    signals_df = signals_frame(df.index, price, macd_val, buy_idx, sell_idx, sell_price)
 
     latest_signal = None
     if not signals_df.empty and signals_df.iloc[-1]['timestamp'] == df.index[-1]:
@@ -53,3 +37,52 @@ def apply_macd_strategy(df, trailing_pct=0.015, return_df=False):
         return latest_signal, latest_value, signals_df
 
     return latest_signal, latest_value
+
+
+class MACDStrategy:
+    """Streaming counterpart of :func:`apply_macd_strategy`.
+
+    Feed closed bars one at a time with :meth:`step`; signals match the batch
+    function bar for bar over the same history.
+    """
+
+    def __init__(self, trailing_pct=0.015, window_fast=12, window_slow=26, window_sign=9, ctx=None):
+        self.ctx = StreamContext() if ctx is None else ctx
+        self._owns_ctx = ctx is None
+        self._macd = self.ctx.require('macd', window_fast=window_fast, window_slow=window_slow)
+        self._signal = self.ctx.require('macd_signal', window_fast=window_fast,
+                                        window_slow=window_slow, window_sign=window_sign)
+        # closed bars before the first possible signal: the slow EMA, then the
+        # signal EMA over the MACD line, plus one bar to see a cross
+        self.lookback = max(window_fast, window_slow) + window_sign
+        self.stop = TrailingStop(trailing_pct)
+        self.valid_bars = 0
+        self._prev = None
+
+    @property
+    def ready(self):
+        """``True`` once the batch function would return a value."""
+        return self.valid_bars > 0
+
+    def step(self, bar):
+        """Process one closed bar and return ``(signal, value)``."""
+        if self._owns_ctx:
+            self.ctx.update(bar)
+        price = bar_price(bar)
+        macd_val, signal_val = self.ctx[self._macd], self.ctx[self._signal]
+        if macd_val != macd_val or signal_val != signal_val:
+            return None, None
+        self.valid_bars += 1
+        prev, self._prev = self._prev, (macd_val, signal_val)
+        if prev is None:
+            return None, macd_val
+
+        signal = None
+        if macd_val > signal_val and prev[0] <= prev[1] and self.stop.position is None:
+            signal = 'BUY'
+            self.stop.enter(price)
+        elif self.stop.position == 'LONG':
+            if self.stop.update(price):
+                signal = 'SELL'
+                self.stop.exit()
+        return signal, macd_val
@@ -0,0 +1,41 @@
+"""Name -> implementation tables for the trailing strategies.
+
+Runners that need to look strategies up by name (sweeps, walk-forward, ...)
+use these instead of keeping their own copies of the import list.
+"""
+from strategies.rsi_strategy_trailing import apply_rsi_strategy, RSIStrategy
+from strategies.macd_strategy_trailing import apply_macd_strategy, MACDStrategy
+from strategies.bollinger_strategy_trailing import apply_bollinger_strategy, BollingerStrategy
+from strategies.ma_cross_strategy_trailing import apply_ma_cross_strategy, MACrossStrategy
+from strategies.custom_strategy_trailing import apply_custom_strategy, CustomStrategy
+
+# batch functions: df -> (signal, value[, signals_df])
+TRAILING_STRATEGIES = {
+    "RSI": apply_rsi_strategy,
+    "MACD": apply_macd_strategy,
+    "BOLLINGER": apply_bollinger_strategy,
+    "MA_CROSS": apply_ma_cross_strategy,
+    "CUSTOM": apply_custom_strategy,
+}
+
+# streaming classes with step(bar) -> (signal, value)
+STREAMING_STRATEGIES = {
+    "RSI": RSIStrategy,
+    "MACD": MACDStrategy,
+    "BOLLINGER": BollingerStrategy,
+    "MA_CROSS": MACrossStrategy,
+    "CUSTOM": CustomStrategy,
+}
+
+
+def max_lookback(strategies):
+    """Closed bars the longest warm-up of ``strategies`` (streaming instances) needs."""
+    return max((strategy.lookback for strategy in strategies), default=0)
+
+
+def check_window(name, bars, lookback):
+    """Warn when ``name`` got fewer than ``lookback`` closed bars to warm up on; returns ``bars >= lookback``."""
+    if bars < lookback:
+        print(f"[WARN] {name}: {bars} closed bars, needs {lookback} before its first signal")
+        return False
+    return True
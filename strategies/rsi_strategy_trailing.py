@@ -1,8 +1,9 @@
-import pandas as pd
-import ta
+from services.indicator_cache import IndicatorContext, StreamContext
+from strategies.trailing import TrailingStop, bar_price, signals_frame, stop_signals
 
 
-def apply_rsi_strategy(df, trailing_pct=0.015, return_df=False):
+def apply_rsi_strategy(df, trailing_pct=0.015, return_df=False, rsi_window=14, buy_threshold=30,
+                       ctx=None, take_profit=None, intrabar=False):
     """Apply RSI strategy with trailing stop.
 
     Parameters
@@ -13,6 +14,17 @@ def apply_rsi_strategy(df, trailing_pct=0.015, return_df=False):
         Trailing stop percentage.
     return_df : bool, optional
         When ``True`` also return the dataframe of generated signals.
+    rsi_window : int, optional
+        RSI lookback.
+    buy_threshold : float, optional
+        Enter when the RSI is below this level.
+    ctx : IndicatorContext, optional
+        Shared indicator columns for ``df``; computed privately when omitted.
+    take_profit : float, optional
+        Also sell once the price is this fraction above the entry.
+    intrabar : bool, optional
+        Trigger the stop/target on the bars' high/low (``df`` needs
+        ``open``/``high``/``low``); SELL prices are then the fills.
 
     Returns
     -------
@@ -25,37 +37,15 @@ def apply_rsi_strategy(df, trailing_pct=0.015, return_df=False):
     if 'price' not in df.columns:
         df['price'] = df['close']
 
-    df['rsi'] = ta.momentum.RSIIndicator(close=df['price'], window=14).rsi()
+    ctx = IndicatorContext(df) if ctx is None else ctx
+    df['rsi'] = ctx.get('rsi', window=rsi_window)
     df.dropna(inplace=True)
 
-    signals = []
-    position = None
-    entry_price = 0
-    stop_price = 0
-    peak_price = 0
-
-    for i in range(1, len(df)):
-        timestamp = df.index[i]
-        price = df['price'].iloc[i]
-        rsi = df['rsi'].iloc[i]
-
-        if rsi < 30 and position is None:
-            signals.append({'timestamp': timestamp, 'signal': 'BUY', 'price': price, 'value': rsi})
-            position = 'LONG'
-            entry_price = price
-            stop_price = price * (1 - trailing_pct)
-            peak_price = price
-
-        elif position == 'LONG':
-            if price > peak_price:
-                peak_price = price
-                stop_price = max(stop_price, peak_price * (1 - trailing_pct))
-
-            if price < stop_price:
-                signals.append({'timestamp': timestamp, 'signal': 'SELL', 'price': price, 'value': rsi})
-                position = None
-
-    signals_df = pd.DataFrame(signals)
+    price = df['price'].to_numpy(dtype=float)
+    rsi = df['rsi'].to_numpy(dtype=float)
+    buy_idx, sell_idx, sell_price = stop_signals(df, price, rsi < buy_threshold, trailing_pct=trailing_pct,
+                                                 take_profit=take_profit, intrabar=intrabar)
+    signals_df = signals_frame(df.index, price, rsi, buy_idx, sell_idx, sell_price)
 
     latest_signal = None
     if not signals_df.empty and signals_df.iloc[-1]['timestamp'] == df.index[-1]:
@@ -67,3 +57,53 @@ def apply_rsi_strategy(df, trailing_pct=0.015, return_df=False):
         return latest_signal, latest_value, signals_df
 
     return latest_signal, latest_value
+
+
+class RSIStrategy:
+    """Streaming counterpart of :func:`apply_rsi_strategy`.
+
+    Feed closed bars one at a time with :meth:`step`.  Only the newest bar is
+    processed, so the cost per bar does not depend on the history length, and
+    over the same bars the signals match the batch function bar for bar.
+
+    Strategies built on the same ``ctx`` (a :class:`StreamContext`) share
+    their indicators; whoever created the context calls ``ctx.update(bar)``
+    before stepping them.  Without ``ctx`` the strategy keeps its own.
+    """
+
+    def __init__(self, trailing_pct=0.015, rsi_window=14, buy_threshold=30, ctx=None):
+        self.ctx = StreamContext() if ctx is None else ctx
+        self._owns_ctx = ctx is None
+        self._rsi = self.ctx.require('rsi', window=rsi_window)
+        self.buy_threshold = buy_threshold
+        # closed bars before the first possible signal: RSI needs ``window``, plus one to compare
+        self.lookback = rsi_window + 1
+        self.stop = TrailingStop(trailing_pct)
+        self.valid_bars = 0
+
+    @property
+    def ready(self):
+        """``True`` once the batch function would return a value."""
+        return self.valid_bars > 0
+
+    def step(self, bar):
+        """Process one closed bar and return ``(signal, value)``."""
+        if self._owns_ctx:
+            self.ctx.update(bar)
+        price = bar_price(bar)
+        rsi = self.ctx[self._rsi]
+        if rsi != rsi:
+            return None, None
+        self.valid_bars += 1
+        if self.valid_bars == 1:
+            return None, rsi
+
+        signal = None
+        if rsi < self.buy_threshold and self.stop.position is None:
+            signal = 'BUY'
+            self.stop.enter(price)
+        elif self.stop.position == 'LONG':
+            if self.stop.update(price):
+                signal = 'SELL'
+                self.stop.exit()
+        return signal, rsi
@@ -0,0 +1,288 @@
+"""Shared pieces of the *_strategy_trailing modules."""
+import numpy as np
+import pandas as pd
+
+
+def bar_price(bar):
+    """Price of a single bar (dict or Series); ``price`` wins over ``close``."""
+    return float(bar["price"] if "price" in bar else bar["close"])
+
+
+class TrailingStop:
+    """Long-only position guarded by a trailing stop.
+
+    This is the position/peak/stop bookkeeping the trailing strategies do in
+    their loops, kept as an object so it can be carried from bar to bar.
+    """
+
+    def __init__(self, trailing_pct=0.015):
+        self.trailing_pct = trailing_pct
+        self.position = None
+        self.entry_price = 0
+        self.stop_price = 0
+        self.peak_price = 0
+
+    def enter(self, price):
+        self.position = 'LONG'
+        self.entry_price = price
+        self.stop_price = price * (1 - self.trailing_pct)
+        self.peak_price = price
+
+    def update(self, price):
+        """Ratchet the stop up with a new price; return ``True`` if it was hit."""
+        if price > self.peak_price:
+            self.peak_price = price
+            self.stop_price = max(self.stop_price, self.peak_price * (1 - self.trailing_pct))
+        return price < self.stop_price
+
+    def exit(self):
+        self.position = None
+
+
+def _find_stop(price, entry, lo, hi, trailing_pct, take_profit=None):
+    """First bar in ``[lo, hi)`` where the trailing stop from ``entry`` is hit.
+
+    Scans in growing chunks so a short trade only touches a few bars while a
+    long one costs a handful of vectorised passes.  A ``take_profit`` target
+    (fraction above the entry price) also ends the trade.  Returns ``hi`` if
+    neither is hit.
+    """
+    if trailing_pct is None and take_profit is None:
+        return hi
+    peak = price[entry]
+    target = price[entry] * (1 + take_profit) if take_profit is not None else np.inf
+    chunk = 64
+    while lo < hi:
+        end = min(lo + chunk, hi)
+        seg = price[lo:end]
+        peaks = np.maximum.accumulate(seg)
+        np.maximum(peaks, peak, out=peaks)
+        if trailing_pct is None:
+            hit = np.flatnonzero(seg >= target)
+        else:
+            hit = np.flatnonzero((seg < peaks * (1 - trailing_pct)) | (seg >= target))
+        if hit.size:
+            return lo + int(hit[0])
+        peak = peaks[-1]
+        lo = end
+        chunk *= 2
+    return hi
+
+
+def _bar_exit(o, h, l, c, peak_before, peak_after, keep, target):
+    """Fill price of a stop/target inside one bar, or None.
+
+    The bar is assumed to trade open -> low -> high -> close when it closes
+    up and open -> high -> low -> close when it closes down; the stop is
+    ``peak * keep`` with the peak ratcheting up as the high is made.
+    """
+    if keep is not None and o < peak_before * keep:
+        return o  # gapped through the stop
+    if o >= target:
+        return o
+    if c >= o:
+        stop = max(peak_before, o) * keep if keep is not None else -np.inf
+        if l < stop:
+            return stop
+        if h >= target:
+            return target
+        if keep is not None and c < peak_after * keep:
+            return peak_after * keep  # pulled back from the new high
+    else:
+        if h >= target:
+            return target
+        if keep is not None and l < peak_after * keep:
+            return peak_after * keep
+    return None
+
+
+def _find_intrabar_exit(o, h, l, c, entry, lo, hi, trailing_pct, take_profit=None):
+    """First bar in ``[lo, hi)`` where the stop or target fills, from the bars' OHLC.
+
+    Same chunked scan as :func:`_find_stop`.  A bar is a candidate when its
+    low is under the stop computed from the highs so far (this bar's
+    included) or its high reaches the target -- a superset of the real exits
+    that costs the same few array operations as the close-only test; the
+    rare candidates are then walked through :func:`_bar_exit`.  Returns
+    ``(bar, fill price)``, or ``(hi, nan)`` when nothing fills.
+    """
+    if trailing_pct is None and take_profit is None:
+        return hi, np.nan
+    keep = 1 - trailing_pct if trailing_pct is not None else None
+    peak = float(c[entry])
+    target = peak * (1 + take_profit) if take_profit is not None else np.inf
+    chunk = 64
+    while lo < hi:
+        end = min(lo + chunk, hi)
+        peaks = np.maximum.accumulate(h[lo:end])
+        np.maximum(peaks, peak, out=peaks)
+        if keep is None:
+            candidate = h[lo:end] >= target
+        elif take_profit is None:
+            candidate = l[lo:end] < peaks * keep
+        else:
+            candidate = (l[lo:end] < peaks * keep) | (h[lo:end] >= target)
+        for j in candidate.nonzero()[0].tolist():
+            i = lo + j
+            fill = _bar_exit(float(o[i]), float(h[i]), float(l[i]), float(c[i]),
+                             float(peaks[j - 1]) if j else peak, float(peaks[j]), keep, target)
+            if fill is not None:
+                return i, fill
+        peak = float(peaks[-1])
+        lo = end
+        chunk *= 2
+    return hi, np.nan
+
+
+def _walk(entry, exit, n, start, reenter, find_exit, intrabar):
+    """BUY/SELL loop shared by the close-only and intrabar versions.
+
+    ``find_exit(entry_bar, lo, hi)`` returns ``(bar, fill)`` for the first
+    stop/target in ``[lo, hi)`` or ``hi`` when there is none.  Intrabar
+    fills also look at the bar of the next exit/entry signal, since the
+    stop trades before that bar's close.
+    """
+    entries = np.flatnonzero(np.asarray(entry, dtype=bool)[start:]) + start
+    exits = (np.flatnonzero(np.asarray(exit, dtype=bool)[start:]) + start
+             if exit is not None else np.empty(0, dtype=np.intp))
+
+    find_entry, find_exit_signal = entries.searchsorted, exits.searchsorted
+    entries, exits = entries.tolist(), exits.tolist()
+    buys, sells, fills = [], [], []
+    pos = start
+    while True:
+        k = int(find_entry(pos))
+        if k == len(entries):
+            break
+        e = entries[k]
+        buys.append(e)
+
+        next_entry = entries[k + 1] if reenter and k + 1 < len(entries) else n
+        x = int(find_exit_signal(e + 1))
+        next_exit = exits[x] if x < len(exits) else n
+        limit = min(next_entry, next_exit)
+
+        end = min(limit + 1, n) if intrabar else limit
+        hit, fill = find_exit(e, e + 1, end)
+        if hit < end:
+            sells.append(hit)
+            fills.append(fill)
+            pos = hit + 1
+            continue
+        if limit == n:
+            break  # still long at the end of the data
+        if limit == next_entry:
+            pos = limit  # re-entry wins over an exit on the same bar
+        else:
+            sells.append(limit)
+            fills.append(np.nan)
+            pos = limit + 1
+
+    return (np.asarray(buys, dtype=np.intp), np.asarray(sells, dtype=np.intp),
+            np.asarray(fills, dtype=float))
+
+
+def trailing_stop_signals(price, entry, exit=None, trailing_pct=0.015, start=1, reenter=False,
+                          take_profit=None):
+    """Array version of the BUY/SELL loop shared by the trailing strategies.
+
+    Walking bars from ``start`` on: BUY when ``entry`` is true and we are flat
+    (or at every entry when ``reenter`` is set, which restarts the stop); while
+    long, SELL when the price drops below ``peak * (1 - trailing_pct)``, when it
+    reaches ``entry_price * (1 + take_profit)`` or when ``exit`` is true.
+    ``trailing_pct=None`` disables the stop.
+
+    Parameters
+    ----------
+    price : array-like of float
+    entry, exit : array-like of bool
+        Entry and exit conditions per bar; ``exit`` is optional.
+    trailing_pct : float or None
+    start : int
+        First bar the loop looks at.
+    reenter : bool
+        Whether an entry while already long emits another BUY.
+    take_profit : float or None
+        Target above the entry price; ``None`` disables it.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        ``(buy_idx, sell_idx)`` positional indices into ``price``.
+    """
+    price = np.asarray(price, dtype=float)
+
+    def find_exit(e, lo, hi):
+        return _find_stop(price, e, lo, hi, trailing_pct, take_profit), None
+
+    buys, sells, _ = _walk(entry, exit, len(price), start, reenter, find_exit, intrabar=False)
+    return buys, sells
+
+
+def intrabar_stop_signals(open_, high, low, close, entry, exit=None, trailing_pct=0.015, start=1,
+                          reenter=False, take_profit=None):
+    """:func:`trailing_stop_signals` with stops and targets filled inside the bar.
+
+    Entries (and ``exit`` signals) still trade at the close, but the trailing
+    stop follows the bars' highs and triggers on their lows, so a wick
+    through the stop sells even when the bar closes above it.  The fill is
+    the stop (or target) level, or the open when the bar gaps through it.
+    When the stop fills on the same bar as an exit or re-entry signal, the
+    stop comes first and that signal is dropped.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        ``(buy_idx, sell_idx, sell_price)``; ``sell_price`` is the fill of
+        each SELL (the close for signal exits).
+    """
+    o = np.asarray(open_, dtype=float)
+    h = np.asarray(high, dtype=float)
+    l = np.asarray(low, dtype=float)
+    c = np.asarray(close, dtype=float)
+
+    def find_exit(e, lo, hi):
+        return _find_intrabar_exit(o, h, l, c, e, lo, hi, trailing_pct, take_profit)
+
+    buys, sells, fills = _walk(entry, exit, len(c), start, reenter, find_exit, intrabar=True)
+    fills[np.isnan(fills)] = c[sells[np.isnan(fills)]]
+    return buys, sells, fills
+
+
+def stop_signals(df, price, entry, exit=None, trailing_pct=0.015, start=1, reenter=False,
+                 take_profit=None, intrabar=False):
+    """``(buy_idx, sell_idx, sell_price)`` for a strategy frame.
+
+    Close-only (:func:`trailing_stop_signals`, SELLs at ``price``) unless
+    ``intrabar`` is set, which takes the open/high/low columns of ``df``
+    with ``price`` as the close (:func:`intrabar_stop_signals`).
+    """
+    price = np.asarray(price, dtype=float)
+    if intrabar:
+        return intrabar_stop_signals(
+            df["open"].to_numpy(dtype=float), df["high"].to_numpy(dtype=float),
+            df["low"].to_numpy(dtype=float), price, entry, exit=exit, trailing_pct=trailing_pct,
+            start=start, reenter=reenter, take_profit=take_profit)
+    buy_idx, sell_idx = trailing_stop_signals(price, entry, exit=exit, trailing_pct=trailing_pct,
+                                              start=start, reenter=reenter, take_profit=take_profit)
+    return buy_idx, sell_idx, price[sell_idx]
+
+
+def signals_frame(index, price, value, buy_idx, sell_idx, sell_price=None):
+    """Build the ``signals_df`` returned by the strategies from index arrays.
+
+    ``sell_price`` overrides the ``price`` of the SELL rows (intrabar fills).
+    """
+    idx = np.concatenate([buy_idx, sell_idx])
+    is_buy = np.concatenate([np.ones(len(buy_idx), bool), np.zeros(len(sell_idx), bool)])
+    fill = np.asarray(price, dtype=float)[idx]
+    if sell_price is not None:
+        fill[len(buy_idx):] = sell_price
+    order = np.argsort(idx, kind="stable")
+    idx, is_buy, fill = idx[order], is_buy[order], fill[order]
+    return pd.DataFrame({
+        'timestamp': np.asarray(index)[idx],
+        'signal': np.where(is_buy, 'BUY', 'SELL'),
+        'price': fill,
+        'value': np.asarray(value, dtype=float)[idx],
+    })
@@ -1,12 +1,17 @@
+"""Summary of the per-strategy logs (searched recursively, flexible columns).
+
+Only rows appended since the last run are read; the checkpoint lives in
+logs/.summarize_simulation.json (see services/summarizer.py).  --full rebuilds.
+"""
+import argparse
 from pathlib import Path
 import pandas as pd
-import math
+
+from services.summarizer import Summarizer
 
 LOG_DIR = Path("logs")
 LOG_DIR.mkdir(exist_ok=True)
 
-EXCLUDE = {"summary_counts.csv", "summary_pnl.csv", "summary.txt", "trades.csv"}
-
 def pick(cols, *candidates):
     cols = set(cols)
     for opts in candidates:
@@ -43,21 +48,8 @@ def normalize_signal(s):
     })
     return s
 
-files = sorted(
-    f for f in LOG_DIR.rglob("*_log.csv")
-    if f.is_file() and f.name not in EXCLUDE
-)
-
-if not files:
-    raise SystemExit(f"No per-strategy logs found under {LOG_DIR.resolve()} (searched recursively). "
-                     f"Expected files like rsi_log.csv, macd_log.csv, exec_log.csv.")
-
-rows_kept = 0
-dfs = []
-for f in files:
-    df_raw = pd.read_csv(f)
-    df_raw.columns = [c.strip().lower() for c in df_raw.columns]
-
+def normalize(df_raw, f):
+    """One chunk of log ``f`` as trades_simulation.csv rows (``None`` when its columns don't fit)."""
     ts_col   = pick(df_raw.columns, ("timestamp","time","ts","datetime","date"))
     px_col   = pick(df_raw.columns, ("fill_price","avg_price","price","px","close"))
     sig_col  = pick(df_raw.columns, ("signal","side","action","type","direction","event"))
@@ -67,7 +59,7 @@ for f in files:
     if ts_col is None or sig_col is None or px_col is None:
         print(f"[WARN] {f.name}: missing key columns "
               f"(timestamp? signal? price?). Found: {list(df_raw.columns)[:10]}...")
-        continue
+        return None
 
     df = pd.DataFrame({
         "timestamp": to_ts(df_raw[ts_col]),
@@ -83,55 +75,34 @@ for f in files:
         df = df[df_raw["status"].astype(str).str.upper().isin({"FILLED", "EXECUTED", "DONE"})]
 
     # Infer strategy name from file name (e.g., rsi_log.csv -> RSI)
-    inferred = f.stem.replace("_log","").upper()
-    df["strategy_name"] = inferred
+    df["strategy_name"] = f.stem.replace("_log","").upper()
 
     before = len(df)
     df = df.dropna(subset=["timestamp","price"])
-    kept = len(df)
-    rows_kept += kept
-    print(f"[OK] {f.name}: kept {kept}/{before} rows as trades/signals; "
-          f"first={df['timestamp'].min()} last={df['timestamp'].max()} strategy={inferred}")
-
-    if kept:
-        dfs.append(df)
-
-if not dfs:
-    raise SystemExit("Parsed 0 usable rows. Check that your logs actually include timestamp, signal and price fields.")
-
-all_trades = pd.concat(dfs, ignore_index=True).sort_values("timestamp")
-combined_path = LOG_DIR / "trades.csv"
-all_trades.to_csv(combined_path, index=False)
-
-# counts per strategy/signal
-counts = (
-    all_trades.pivot_table(index="strategy_name", columns="signal", aggfunc="size", fill_value=0)
-    .sort_index()
-)
-
-def naive_pnl(group: pd.DataFrame):
-    pos = 0; entry = None; pnl = 0.0; trades = 0
-    for _, row in group.iterrows():
-        sig, px = row["signal"], row["price"]
-        if sig == "BUY" and pos == 0:
-            pos, entry = 1, px
-        elif sig == "SELL" and pos == 1:
-            pnl += (px - entry); trades += 1; pos, entry = 0, None
-    return pd.Series({"round_trips": trades, "pnl_points": pnl})
-
-pnl = all_trades.groupby("strategy_name", sort=True).apply(naive_pnl)
-
-summary_txt = []
-summary_txt.append(f"Rows: {len(all_trades)}")
-summary_txt.append(f"Range: {all_trades['timestamp'].min()} → {all_trades['timestamp'].max()}")
-summary_txt.append("\nCounts per strategy/signal:\n")
-summary_txt.append(counts.to_string())
-summary_txt.append("\nNaive long-only PnL (BUY->SELL pairs; ignores fees/size):\n")
-summary_txt.append(pnl.to_string())
-
-(LOG_DIR / "summary.txt").write_text("\n".join(summary_txt), encoding="utf-8")
-counts.to_csv(LOG_DIR / "summary_counts.csv")
-pnl.to_csv(LOG_DIR / "summary_pnl.csv")
-
-print("\n".join(summary_txt))
-print(f"\nWrote: {combined_path}, logs/summary.txt, logs/summary_counts.csv, logs/summary_pnl.csv")
+    df.attrs["before"] = before
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize the per-strategy logs (incrementally).")
+    parser.add_argument("--full", action="store_true", help="ignore the checkpoint and rebuild from scratch")
+    parser.add_argument("--workers", type=int, default=4, help="log files parsed in parallel")
+    args = parser.parse_args()
+
+    summarizer = Summarizer(normalize, log_dir=LOG_DIR, pattern="*_log.csv", recursive=True,
+                            state_file=LOG_DIR / ".summarize_simulation.json",
+                            trades_file="trades_simulation.csv", workers=args.workers)
+    if not summarizer.files():
+        raise SystemExit(f"No per-strategy logs found under {LOG_DIR.resolve()} (searched recursively). "
+                         f"Expected files like rsi_log.csv, macd_log.csv, exec_log.csv.")
+
+    counts, pnl, text, new_rows = summarizer.run(full=args.full)
+    for f, kept, before, first, last in summarizer.report:
+        print(f"[OK] {f.name}: kept {kept}/{before} new rows as trades/signals; "
+              f"first={first} last={last} strategy={f.stem.replace('_log','').upper()}")
+    if not len(counts):
+        raise SystemExit("Parsed 0 usable rows. Check that your logs actually include timestamp, signal and price fields.")
+
+    print(text)
+    print(f"\n{new_rows} new rows. Wrote: {summarizer.trades_path}, logs/summary.txt, "
+          f"logs/summary_counts.csv, logs/summary_pnl.csv")
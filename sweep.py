@@ -0,0 +1,43 @@
+# sweep.py
+"""Run a parameter sweep over the trailing strategies.
+
+    python sweep.py --limit 5000 --workers 8
+    python sweep.py --data data/BTCUSDT-1m-sample.csv --strategies RSI MACD
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from services.sweep import DEFAULT_GRIDS, SELECTION_METRICS, run_sweep
+from settings import SYMBOL, TIMEFRAME
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parameter sweep for the trailing strategies.")
+    parser.add_argument("--data", help="candle CSV to use instead of downloading")
+    parser.add_argument("--symbol", default=SYMBOL)
+    parser.add_argument("--timeframe", default=TIMEFRAME)
+    parser.add_argument("--limit", type=int, default=5000)
+    parser.add_argument("--strategies", nargs="+", default=list(DEFAULT_GRIDS))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--rank-by", default="total_return", choices=list(SELECTION_METRICS))
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--out", help="write the full ranked table to this CSV")
+    args = parser.parse_args()
+
+    if args.data:
+        df = pd.read_csv(args.data, parse_dates=["timestamp"])
+    else:
+        from services.data_service import fetch_ohlcv
+        df = fetch_ohlcv(symbol=args.symbol, timeframe=args.timeframe, limit=args.limit)
+
+    grids = {name: DEFAULT_GRIDS[name] for name in args.strategies}
+    t0 = time.perf_counter()
+    table = run_sweep(df, grids, workers=args.workers, rank_by=args.rank_by)
+    print(f"{len(table)} combination(s) on {len(df)} bars in {time.perf_counter() - t0:.1f}s\n")
+    with pd.option_context("display.max_colwidth", 80, "display.width", 200):
+        print(table.head(args.top).to_string())
+    if args.out:
+        table.to_csv(args.out, index=False)
+        print(f"\nWrote {args.out}")
@@ -0,0 +1,16 @@
+import numpy as np
+import pytest
+
+from services.ohlcv_store import to_frame
+from services.synthetic import SyntheticMarket
+
+START_MS = 1_717_200_000_000
+
+
+@pytest.fixture
+def make_candles():
+    """``make_candles(n, seed)``: ``n`` seeded 1m GBM candles as a DataFrame."""
+    def make(n, seed=0, symbol="BTC/USDT"):
+        market = SyntheticMarket([symbol], seed=seed)
+        return to_frame(np.concatenate([c[symbol] for c in market.generate(START_MS, n)]))
+    return make
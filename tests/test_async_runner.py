@@ -0,0 +1,69 @@
+import asyncio
+
+import pandas as pd
+
+from services.async_runner import AsyncRateLimiter, MultiPairRunner
+from services.fake_exchange import AsyncFakeExchange
+from strategies.registry import STREAMING_STRATEGIES
+
+NOW = 1_717_200_030_000  # half a minute into a 1m bar, and into a 5m bar
+
+
+class PartlyDownExchange(AsyncFakeExchange):
+    """Fails every request for ``down``, serves the rest normally."""
+
+    down = "BAD/USDT"
+
+    async def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None, params=None):
+        if symbol == self.down:
+            raise ConnectionError(f"{symbol} unavailable")
+        self.limits.append(limit)
+        return await super().fetch_ohlcv(symbol, timeframe, since=since, limit=limit, params=params)
+
+
+def closed_before(now_ms, tf_ms, n):
+    """Open times of the ``n`` newest bars closed at ``now_ms``."""
+    forming = now_ms // tf_ms * tf_ms
+    return [pd.Timestamp(forming - k * tf_ms, unit="ms") for k in range(n, 0, -1)]
+
+
+def test_cycles_process_only_new_bars():
+    exchange = PartlyDownExchange(now_ms=NOW)
+    exchange.limits = []
+    seen = []
+
+    def on_result(pair, bar, outputs):
+        seen.append((pair.symbol, pair.timeframe, bar["timestamp"], [name for name, _, _ in outputs]))
+
+    runner = MultiPairRunner(exchange, [("BTC/USDT", "1m"), ("ETH/USDT", "1m"), ("BTC/USDT", "5m"),
+                                        ("BAD/USDT", "1m")],
+                             rate_limiter=AsyncRateLimiter(rate=1e6), on_result=on_result)
+
+    async def two_cycles():
+        first = await runner.run_cycle()
+        exchange.now_ms += 5 * 60_000
+        return first, await runner.run_cycle()
+
+    first, second = asyncio.run(two_cycles())
+
+    # warm-up: every healthy pair reports its newest closed bar with all strategies ready
+    assert first["new_bars"] == 3
+    assert list(first["errors"]) == [("BAD/USDT", "1m")]
+    assert [s[:3] for s in seen[:3]] == [
+        ("BTC/USDT", "1m", closed_before(NOW, 60_000, 1)[0]),
+        ("ETH/USDT", "1m", closed_before(NOW, 60_000, 1)[0]),
+        ("BTC/USDT", "5m", closed_before(NOW, 300_000, 1)[0]),
+    ]
+    assert all(names == list(STREAMING_STRATEGIES) for *_, names in seen[:3])
+    lookback = runner.pairs[0].lookback
+    assert exchange.limits[:3] == [lookback + 1] * 3
+
+    # next cycle: only the bars closed since, each once and in order
+    now = exchange.now_ms
+    assert second["new_bars"] == 5 + 5 + 1
+    assert list(second["errors"]) == [("BAD/USDT", "1m")]
+    for symbol, tf, tf_ms, n in [("BTC/USDT", "1m", 60_000, 5), ("ETH/USDT", "1m", 60_000, 5),
+                                  ("BTC/USDT", "5m", 300_000, 1)]:
+        stamps = [ts for s, t, ts, _ in seen[3:] if (s, t) == (symbol, tf)]
+        assert stamps == closed_before(now, tf_ms, n)
+    assert max(exchange.limits[3:]) < lookback
@@ -0,0 +1,35 @@
+import pytest
+
+from services.backtest_service import run_backtest, strategy_signals
+from services.simulation import BacktestSimulation
+from strategies.registry import TRAILING_STRATEGIES
+
+
+def loop_backtest(strat, df, intrabar=False):
+    """The bar-by-bar BacktestSimulation loop run_backtest used to be."""
+    bars = df.set_index("timestamp")
+    signals = strategy_signals(strat, bars, intrabar=intrabar)
+    by_bar = {ts: (sig, px) for ts, sig, px in zip(signals["timestamp"], signals["signal"], signals["price"])}
+    sim = BacktestSimulation(initial_balance=1000.0)
+    for ts, price in zip(bars.index, bars["price"]):
+        if ts in by_bar:
+            signal, fill = by_bar[ts]
+            # intrabar SELLs fill at the stop, everything else at the close
+            sim.process_signal(signal, fill if intrabar and signal == "SELL" else price)
+    sim.close_final(float(bars["price"].iloc[-1]))
+    return sim
+
+
+@pytest.mark.parametrize("intrabar", [False, True])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("name", list(TRAILING_STRATEGIES))
+def test_vectorised_fills_match_the_loop(make_candles, name, seed, intrabar):
+    df = make_candles(3000, seed)
+
+    got = run_backtest({name: TRAILING_STRATEGIES[name]}, df=df, intrabar=intrabar)[name]
+
+    sim = loop_backtest(TRAILING_STRATEGIES[name], df, intrabar)
+    total_return, win_rate, drawdown = sim.get_metrics()
+    assert got["trades"].tolist() == sim.trades
+    assert (got["total_return"], got["win_rate"], got["drawdown"]) == (total_return, win_rate, drawdown)
+    assert got["equity_curve"][-1] == pytest.approx(sim.balance, rel=1e-12)
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from services import data_service
+from services.fake_exchange import FakeExchange
+from services.ohlcv_store import OHLCVStore
+
+NOW = 1_717_200_030_000  # half a minute into a 1m bar
+
+
+@pytest.fixture
+def fake(tmp_path, monkeypatch):
+    exchange = FakeExchange(now_ms=NOW)
+    monkeypatch.setattr(data_service, "OHLCV_CACHE", True)
+    monkeypatch.setattr(data_service, "EXCHANGE_ID", exchange.id)
+    monkeypatch.setattr(data_service, "store", OHLCVStore(tmp_path))
+    monkeypatch.setattr(data_service, "get_client", lambda: exchange)
+    monkeypatch.setattr(data_service, "_history", None)
+    return exchange
+
+
+def assert_window(df, limit, now):
+    ts = df["timestamp"].to_numpy(dtype="datetime64[ms]").astype(np.int64)
+    assert len(df) == limit
+    assert (np.diff(ts) == 60_000).all()
+    assert ts[-1] == now // 60_000 * 60_000  # ends with the forming bar
+
+
+@pytest.mark.parametrize("limit", [500, 2000])
+def test_larger_limit_backfills_the_window(fake, limit):
+    assert len(data_service.fetch_ohlcv("BTC/USDT", "1m", limit=40)) == 40
+
+    assert_window(data_service.fetch_ohlcv("BTC/USDT", "1m", limit=limit), limit, NOW)
+
+
+@pytest.mark.parametrize("limit", [100, 3000])
+def test_stale_cache_is_caught_up_without_a_gap(fake, limit):
+    data_service.fetch_ohlcv("BTC/USDT", "1m", limit=100)
+    fake.now_ms += 86_400_000  # a day later the stored tail is outside the window
+
+    assert_window(data_service.fetch_ohlcv("BTC/USDT", "1m", limit=100), 100, fake.now_ms)
+    assert_window(data_service.fetch_ohlcv("BTC/USDT", "1m", limit=limit), limit, fake.now_ms)
+    stored = data_service.store.read(fake.id, "BTC/USDT", "1m")["timestamp"]
+    assert (np.diff(stored) == 60_000).all()
+
+
+def test_cached_window_is_not_refetched(fake):
+    data_service.fetch_ohlcv("BTC/USDT", "1m", limit=500)
+    calls = fake.calls
+
+    df = data_service.fetch_ohlcv("BTC/USDT", "1m", limit=300)
+
+    assert len(df) == 300
+    assert fake.calls == calls + 1  # only the tail
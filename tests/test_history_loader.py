@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from services.fake_exchange import FakeExchange
+from services.history_loader import HistoryLoader, RateLimiter
+from services.ohlcv_store import OHLCVStore
+
+NOW = 1_717_200_030_000
+DAY = 86_400_000
+
+
+class Interrupted(Exception):
+    pass
+
+
+class FlakyExchange(FakeExchange):
+    """Raises on the ``fail_on``-th request, like a dropped connection or Ctrl-C."""
+
+    fail_on = None
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None, params=None):
+        if self.fail_on is not None and self.calls + 1 == self.fail_on:
+            self.fail_on = None
+            raise Interrupted
+        return super().fetch_ohlcv(symbol, timeframe, since=since, limit=limit, params=params)
+
+
+@pytest.fixture
+def loader(tmp_path):
+    exchange = FlakyExchange(now_ms=NOW)
+    store = OHLCVStore(tmp_path)
+    # the live loop has already written a tail
+    store.append(exchange.id, "BTC/USDT", "1m", exchange.fetch_ohlcv("BTC/USDT", "1m", limit=100))
+    return HistoryLoader(exchange, store, rate_limiter=RateLimiter(rate=1e6), page_limit=500, segment_pages=3)
+
+
+def stored(loader):
+    return loader.store.read(loader.exchange.id, "BTC/USDT", "1m")["timestamp"]
+
+
+def test_interrupted_backfill_resumes(loader):
+    since = NOW - 5 * DAY
+    exchange = loader.exchange
+    exchange.fail_on = exchange.calls + 8  # two segments in, one page into the third
+
+    with pytest.raises(Interrupted):
+        loader.download("BTC/USDT", "1m", since=since)
+
+    ts = stored(loader)
+    assert (np.diff(ts) == 60_000).all()
+    assert len(ts) == 100 + 2 * 3 * 500  # the finished segments were kept
+    path = loader.store.path(exchange.id, "BTC/USDT", "1m")
+    assert not path.with_suffix(".prepend").exists()
+
+    calls = exchange.calls
+    loader.download("BTC/USDT", "1m", since=since)
+
+    ts = stored(loader)
+    assert (np.diff(ts) == 60_000).all()
+    assert ts[0] == -(-since // 60_000) * 60_000
+    assert ts[-1] == NOW // 60_000 * 60_000
+    # only what was missing is requested again: 4100 bars in pages of 500,
+    # then the forming bar
+    assert exchange.calls - calls == 9 + 1
+
+
+def test_stale_prepend_file_is_removed(loader):
+    path = loader.store.path(loader.exchange.id, "BTC/USDT", "1m")
+    path.with_suffix(".prepend").write_bytes(b"left by a killed run")
+
+    loader.download("BTC/USDT", "1m", since=NOW - DAY)
+
+    assert not path.with_suffix(".prepend").exists()
+    ts = stored(loader)
+    assert len(ts) == 1440 and (np.diff(ts) == 60_000).all()
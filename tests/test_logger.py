@@ -0,0 +1,27 @@
+import csv
+
+import pytest
+
+from services.logger import TradeLogger
+from services.signal_log import SignalLog
+
+
+@pytest.mark.parametrize("background", [False, True])
+def test_close_writes_everything_then_refuses_rows(tmp_path, background):
+    logger = TradeLogger(tmp_path, max_rows=1000, max_delay=60, background=background,
+                         formats=("csv", "binary"))
+    for i in range(10):
+        logger.log(f"2024-06-01 00:{i:02d}:00", "BTC/USDT", "1m", 40.0 + i, 100.0 + i,
+                   "BUY" if i % 3 == 0 else None, strategy_name="RSI")
+
+    logger.close()
+
+    with open(tmp_path / "rsi_log.csv", newline="", encoding="utf-8") as f:
+        assert len(list(csv.reader(f))) == 1 + 10
+    assert SignalLog(tmp_path / "rsi_log.bin").count() == 10
+    with pytest.raises(ValueError, match="closed"):
+        logger.log("2024-06-01 00:10:00", "BTC/USDT", "1m", 50.0, 110.0, "SELL", strategy_name="RSI")
+    logger.flush()  # a no-op, not a hang on the stopped writer thread
+    logger.close()
+    with open(tmp_path / "rsi_log.csv", newline="", encoding="utf-8") as f:
+        assert len(list(csv.reader(f))) == 1 + 10
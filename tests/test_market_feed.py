@@ -0,0 +1,108 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from services.fake_exchange import FakeExchange, FakeKlineServer
+from services.market_feed import PollFeed, ReplayFeed, WebsocketFeed, make_feed
+from services.ohlcv_store import to_frame, to_records
+
+NOW = 1_717_200_030_000
+MINUTE = pd.Timedelta(minutes=1)
+
+
+def rest_fetch(exchange, fail_on=()):
+    """``fetch_ohlcv``-shaped wrapper around ``exchange``; raises on the given call numbers."""
+    calls = [0]
+
+    def fetch(symbol, timeframe, limit):
+        calls[0] += 1
+        if calls[0] in fail_on:
+            raise ConnectionError("connection reset")
+        return to_frame(to_records(exchange.fetch_ohlcv(symbol, timeframe, limit=limit)))
+    return fetch
+
+
+def assert_consecutive(history, bars):
+    stamps = [history["timestamp"].iloc[-1]] + [bar["timestamp"] for bar in bars]
+    assert all(b - a == MINUTE for a, b in zip(stamps, stamps[1:]))
+
+
+class FakeClock:
+    """Wall clock and ``sleep`` driving the exchange's frozen time."""
+
+    def __init__(self, exchange):
+        self.exchange = exchange
+        self.sleeps = []
+
+    def __call__(self):
+        return self.exchange.now_ms / 1000
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.exchange.now_ms += int(seconds * 1000)
+
+
+@pytest.mark.parametrize("fail_on", [(), (3,), (3, 4, 5)])
+def test_poll_feed_emits_each_closed_bar_once(fail_on):
+    exchange = FakeExchange(now_ms=NOW)
+    clock = FakeClock(exchange)
+    feed = PollFeed(rest_fetch(exchange, fail_on), "BTC/USDT", "1m", limit=50, error_delay=90,
+                    clock=clock, sleep=clock.sleep)
+
+    history = feed.history()
+    bars = []
+    for bar in feed:
+        # a bar is only handed out once it has closed
+        assert bar["timestamp"] + MINUTE <= pd.Timestamp(clock(), unit="s")
+        bars.append(bar)
+        if len(bars) == 10:
+            break
+
+    assert len(history) == 49
+    assert history["timestamp"].iloc[-1] == pd.Timestamp(NOW // 60_000 * 60_000 - 60_000, unit="ms")
+    assert_consecutive(history, bars)
+
+
+def test_replay_feed_warms_up_then_replays_the_rest(make_candles):
+    df = make_candles(120)
+    pauses = []
+    feed = make_feed("replay", "BTC/USDT", "1m", source=df, warmup=100, speed=60, sleep=pauses.append)
+
+    history = feed.history()
+    bars = list(feed)
+
+    assert history["timestamp"].tolist() == df["timestamp"].iloc[:100].tolist()
+    assert [bar["timestamp"] for bar in bars] == df["timestamp"].iloc[100:].tolist()
+    assert pauses == [1.0] * 20
+
+
+def test_replay_feed_needs_a_source():
+    with pytest.raises(ValueError, match="MARKET_FEED_REPLAY"):
+        ReplayFeed(None)
+
+
+def test_websocket_feed_survives_dropped_connections():
+    pytest.importorskip("websockets")
+    # frozen well in the past, so every bar the server closes is final by the wall clock
+    exchange = FakeExchange(now_ms=NOW)
+    # every (re)connect takes a few bars, which only the REST gap fill recovers
+    server = FakeKlineServer(exchange, bar_seconds=0.05, drop_after=3, connect_delay=0.12).start()
+    feed = WebsocketFeed("BTC/USDT", "1m", fetch=rest_fetch(exchange), limit=50, url=server.url)
+    watchdog = threading.Timer(20, feed.close)  # a hang fails the length check instead
+    watchdog.start()
+    try:
+        history = feed.history()
+        bars = []
+        for bar in feed:
+            bars.append(bar)
+            if len(bars) == 15:
+                break
+    finally:
+        watchdog.cancel()
+        feed.close()
+        server.stop()
+
+    assert len(bars) == 15
+    assert server.connections >= 3
+    assert_consecutive(history, bars)
@@ -0,0 +1,11 @@
+import pytest
+
+import offline_replay
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_fast_replay_matches_prefix_replay(make_candles, seed):
+    df = make_candles(200, seed)
+
+    assert offline_replay.check_equivalence(df, len(df)) == []
+    assert any(signal for _, _, outputs in offline_replay.replay_fast(df) for _, signal, _ in outputs)
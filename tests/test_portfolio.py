@@ -0,0 +1,21 @@
+import pytest
+
+from services.backtest_service import run_backtest
+from services.portfolio import backtest_portfolio
+from strategies.registry import TRAILING_STRATEGIES
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("name", list(TRAILING_STRATEGIES))
+def test_single_slot_matches_run_backtest(make_candles, name, seed):
+    df = make_candles(3000, seed)
+    strategies = {name: TRAILING_STRATEGIES[name]}
+
+    expected = run_backtest(strategies, df=df, initial_balance=1000.0)[name]
+    book = backtest_portfolio({"BTC/USDT": df}, strategies, initial_cash=1000.0, fee=0.0,
+                              position_size=1.0)
+    got = book.metrics()
+
+    assert got["trades"] == len(expected["trades"])
+    assert got["win_rate"] == expected["win_rate"]
+    assert got["total_return"] == pytest.approx(expected["total_return"], rel=1e-9, abs=1e-12)
@@ -0,0 +1,18 @@
+import pytest
+
+from services.sweep import SELECTION_METRICS, run_sweep
+
+GRID = {"RSI": {"trailing_pct": [0.01, 0.03], "rsi_window": [7, 14]}}
+
+
+@pytest.mark.parametrize("metric", list(SELECTION_METRICS))
+def test_sorted_best_first(make_candles, metric):
+    table = run_sweep(make_candles(3000), GRID, workers=1, rank_by=metric)
+
+    values = table[metric].tolist()
+    assert values == sorted(values, reverse=SELECTION_METRICS[metric])
+
+
+def test_unknown_metric(make_candles):
+    with pytest.raises(ValueError, match="unknown metric"):
+        run_sweep(make_candles(100), GRID, workers=1, rank_by="sharpe")
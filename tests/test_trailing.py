@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from strategies.registry import STREAMING_STRATEGIES, TRAILING_STRATEGIES
+from strategies.trailing import trailing_stop_signals
+
+
+def reference_signals(price, entry, exit=None, trailing_pct=0.015, start=1, reenter=False,
+                      take_profit=None):
+    """The per-bar loop the strategies ran before the kernel."""
+    buys, sells = [], []
+    long = False
+    entry_price = peak = stop = 0.0
+    for i in range(start, len(price)):
+        p = price[i]
+        if entry[i] and (not long or reenter):
+            buys.append(i)
+            long = True
+            entry_price = peak = p
+            stop = p * (1 - trailing_pct) if trailing_pct is not None else -np.inf
+        elif long:
+            if p > peak:
+                peak = p
+                if trailing_pct is not None:
+                    stop = max(stop, peak * (1 - trailing_pct))
+            hit = p < stop
+            if take_profit is not None and p >= entry_price * (1 + take_profit):
+                hit = True
+            if hit or (exit is not None and exit[i]):
+                sells.append(i)
+                long = False
+    return buys, sells
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("options", [
+    {},
+    {"trailing_pct": 0.005},
+    {"reenter": True},
+    {"take_profit": 0.004},
+    {"trailing_pct": None, "take_profit": 0.004},
+    {"with_exit": True, "start": 2},
+    {"with_exit": True, "reenter": True, "take_profit": 0.01},
+])
+def test_kernel_matches_the_loop(seed, options):
+    options = dict(options)
+    rng = np.random.default_rng(seed)
+    n = 5000
+    price = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    entry = rng.random(n) < 0.02
+    exit = rng.random(n) < 0.01 if options.pop("with_exit", False) else None
+
+    buys, sells = trailing_stop_signals(price, entry, exit=exit, **options)
+
+    ref_buys, ref_sells = reference_signals(price, entry, exit=exit, **options)
+    assert buys.tolist() == ref_buys
+    assert sells.tolist() == ref_sells
+
+
+def streamed(cls, df, **params):
+    strategy = cls(**params)
+    return [strategy.step(bar) for bar in df.reset_index().to_dict("records")]
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("name", ["RSI", "MACD", "MA_CROSS", "CUSTOM"])
+def test_step_matches_the_batch_signals(make_candles, name, seed):
+    df = make_candles(3000, seed).set_index("timestamp")
+
+    _, _, batch = TRAILING_STRATEGIES[name](df, return_df=True)
+    steps = streamed(STREAMING_STRATEGIES[name], df)
+
+    fired = [(ts, signal, value) for ts, (signal, value) in zip(df.index, steps) if signal]
+    assert len(batch) > 0
+    assert [(ts, signal) for ts, signal, _ in fired] == list(zip(batch["timestamp"], batch["signal"]))
+    assert [value for *_, value in fired] == pytest.approx(batch["value"].tolist(), rel=1e-9)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_bollinger_step_matches_the_batch_on_every_prefix(make_candles, seed):
+    # the streaming Bollinger strategy reports the batch function's latest-bar signal
+    df = make_candles(300, seed).set_index("timestamp")
+    params = {"bb_bw_min": 0.001}  # narrow enough for 1m bars to produce BUYs
+
+    steps = streamed(STREAMING_STRATEGIES["BOLLINGER"], df, **params)
+
+    signals = set()
+    for i, (signal, value) in enumerate(steps):
+        expected = TRAILING_STRATEGIES["BOLLINGER"](df.iloc[:i + 1], **params)
+        assert signal == expected[0]
+        assert value == pytest.approx(expected[1], rel=1e-9)
+        signals.add(signal)
+    assert signals == {None, "BUY", "SELL"}
+
+
+def test_bollinger_is_not_ready_before_its_lookback(make_candles):
+    strategy = STREAMING_STRATEGIES["BOLLINGER"]()
+    for i, bar in enumerate(make_candles(strategy.lookback + 5).to_dict("records")):
+        signal, value = strategy.step(bar)
+        assert strategy.ready == (i + 1 >= strategy.lookback)
+        if not strategy.ready:
+            assert (signal, value) == (None, None)
+        else:
+            assert value is not None
@@ -0,0 +1,33 @@
+import pytest
+
+from services.sweep import SELECTION_METRICS, evaluate, expand_grid, metric_value
+from services.walk_forward import run_walk_forward, tune
+
+GRID = {"trailing_pct": [0.01, 0.03], "rsi_window": [7, 14]}
+
+
+@pytest.mark.parametrize("metric", list(SELECTION_METRICS))
+def test_tune_picks_the_best_combination(make_candles, metric):
+    df = make_candles(3000)
+
+    params, metrics = tune(df, "RSI", GRID, 500, 3000, rank_by=metric)
+
+    frame = df.iloc[300:3000].reset_index(drop=True)
+    scores = [metric_value(evaluate(frame, "RSI", p, start=200), metric) for p in expand_grid(GRID)]
+    best = max(scores) if SELECTION_METRICS[metric] else min(scores)
+    assert metrics[metric] == pytest.approx(best)
+
+
+def test_derived_metric_runs_every_fold(make_candles):
+    folds, report = run_walk_forward(make_candles(3000), train=1000, test=500, grids={"RSI": GRID},
+                                     workers=1, rank_by="return_over_drawdown")
+
+    assert "error" not in folds
+    assert folds["train_return_over_drawdown"].notna().all()
+    assert report["folds"].tolist() == [len(folds)]
+
+
+def test_unknown_metric(make_candles):
+    with pytest.raises(ValueError, match="unknown metric"):
+        run_walk_forward(make_candles(3000), train=1000, test=500, grids={"RSI": GRID},
+                         workers=1, rank_by="sharpe")
@@ -0,0 +1,55 @@
+# walk_forward.py
+"""Walk-forward test of the trailing strategies.
+
+    python walk_forward.py --data data/BTCUSDT-1m-sample.csv --train 500 --test 200
+    python walk_forward.py --limit 20000 --train 5000 --test 1000 --anchored --workers 4
+    python walk_forward.py --limit 20000 --train 5000 --test 1000 --no-tune   # default params only
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from services.sweep import DEFAULT_GRIDS, SELECTION_METRICS
+from services.walk_forward import run_walk_forward
+from settings import SYMBOL, TIMEFRAME
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Walk-forward test for the trailing strategies.")
+    parser.add_argument("--data", help="candle CSV to use instead of downloading")
+    parser.add_argument("--symbol", default=SYMBOL)
+    parser.add_argument("--timeframe", default=TIMEFRAME)
+    parser.add_argument("--limit", type=int, default=5000)
+    parser.add_argument("--strategies", nargs="+", default=list(DEFAULT_GRIDS))
+    parser.add_argument("--train", type=int, required=True, help="bars per train window")
+    parser.add_argument("--test", type=int, required=True, help="bars per test window")
+    parser.add_argument("--step", type=int, help="bars between folds (default: --test)")
+    parser.add_argument("--anchored", action="store_true", help="train windows all start at the first bar")
+    parser.add_argument("--warmup", type=int, default=200, help="indicator warm-up bars before each window")
+    parser.add_argument("--no-tune", action="store_true", help="score the default parameters only")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--rank-by", default="total_return", choices=list(SELECTION_METRICS))
+    parser.add_argument("--out", help="write the per-fold table to this CSV")
+    args = parser.parse_args()
+
+    if args.data:
+        df = pd.read_csv(args.data, parse_dates=["timestamp"])
+    else:
+        from services.data_service import fetch_ohlcv
+        df = fetch_ohlcv(symbol=args.symbol, timeframe=args.timeframe, limit=args.limit)
+
+    grids = {name: ({} if args.no_tune else DEFAULT_GRIDS[name]) for name in args.strategies}
+    t0 = time.perf_counter()
+    folds, report = run_walk_forward(df, args.train, args.test, step=args.step, anchored=args.anchored,
+                                     grids=grids, warmup=args.warmup, workers=args.workers,
+                                     rank_by=args.rank_by)
+    print(f"{folds['fold'].nunique()} fold(s) x {len(grids)} strategies on {len(df)} bars "
+          f"in {time.perf_counter() - t0:.1f}s\n")
+    with pd.option_context("display.max_colwidth", 80, "display.width", 200):
+        print(folds.drop(columns=["train_start"]).to_string())
+        print()
+        print(report.to_string())
+    if args.out:
+        folds.to_csv(args.out, index=False)
+        print(f"\nWrote {args.out}")